@@ -1,92 +1,798 @@
+import argparse
+import http.client
 import json
 import os
-import urllib.request
+import threading
+import time
 import hashlib
-from urllib.parse import urlparse
-
-def download_assets():
-    print("Starting Asset Migration (Urllib Mode)...")
-    
-    exams_path = 'assets/data/exams.json'
-    base_download_dir = 'assets/images/downloaded'
-    
-    if not os.path.exists(base_download_dir):
-        os.makedirs(base_download_dir)
-        
-    try:
-        with open(exams_path, 'r', encoding='utf-8') as f:
-            exams = json.load(f)
-            
-        total_downloaded = 0
-        
-        # Helper to process a URL
-        def process_url(url, exam_id):
-            if not url or not url.lower().startswith('http'):
-                return url
-                
-            # Keep extension
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from exam_store import ExamStore
+
+EXAMS_PATH = 'assets/data/exams.json'
+BASE_DOWNLOAD_DIR = 'assets/images/downloaded'
+STORE_INDEX_PATH = 'assets/data/asset_store_index.json'
+STORE_REPORT_PATH = 'analysis/asset_store_report.json'
+
+DEFAULT_WORKERS = 8
+DEFAULT_PER_HOST = 4
+CHUNK_SIZE = 64 * 1024
+REQUEST_TIMEOUT = 10
+MAX_REDIRECTS = 5
+
+
+def is_remote(url):
+    return bool(url) and url.lower().startswith('http')
+
+
+def url_extension(url):
+    # Keep extension
+    ext = os.path.splitext(urlparse(url).path)[1]
+    return ext.lower() if ext else '.jpg'
+
+
+def file_digest(path, chunk_size=CHUNK_SIZE):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class AssetStore:
+    """
+    Content-addressed image store.
+
+    Every distinct body is kept once as `<root>/<sha256><ext>`, no matter how many
+    URLs or exams reference it. `index_path` maps each source URL to the stored
+    file name plus the ETag/Last-Modified it was served with, so re-runs can skip
+    or conditionally revalidate URLs that were already fetched, and to the exam
+    references ([examId, question id, option key or null]) rewritten from it, so
+    a revalidated URL moves only its own references off a shared file.
+    """
+
+    def __init__(self, root=BASE_DOWNLOAD_DIR, index_path=STORE_INDEX_PATH):
+        self.root = root
+        self.index_path = index_path
+        self.staging_dir = os.path.join(root, '.staging')
+        self.stored = 0
+        self.duplicates = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        self.urls = {}
+        if index_path and os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                self.urls = json.load(f).get('urls', {})
+            # Older indexes stored the bare file name
+            for url, entry in self.urls.items():
+                if isinstance(entry, str):
+                    self.urls[url] = {'file': entry}
+
+    def lookup(self, url):
+        """Stored path for `url`, if it was fetched before and the file is still there."""
+        entry = self.urls.get(url)
+        if entry:
+            path = os.path.join(self.root, entry['file'])
+            if os.path.exists(path):
+                return path
+        return None
+
+    def validators(self, url):
+        """Conditional request headers for a previously fetched URL."""
+        entry = self.urls.get(url) or {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('lastModified'):
+            headers['If-Modified-Since'] = entry['lastModified']
+        return headers
+
+    def staging_path(self, url):
+        os.makedirs(self.staging_dir, exist_ok=True)
+        md5 = hashlib.md5(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.staging_dir, f"{md5}{url_extension(url)}")
+
+    def add_file(self, src_path, ext, url=None, meta=None):
+        """Move `src_path` into the store (or drop it if the bytes are already there)."""
+        digest = file_digest(src_path)
+        name = f"{digest}{ext}"
+        path = os.path.join(self.root, name)
+        with self._lock:
+            if os.path.exists(path):
+                self.duplicates += 1
+                self.bytes_saved += os.path.getsize(src_path)
+                os.remove(src_path)
+            else:
+                os.replace(src_path, path)
+                self.stored += 1
+            if url:
+                entry = {'file': name}
+                entry.update({k: v for k, v in (meta or {}).items() if v})
+                refs = (self.urls.get(url) or {}).get('refs')
+                if refs:
+                    entry['refs'] = refs
+                self.urls[url] = entry
+        return path
+
+    def record_ref(self, url, ref):
+        """Remember that `ref` was rewritten from `url`."""
+        with self._lock:
+            entry = self.urls.get(url)
+            if entry is not None:
+                refs = entry.setdefault('refs', [])
+                if ref not in refs:
+                    refs.append(ref)
+
+    def references(self, url):
+        """References rewritten from `url`, or None for entries indexed before they were tracked."""
+        return (self.urls.get(url) or {}).get('refs')
+
+    def sharing(self, url, path):
+        """Other URLs whose stored file is `path`."""
+        return [u for u, entry in self.urls.items()
+                if u != url and os.path.join(self.root, entry['file']) == path]
+
+    def save_index(self):
+        if not self.index_path:
+            return
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'urls': dict(sorted(self.urls.items()))}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def report(self):
+        return {
+            'filesStored': self.stored,
+            'duplicatesDropped': self.duplicates,
+            'bytesSaved': self.bytes_saved,
+            'urlsIndexed': len(self.urls),
+        }
+
+
+def collect_urls(exams):
+    """Collect every unique remote URL referenced by the exams, in file order."""
+    urls = {}
+    for exam in exams:
+        for q in exam['questions']:
+            # Question Image
+            if is_remote(q.get('imageUrl')):
+                urls.setdefault(q['imageUrl'], None)
+
+            # Option Images
+            for opt in q['options'].values():
+                if isinstance(opt, dict) and is_remote(opt.get('imageUrl')):
+                    urls.setdefault(opt['imageUrl'], None)
+    return list(urls)
+
+
+class HostLimiter:
+    """Caps the number of in-flight requests per host."""
+
+    def __init__(self, per_host):
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def for_url(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            sem = self._semaphores.get(host)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.per_host)
+                self._semaphores[host] = sem
+            return sem
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections, one per (scheme, host, port) per thread.
+
+    http.client connections are not thread-safe, so every worker thread owns its
+    own set; a worker that fetches many images from the same host reuses one
+    TCP/TLS connection instead of handshaking for every file.
+    """
+
+    def __init__(self, timeout=REQUEST_TIMEOUT):
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = []
+        # Connections opened per thread, for checking reuse
+        self.opened = {}
+
+    def _connections(self):
+        if not hasattr(self._local, 'connections'):
+            self._local.connections = {}
+        return self._local.connections
+
+    def _connection(self, parsed, fresh=False):
+        key = (parsed.scheme, parsed.hostname, parsed.port)
+        connections = self._connections()
+        conn = connections.get(key)
+        if conn is None or fresh:
+            if conn is not None:
+                conn.close()
+            cls = http.client.HTTPSConnection if parsed.scheme == 'https' else http.client.HTTPConnection
+            conn = cls(parsed.hostname, parsed.port, timeout=self.timeout)
+            connections[key] = conn
+            with self._lock:
+                self._all.append(conn)
+                ident = threading.get_ident()
+                self.opened[ident] = self.opened.get(ident, 0) + 1
+        return conn
+
+    def discard(self, url):
+        """Drop this thread's connection to `url`'s host after a failed exchange."""
+        parsed = urlparse(url)
+        conn = self._connections().pop((parsed.scheme, parsed.hostname, parsed.port), None)
+        if conn is not None:
+            conn.close()
+
+    def request(self, url, headers):
+        """
+        GET `url`, following redirects. The caller must read the response to the
+        end before the next request so the connection can be reused.
+        """
+        for _ in range(MAX_REDIRECTS + 1):
             parsed = urlparse(url)
-            path = parsed.path
-            ext = os.path.splitext(path)[1]
-            if not ext: ext = '.jpg'
-            
-            # Sanitized exam folder
-            exam_dir = os.path.join(base_download_dir, exam_id)
-            if not os.path.exists(exam_dir):
-                os.makedirs(exam_dir)
-                
-            # Hash URL for uniqueness
-            md5 = hashlib.md5(url.encode('utf-8')).hexdigest()
-            filename = f"{md5}{ext}"
-            local_path = os.path.join(exam_dir, filename)
-            project_path = local_path # relative path for JSON
-            
-            if os.path.exists(local_path):
-                # Already downloaded
-                return project_path
-                
+            target = parsed.path or '/'
+            if parsed.query:
+                target += '?' + parsed.query
+
+            try:
+                conn = self._connection(parsed)
+                conn.request('GET', target, headers=headers)
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection; retry once on a new one
+                try:
+                    conn = self._connection(parsed, fresh=True)
+                    conn.request('GET', target, headers=headers)
+                    response = conn.getresponse()
+                except Exception:
+                    self.discard(url)
+                    raise
+            except Exception:
+                self.discard(url)
+                raise
+
+            if response.status in (301, 302, 303, 307, 308) and response.getheader('Location'):
+                response.read()
+                url = urljoin(url, response.getheader('Location'))
+                continue
+            return response
+        raise IOError(f"too many redirects for {url}")
+
+    def close(self):
+        """Close every connection opened by any thread; call once the workers are done."""
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+
+
+def process_url(url, store, limiter=None, pool=None, revalidate=False):
+    """
+    Download a single URL into the store and return its path, or the original URL on failure.
+
+    With `revalidate`, a URL that is already in the store is re-requested with its
+    stored ETag/Last-Modified; a 304 keeps the existing file, anything else
+    replaces it.
+    """
+    if not is_remote(url):
+        return url
+
+    existing = store.lookup(url)
+    if existing and not revalidate:
+        # Already downloaded
+        return existing
+
+    pool = pool or ConnectionPool()
+    try:
+        print(f"{'Revalidating' if existing else 'Downloading'} {url}...")
+        staging_path = store.staging_path(url)
+        sem = limiter.for_url(url) if limiter else None
+        if sem: sem.acquire()
+        try:
+            meta = stream_download(url, staging_path, pool, store.validators(url) if existing else None)
+        finally:
+            if sem: sem.release()
+        if meta is None:
+            # 304 Not Modified
+            return existing
+        return store.add_file(staging_path, url_extension(url), url, meta)
+    except Exception as e:
+        print(f"Error downloading {url}: {e}")
+        return url
+
+
+def stream_download(url, local_path, pool, validators=None, chunk_size=CHUNK_SIZE):
+    """
+    Stream `url` into `local_path` in fixed-size chunks.
+
+    Bytes land in `<local_path>.part` first and are renamed into place only once the
+    body is complete, so an interrupted run never leaves a truncated file behind.
+    A leftover `.part` file is resumed with an HTTP Range request guarded by
+    If-Range with the ETag/Last-Modified its bytes came with (kept in
+    `<local_path>.part.json`); when the resource changed, or the server ignores the
+    range, the whole body comes back with a 200 and the file is restarted. A
+    `.part` file without validators is not resumed.
+
+    `validators` are conditional headers for a file we already have. Returns None
+    when the server answers 304 Not Modified, otherwise the response's
+    {'etag', 'lastModified'} to store with the file.
+    """
+    part_path = local_path + '.part'
+    part_meta_path = part_path + '.json'
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+    headers = {'User-Agent': 'Mozilla/5.0'}
+    headers.update(validators or {})
+    if offset:
+        if_range = _if_range(_read_part_meta(part_meta_path))
+        if if_range:
+            headers['Range'] = f"bytes={offset}-"
+            # A changed resource comes back whole (200) instead of as a range of new bytes
+            headers['If-Range'] = if_range
+        else:
+            # Nothing to tell whether the resource changed since; start over
+            offset = 0
+
+    response = pool.request(url, headers)
+    if response.status == 304:
+        response.read()
+        return None
+    if response.status == 416 and offset:
+        # Stale partial file (bigger than the resource); start over
+        response.read()
+        _remove_part(part_path)
+        return stream_download(url, local_path, pool, validators, chunk_size)
+    if response.status not in (200, 206):
+        response.read()
+        raise IOError(f"HTTP {response.status} {response.reason}")
+
+    resumed = offset and response.status == 206
+    response_meta = {
+        'etag': response.getheader('ETag'),
+        'lastModified': response.getheader('Last-Modified'),
+    }
+    if not resumed:
+        # Validators of the body the .part file holds, for If-Range on resume
+        with open(part_meta_path, 'w', encoding='utf-8') as f:
+            json.dump(response_meta, f)
+    expected = response.getheader('Content-Length')
+    written = 0
+    with open(part_path, 'ab' if resumed else 'wb') as out_file:
+        while True:
             try:
-                print(f"Downloading {url}...")
-                req = urllib.request.Request(
-                    url, 
-                    headers={'User-Agent': 'Mozilla/5.0'}
-                )
-                with urllib.request.urlopen(req, timeout=10) as response, open(local_path, 'wb') as out_file:
-                    out_file.write(response.read())
-                return project_path
-            except Exception as e:
-                print(f"Error downloading {url}: {e}")
-                return url
-                
-        # Iterate exams
-        for exam in exams:
-            exam_id = exam['examId']
-            # print(f"Processing Exam: {exam_id}")
-            
-            for q in exam['questions']:
-                # Question Image
-                if q.get('imageUrl') and q['imageUrl'].lower().startswith('http'):
-                    new_path = process_url(q['imageUrl'], exam_id)
-                    if new_path != q['imageUrl']:
-                        q['imageUrl'] = new_path
-                        total_downloaded += 1
-                        
-                # Option Images
-                for key, opt in q['options'].items():
-                    if isinstance(opt, dict) and opt.get('imageUrl') and opt['imageUrl'].lower().startswith('http'):
-                        new_path = process_url(opt['imageUrl'], exam_id)
-                        if new_path != opt['imageUrl']:
-                            opt['imageUrl'] = new_path
-                            total_downloaded += 1
-
-        # Save updated JSON
-        with open(exams_path, 'w', encoding='utf-8') as f:
-            json.dump(exams, f, ensure_ascii=False, indent=2)
-            
+                chunk = response.read(chunk_size)
+            except Exception:
+                # The connection is unusable mid-body; the .part file keeps what arrived
+                pool.discard(url)
+                raise
+            if not chunk:
+                break
+            out_file.write(chunk)
+            written += len(chunk)
+
+    if expected is not None and written != int(expected):
+        # Keep the .part file so the next run resumes from here
+        raise IOError(f"incomplete body: got {written} of {expected} bytes")
+
+    os.replace(part_path, local_path)
+    if os.path.exists(part_meta_path):
+        os.remove(part_meta_path)
+    return response_meta
+
+
+def _read_part_meta(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _if_range(meta):
+    """If-Range value for a partial body: its strong ETag, else its Last-Modified."""
+    etag = meta.get('etag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return meta.get('lastModified')
+
+
+def _remove_part(part_path):
+    for path in (part_path, part_path + '.json'):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def fetch_all(urls, store, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST, revalidate=False, pool=None):
+    """
+    Fetch all URLs into `store` with at most `workers` requests in flight overall
+    and `per_host` per host, reusing keep-alive connections within each worker.
+    Returns {url: stored path or original url}.
+    """
+    connections = pool or ConnectionPool()
+    try:
+        if workers <= 1:
+            return {url: process_url(url, store, None, connections, revalidate) for url in urls}
+
+        limiter = HostLimiter(per_host)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                url: executor.submit(process_url, url, store, limiter, connections, revalidate)
+                for url in urls
+            }
+            return {url: future.result() for url, future in futures.items()}
+    finally:
+        connections.close()
+
+
+def image_targets(exams):
+    """Yield (ref, object holding imageUrl) for every question and option dict."""
+    for exam in exams:
+        for q in exam['questions']:
+            yield [exam.get('examId'), q.get('id'), None], q
+            for key, opt in q['options'].items():
+                if isinstance(opt, dict):
+                    yield [exam.get('examId'), q.get('id'), key], opt
+
+
+def rewrite_image_urls(exams, mapping, store=None):
+    """
+    Replace every imageUrl found in `mapping`. Returns the number of updates.
+
+    With `store`, each rewritten reference is recorded under the URL it came from.
+    """
+    updated = 0
+    for ref, target in image_targets(exams):
+        old = target.get('imageUrl')
+        new_path = mapping.get(old)
+        if new_path and new_path != old:
+            target['imageUrl'] = new_path
+            updated += 1
+            if store is not None:
+                store.record_ref(old, ref)
+    return updated
+
+
+def repoint_references(exams, store, changed):
+    """
+    Move the references of each changed URL from its old stored file to the new one.
+
+    `changed` is {url: (old path, new path)}. Several URLs can share one stored
+    file, so only references recorded for the changed URL move. A URL indexed
+    before references were tracked moves every reference to its old file, but only
+    when no other URL shares that file. Returns the number of updates.
+    """
+    targets = {tuple(ref): target for ref, target in image_targets(exams)}
+    updated = 0
+    for url, (old_path, new_path) in changed.items():
+        refs = store.references(url)
+        if refs is None:
+            if store.sharing(url, old_path):
+                print(f"Skipping {url}: {old_path} is shared and its references are unknown; re-download it")
+                continue
+            updated += rewrite_image_urls(exams, {old_path: new_path})
+            continue
+        for ref in refs:
+            target = targets.get(tuple(ref))
+            if target is not None and target.get('imageUrl') == old_path:
+                target['imageUrl'] = new_path
+                updated += 1
+    return updated
+
+
+def migrate_legacy_files(exams, store):
+    """
+    Move files from the old per-exam layout (`downloaded/<exam_id>/<md5(url)>.ext`)
+    into the store. Returns {old path: stored path} for the references to rewrite.
+    """
+    legacy_prefix = store.root.rstrip('/') + '/'
+    mapping = {}
+    for exam in exams:
+        for q in exam['questions']:
+            paths = [q.get('imageUrl')] + [
+                opt.get('imageUrl') for opt in q['options'].values() if isinstance(opt, dict)
+            ]
+            for path in paths:
+                if not path or path in mapping or not path.startswith(legacy_prefix):
+                    continue
+                if os.path.dirname(path) == store.root.rstrip('/'):
+                    continue  # already in the store
+                if os.path.exists(path):
+                    mapping[path] = store.add_file(path, os.path.splitext(path)[1].lower())
+
+    # Emptied exam folders stay: pubspec.yaml lists them as asset directories and
+    # Flutter fails the build when a listed directory is missing
+    return mapping
+
+
+def download_assets(workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST, migrate=False, revalidate=False):
+    print(f"Starting Asset Migration ({workers} workers, {per_host} per host)...")
+
+    os.makedirs(BASE_DOWNLOAD_DIR, exist_ok=True)
+
+    try:
+        exam_store = ExamStore(EXAMS_PATH)
+        exams = exam_store.data
+
+        store = AssetStore()
+        total_downloaded = 0
+
+        if migrate:
+            moved = migrate_legacy_files(exams, store)
+            print(f"Moved {len(moved)} legacy files into the store.")
+            total_downloaded += rewrite_image_urls(exams, moved)
+
+        if revalidate:
+            # Ask the origin whether previously downloaded files changed; a
+            # changed body gets a new digest, so repoint its references.
+            before = {url: store.lookup(url) for url in store.urls}
+            before = {url: path for url, path in before.items() if path}
+            print(f"Revalidating {len(before)} stored URLs.")
+            refreshed = fetch_all(list(before), store, workers, per_host, revalidate=True)
+            changed = {
+                url: (before[url], path) for url, path in refreshed.items()
+                if path != url and path != before[url]
+            }
+            print(f"{len(changed)} stored URLs changed upstream.")
+            total_downloaded += repoint_references(exams, store, changed)
+
+        urls = collect_urls(exams)
+        print(f"Found {len(urls)} unique remote assets.")
+
+        results = fetch_all(urls, store, workers, per_host)
+        total_downloaded += rewrite_image_urls(exams, results, store)
+
+        # Save once, after all downloads finished (atomic and journaled; no-op without changes)
+        exam_store.save("download_assets")
+        store.save_index()
+
+        report = store.report()
+        os.makedirs(os.path.dirname(STORE_REPORT_PATH), exist_ok=True)
+        with open(STORE_REPORT_PATH, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
         print(f"\nMigration Complete. Downloaded/Updated: {total_downloaded}")
-        
+        print(f"Store: {report['filesStored']} new files, {report['duplicatesDropped']} duplicates dropped, "
+              f"{report['bytesSaved'] / 1024:.1f} KB saved")
+
     except Exception as e:
         print(f"Critical Error: {e}")
 
+
+class StandInServer:
+    """
+    Local HTTP/1.1 image server for benchmarks and checks.
+
+    Serves a distinct synthetic body for every path (or the one set in `bodies`)
+    after an optional delay, honours If-None-Match with 304s and Range/If-Range
+    with 206s, and counts accepted connections and requests so connection reuse
+    can be verified.
+    """
+
+    def __init__(self, latency=0.0, size=32 * 1024):
+        import socket
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        payload = os.urandom(size)
+        stats = {'connections': 0, 'requests': 0, 'not_modified': 0, 'partial': 0}
+        lock = threading.Lock()
+        self.stats = stats
+        self.bodies = bodies = {}
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; avoid Nagle stalls
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with lock:
+                    stats['connections'] += 1
+
+            def do_GET(self):
+                with lock:
+                    stats['requests'] += 1
+                time.sleep(latency)
+                # Distinct bodies so the store does not collapse them
+                body = bodies.get(self.path, payload + self.path.encode())
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    with lock:
+                        stats['not_modified'] += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                byte_range = self.headers.get('Range', '')
+                if byte_range.startswith('bytes=') and self.headers.get('If-Range', etag) == etag:
+                    start = int(byte_range[len('bytes='):].split('-')[0])
+                    with lock:
+                        stats['partial'] += 1
+                    self.send_response(206)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Range', f"bytes {start}-{len(body) - 1}/{len(body)}")
+                    self.send_header('Content-Length', str(len(body) - start))
+                    self.end_headers()
+                    self.wfile.write(body[start:])
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/png')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self):
+        for key in self.stats:
+            self.stats[key] = 0
+
+
+def run_benchmark(worker_counts, files=64, latency=0.05, size=32 * 1024):
+    """
+    Serve `files` synthetic images from a local stand-in server that sleeps
+    `latency` seconds per request, then time a cold download and a conditional
+    re-run at each worker count.
+    """
+    import contextlib
+    import io
+    import tempfile
+
+    print(f"Benchmark: {files} files x {size // 1024} KB, {latency * 1000:.0f} ms server latency")
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8} {'conns':>6} {'reqs':>5} {'reval s':>8} {'304s':>5}")
+    baseline = None
+    with StandInServer(latency, size) as server:
+        urls = [f"{server.base_url}/img_{i}.png" for i in range(files)]
+        for workers in worker_counts:
+            with tempfile.TemporaryDirectory() as tmp:
+                server.reset()
+                store = AssetStore(tmp, index_path=None)
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results = fetch_all(urls, store, workers=workers, per_host=workers)
+                elapsed = time.perf_counter() - start
+                failed = sum(1 for url, path in results.items() if path == url)
+                cold = dict(server.stats)
+
+                server.reset()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    fetch_all(urls, store, workers=workers, per_host=workers, revalidate=True)
+                reval_elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            note = f"  ({failed} failed)" if failed else ""
+            print(f"{workers:>8} {elapsed:>9.3f} {baseline / elapsed:>7.1f}x {cold['connections']:>6} "
+                  f"{cold['requests']:>5} {reval_elapsed:>8.3f} {server.stats['not_modified']:>5}{note}")
+
+
+def run_checks(workers=4, files=32):
+    """
+    Assert download behaviour against the stand-in server; returns True when every check passes.
+
+    - a cold fetch makes one request per file and no worker opens a second connection
+    - a revalidation pass gets a 304 for every URL and stores nothing new
+    - a partial file is resumed only while its If-Range validator still matches
+    - revalidating one of two URLs that share a stored file moves only its own references
+    """
+    import contextlib
+    import io
+    import tempfile
+
+    failures = []
+
+    def check(label, ok, detail=''):
+        print(f"{'PASS' if ok else 'FAIL'}  {label}" + (f" ({detail})" if detail and not ok else ''))
+        if not ok:
+            failures.append(label)
+
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    with StandInServer(latency=0.01, size=4 * 1024) as server, tempfile.TemporaryDirectory() as tmp:
+        urls = [f"{server.base_url}/img_{i}.png" for i in range(files)]
+        store = AssetStore(os.path.join(tmp, 'store'), index_path=None)
+        os.makedirs(store.root)
+        pool = ConnectionPool()
+        with quiet:
+            results = fetch_all(urls, store, workers=workers, per_host=workers, pool=pool)
+        check("every URL downloaded", all(path != url for url, path in results.items()))
+        check("one request per file", server.stats['requests'] == files, f"{server.stats['requests']} requests")
+        most = max(pool.opened.values(), default=0)
+        check("at most one connection per worker", most <= 1 and server.stats['connections'] <= workers,
+              f"{most} per thread, {server.stats['connections']} accepted")
+
+        server.reset()
+        stored = store.stored
+        with contextlib.redirect_stdout(io.StringIO()):
+            fetch_all(urls, store, workers=workers, per_host=workers, revalidate=True)
+        check("revalidation answered 304 for every URL", server.stats['not_modified'] == files,
+              f"{server.stats['not_modified']} of {files}")
+        check("revalidation stored nothing new", store.stored == stored)
+
+        body = os.urandom(4096)
+        server.bodies['/resume.png'] = body
+        resume_url = f"{server.base_url}/resume.png"
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        for label, validator, expect_partial in (("matching If-Range resumes with 206", etag, 1),
+                                                 ("changed resource restarts with 200", '"stale"', 0)):
+            local = os.path.join(tmp, 'resume.png')
+            prefix = body[:1000] if expect_partial else b'x' * 1000
+            with open(local + '.part', 'wb') as f:
+                f.write(prefix)
+            with open(local + '.part.json', 'w', encoding='utf-8') as f:
+                json.dump({'etag': validator}, f)
+            server.reset()
+            stream_download(resume_url, local, pool)
+            with open(local, 'rb') as f:
+                ok = f.read() == body and server.stats['partial'] == expect_partial
+            check(label, ok, f"{server.stats['partial']} partial responses")
+        pool.close()
+
+        server.bodies['/shared_a.png'] = server.bodies['/shared_b.png'] = os.urandom(4096)
+        shared = [f"{server.base_url}/shared_a.png", f"{server.base_url}/shared_b.png"]
+        exams = [{'examId': 'check', 'questions': [
+            {'id': i, 'imageUrl': url, 'options': {}} for i, url in enumerate(shared, 1)
+        ]}]
+        with contextlib.redirect_stdout(io.StringIO()):
+            rewrite_image_urls(exams, fetch_all(shared, store, workers=1), store)
+            old_path = exams[0]['questions'][0]['imageUrl']
+            server.bodies['/shared_a.png'] = os.urandom(4096)
+            refreshed = fetch_all(shared, store, workers=1, revalidate=True)
+            changed = {url: (old_path, path) for url, path in refreshed.items() if path not in (url, old_path)}
+            repoint_references(exams, store, changed)
+        a, b = (q['imageUrl'] for q in exams[0]['questions'])
+        check("shared file: only the changed URL's references move", a != old_path and b == old_path)
+
+    print(f"\n{'All checks passed' if not failures else f'{len(failures)} check(s) failed'}")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download remote exam images into assets/images/downloaded.")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="maximum concurrent downloads (1 = sequential)")
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST,
+                        help="maximum concurrent downloads per host")
+    parser.add_argument('--migrate-store', action='store_true',
+                        help="also move files from the old per-exam folders into the content-addressed store")
+    parser.add_argument('--revalidate', action='store_true',
+                        help="re-check already stored URLs with conditional requests (ETag/Last-Modified)")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="measure wall-clock scaling against a local stand-in server instead of migrating")
+    parser.add_argument('--benchmark-workers', default='1,2,4,8,16',
+                        help="comma separated worker counts for --benchmark")
+    parser.add_argument('--check', action='store_true',
+                        help="assert connection reuse, 304 revalidation and resume behaviour against a local server")
+    args = parser.parse_args()
+
+    if args.check:
+        return 0 if run_checks(max(args.workers, 1)) else 1
+    if args.benchmark:
+        run_benchmark([int(w) for w in args.benchmark_workers.split(',')])
+    else:
+        download_assets(args.workers, args.per_host, args.migrate_store, args.revalidate)
+    return 0
+
+
 if __name__ == "__main__":
-    download_assets()
+    raise SystemExit(main())
@@ -7,9 +7,15 @@ Analyzes questions in Deneme 1-6 and propagates their images to matching questio
 import json
 import os
 import sys
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, Tuple
 from collections import defaultdict
 
+from exam_store import ExamStore
+from image_manifest import image_exists
+from image_refs import report_blast_radius
+from question_features import FEATURES_FILE, load_features
+from question_index import CACHE_FILE, exam_selector, file_hash, load_index, normalize
+
 PROJECT_DIR = "/Users/ummugulsun/Ehliyet Rehberim/ehliyet_rehberim"
 EXAMS_JSON = os.path.join(PROJECT_DIR, "assets/data/exams.json")
 REPORT_JSON = os.path.join(PROJECT_DIR, "analysis/exams_report.json")
@@ -17,57 +23,16 @@ MISSING_CSV = os.path.join(PROJECT_DIR, "analysis/missing_images.csv")
 OUTPUT_REPORT = os.path.join(PROJECT_DIR, "analysis/propagation_report.json")
 
 
-def normalize(text: str) -> str:
-    """Normalize question text for comparison"""
-    if text is None:
-        return ""
-    s = text.lower().strip()
-    # Remove extra spaces
-    while "  " in s:
-        s = s.replace("  ", " ")
-    # Remove punctuation for better matching
-    for char in '.,;:!?"\'':
-        s = s.replace(char, "")
-    return s
-
-
-def load_exams() -> List[dict]:
-    """Load exams data from JSON"""
-    with open(EXAMS_JSON, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def save_exams(data: List[dict]) -> None:
-    """Save exams data to JSON"""
-    tmp_path = EXAMS_JSON + ".tmp"
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    os.replace(tmp_path, EXAMS_JSON)
-
-
 def file_exists_for_image_url(image_url: str) -> bool:
     """Check if the image file actually exists"""
-    if not image_url:
-        return False
-    abs_path = os.path.join(PROJECT_DIR, image_url)
-    return os.path.exists(abs_path)
-
-
-def extract_option_images(options: dict) -> Dict[str, str]:
-    """Extract imageUrl from options if they have them"""
-    option_images = {}
-    for key, value in options.items():
-        if isinstance(value, dict) and "imageUrl" in value:
-            option_images[key] = value["imageUrl"]
-    return option_images
+    return image_exists(image_url, PROJECT_DIR)
 
 
 def build_source_image_map(data: List[dict]) -> Dict[str, Tuple[str, Dict[str, str]]]:
     """
     Build a comprehensive map from normalized question text to (imageUrl, option_images)
-    for Deneme 1-5 only.
+    for Deneme 1-6 only.
     """
-    norm_to_images = {}
     source_exam_ids = [
         "deneme_sinavi_1",
         "deneme_sinavi_2",
@@ -76,35 +41,8 @@ def build_source_image_map(data: List[dict]) -> Dict[str, Tuple[str, Dict[str, s
         "deneme_sinavi_5",
         "deneme_sinavi_6",
     ]
-    
-    for exam in data:
-        exam_id = exam.get("examId", "")
-        if exam_id not in source_exam_ids:
-            continue
-            
-        for q in exam.get("questions", []):
-            text = q.get("questionText", "")
-            norm = normalize(text)
-            image_url = q.get("imageUrl")
-            
-            # Extract option images if present
-            option_images = extract_option_images(q.get("options", {}))
-            
-            # Only store if there's at least one image (main or option)
-            if image_url or option_images:
-                # Prefer entries with more images
-                existing = norm_to_images.get(norm)
-                if existing:
-                    existing_url, existing_opt = existing
-                    # Count total images
-                    new_count = (1 if image_url else 0) + len(option_images)
-                    existing_count = (1 if existing_url else 0) + len(existing_opt)
-                    if new_count > existing_count:
-                        norm_to_images[norm] = (image_url, option_images)
-                else:
-                    norm_to_images[norm] = (image_url, option_images)
-    
-    return norm_to_images
+    index = load_index(data, file_hash(EXAMS_JSON), os.path.join(PROJECT_DIR, CACHE_FILE))
+    return index.image_sources(data, include=exam_selector(source_exam_ids))
 
 
 def propagate_all_images(data: List[dict], source_map: Dict[str, Tuple[str, Dict[str, str]]]) -> dict:
@@ -178,31 +116,22 @@ def propagate_all_images(data: List[dict], source_map: Dict[str, Tuple[str, Dict
 
 
 def analyze_remaining_missing(data: List[dict]) -> dict:
-    """Analyze what's still missing after propagation"""
-    visual_keywords = [
-        'şekil', 'şekle göre', 'şekildeki', 'resim', 'görsel', 'levha', 
-        'işaret', 'gösterge', 'ikaz ışığı', 'yatay işaretleme', 
-        'taşıt yolu üzerine çizilen', 'dönel kavşak'
-    ]
-    
+    """Analyze what's still missing after propagation, from the question feature index"""
+    features, _ = load_features(data, os.path.join(PROJECT_DIR, FEATURES_FILE))
+
     still_missing = []
     by_exam = defaultdict(int)
-    
-    for exam in data:
-        exam_id = exam.get("examId", "")
-        for q in exam.get("questions", []):
-            text = q.get("questionText", "").lower()
-            needs_visual = any(keyword in text for keyword in visual_keywords)
-            
-            if needs_visual and not q.get("imageUrl"):
-                still_missing.append({
-                    "examId": exam_id,
-                    "questionId": q.get("id"),
-                    "questionText": q.get("questionText"),
-                    "category": q.get("category")
-                })
-                by_exam[exam_id] += 1
-    
+
+    for exam_pos, question_pos, exam_id, _ in features.missing_images():
+        q = data[exam_pos]["questions"][question_pos]
+        still_missing.append({
+            "examId": exam_id,
+            "questionId": q.get("id"),
+            "questionText": q.get("questionText"),
+            "category": q.get("category")
+        })
+        by_exam[exam_id] += 1
+
     return {
         "total_still_missing": len(still_missing),
         "by_exam": dict(by_exam),
@@ -214,7 +143,8 @@ def main():
     print("🚀 Advanced Image Propagator başlatılıyor...")
     
     # Load data
-    data = load_exams()
+    store = ExamStore(EXAMS_JSON)
+    data = store.data
     print(f"✅ {len(data)} deneme sınavı yüklendi")
     
     # Build source map from Deneme 1-6
@@ -233,7 +163,8 @@ def main():
     
     # Save updated data
     if stats["total_questions_updated"] > 0:
-        save_exams(data)
+        stats["blast_radius"] = report_blast_radius(store, PROJECT_DIR)
+        store.save("advanced_image_propagator")
         print(f"✅ exams.json güncellendi!")
     
     # Analyze remaining
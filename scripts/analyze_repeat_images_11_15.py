@@ -10,11 +10,12 @@ hangi ölçüde eşleştiğini analiz eder. Hiçbir değişiklik yapmaz, sadece
 
 from __future__ import annotations
 import json
-import re
 import csv
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
 
+from question_index import file_hash, load_index, normalize
+
 EXAMS_FILE = "assets/data/exams.json"
 OUTPUT_JSON = "analysis/repeat_image_analysis_11_15.json"
 OUTPUT_CSV = "analysis/repeat_image_analysis_11_15.csv"
@@ -28,13 +29,6 @@ TARGET_EXAMS = [
 ]
 
 
-def normalize_text(text: str) -> str:
-    text = text.lower()
-    text = re.sub(r"[^\w\s]", "", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
-
-
 def load_exams() -> List[dict]:
     with open(EXAMS_FILE, "r", encoding="utf-8") as f:
         return json.load(f)
@@ -42,94 +36,97 @@ def load_exams() -> List[dict]:
 
 def build_source_map(exams: List[dict]) -> Dict[str, Tuple[str, Dict[str, str]]]:
     """Kaynak soru metni -> (ana_gorsel, seçenek_gorselleri) map'i (Deneme 1-10)."""
-    source_map: Dict[str, Tuple[str, Dict[str, str]]] = {}
-    for exam in exams:
-        if exam.get("examId") in TARGET_EXAMS:
-            continue
-        for q in exam.get("questions", []):
-            qtext = q.get("questionText", "")
-            if not qtext:
-                continue
-            norm = normalize_text(qtext)
-            img = q.get("imageUrl")
-            if not img or img == "null":
-                continue
-            option_images: Dict[str, str] = {}
-            options = q.get("options", {})
-            for key, val in options.items():
-                if isinstance(val, dict) and val.get("imageUrl"):
-                    option_images[key] = val["imageUrl"]
-            source_map[norm] = (img, option_images)
-    return source_map
+    index = load_index(exams, file_hash(EXAMS_FILE))
+    return index.image_sources(
+        exams, include=lambda exam_id: exam_id not in TARGET_EXAMS, require_main_image=True
+    )
 
 
-def analyze_targets(exams: List[dict], source_map: Dict[str, Tuple[str, Dict[str, str]]]) -> dict:
-    report = {
-        "summary": {
-            "targets": TARGET_EXAMS,
-            "source_exam_range": "deneme_sinavi_1..deneme_sinavi_10",
-            "total_target_exams": 0,
-            "total_questions": 0,
-            "repeated_questions": 0,
-            "can_add_main_images": 0,
-            "already_has_main_images": 0,
-            "conflicting_main_images": 0,
-            "option_images_candidates": 0,
-        },
-        "exams": {},
+COUNT_KEYS = [
+    "repeated_questions", "can_add_main_images", "already_has_main_images",
+    "conflicting_main_images", "option_images_candidates",
+]
+STATUS_COUNTS = {
+    "needs_main_image": "can_add_main_images",
+    "has_same_main_image": "already_has_main_images",
+    "has_different_main_image": "conflicting_main_images",
+}
+CSV_HEADER = ["examId", "questionId", "status", "currentImage", "recommendedImage", "questionText"]
+
+
+def new_summary() -> dict:
+    summary = {
+        "targets": TARGET_EXAMS,
+        "source_exam_range": "deneme_sinavi_1..deneme_sinavi_10",
+        "total_target_exams": 0,
+        "total_questions": 0,
     }
+    summary.update({key: 0 for key in COUNT_KEYS})
+    return summary
+
+
+def new_exam_block() -> dict:
+    block = {"total_questions": 0}
+    block.update({key: 0 for key in COUNT_KEYS})
+    block["details"] = []
+    return block
+
+
+def classify(q: dict, norm: str, source_map: Dict[str, Tuple[str, Dict[str, str]]]) -> Optional[dict]:
+    """Detail row for a target question that repeats a sourced question, else None."""
+    if not norm or norm not in source_map:
+        return None
+    src_img, src_option_imgs = source_map[norm]
+    cur_img = q.get("imageUrl")
+    if not cur_img or cur_img == "null":
+        status = "needs_main_image"
+    elif cur_img == src_img:
+        status = "has_same_main_image"
+    else:
+        status = "has_different_main_image"
+    return {
+        "questionId": q.get("id"),
+        "questionText": q.get("questionText", ""),
+        "status": status,
+        "currentImage": cur_img,
+        "recommendedImage": src_img,
+        "optionImages": src_option_imgs,
+    }
+
+
+def count_detail(counters: Iterable[dict], detail: Optional[dict]) -> None:
+    for c in counters:
+        c["total_questions"] += 1
+        if detail is None:
+            continue
+        c["repeated_questions"] += 1
+        c[STATUS_COUNTS[detail["status"]]] += 1
+        c["option_images_candidates"] += len(detail["optionImages"] or {})
 
+
+def csv_row(exam_id: str, d: dict) -> List[str]:
+    return [
+        exam_id,
+        str(d.get("questionId")),
+        d.get("status", ""),
+        d.get("currentImage") or "",
+        d.get("recommendedImage") or "",
+        (d.get("questionText") or "").replace("\n", " ")[:200]
+    ]
+
+
+def analyze_targets(exams: List[dict], source_map: Dict[str, Tuple[str, Dict[str, str]]]) -> dict:
+    report = {"summary": new_summary(), "exams": {}}
     for exam in exams:
         exam_id = exam.get("examId")
         if exam_id not in TARGET_EXAMS:
             continue
-        exam_block = {
-            "total_questions": 0,
-            "repeated_questions": 0,
-            "can_add_main_images": 0,
-            "already_has_main_images": 0,
-            "conflicting_main_images": 0,
-            "option_images_candidates": 0,
-            "details": [],
-        }
+        exam_block = new_exam_block()
         for q in exam.get("questions", []):
-            exam_block["total_questions"] += 1
-            report["summary"]["total_questions"] += 1
-            qtext = q.get("questionText", "")
-            norm = normalize_text(qtext)
-            if not norm:
-                continue
-            if norm in source_map:
-                exam_block["repeated_questions"] += 1
-                report["summary"]["repeated_questions"] += 1
-                src_img, src_option_imgs = source_map[norm]
-                cur_img = q.get("imageUrl")
-                status = ""
-                if not cur_img or cur_img == "null":
-                    status = "needs_main_image"
-                    exam_block["can_add_main_images"] += 1
-                    report["summary"]["can_add_main_images"] += 1
-                else:
-                    if cur_img == src_img:
-                        status = "has_same_main_image"
-                        exam_block["already_has_main_images"] += 1
-                        report["summary"]["already_has_main_images"] += 1
-                    else:
-                        status = "has_different_main_image"
-                        exam_block["conflicting_main_images"] += 1
-                        report["summary"]["conflicting_main_images"] += 1
-                option_candidate_count = len(src_option_imgs or {})
-                if option_candidate_count:
-                    exam_block["option_images_candidates"] += option_candidate_count
-                    report["summary"]["option_images_candidates"] += option_candidate_count
-                exam_block["details"].append({
-                    "questionId": q.get("id"),
-                    "questionText": qtext,
-                    "status": status,
-                    "currentImage": cur_img,
-                    "recommendedImage": src_img,
-                    "optionImages": src_option_imgs,
-                })
+            detail = classify(q, normalize(q.get("questionText", "")), source_map)
+            count_detail((exam_block, report["summary"]), detail)
+            if detail is not None:
+                exam_block["details"].append(detail)
         report["exams"][exam_id] = exam_block
         report["summary"]["total_target_exams"] += 1
     return report
@@ -141,20 +138,11 @@ def write_reports(report: dict) -> None:
         json.dump(report, f, ensure_ascii=False, indent=2)
 
     # CSV: sadece eklenebilecek ana görsel adaylarını listeler
-    rows: List[List[str]] = [[
-        "examId", "questionId", "status", "currentImage", "recommendedImage", "questionText"
-    ]]
+    rows: List[List[str]] = [CSV_HEADER]
     for exam_id, block in report.get("exams", {}).items():
         for d in block.get("details", []):
             if d.get("status") == "needs_main_image":
-                rows.append([
-                    exam_id,
-                    str(d.get("questionId")),
-                    d.get("status", ""),
-                    d.get("currentImage") or "",
-                    d.get("recommendedImage") or "",
-                    (d.get("questionText") or "").replace("\n", " ")[:200]
-                ])
+                rows.append(csv_row(exam_id, d))
     with open(OUTPUT_CSV, "w", encoding="utf-8", newline="") as f:
         writer = csv.writer(f)
         writer.writerows(rows)
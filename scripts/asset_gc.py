@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Orphan and dangling asset detector for assets/images, with garbage collection.
+
+pubspec.yaml bundles whole directories of assets/images (a directory entry
+covers the files directly in it), so every file left in one ships with the app
+whether anything uses it or not. One pass lists the files under assets/images
+and joins them against every image reference:
+
+  - exams.json: question and option imageUrl, plus option texts the app renders
+    as images (an "assets/..." text ending in an image extension)
+  - traffic_signs.json: sign imageUrl
+  - study_guides.json: every imageUrl, at any depth
+
+The report lists orphans (bundled files nothing references) with the bytes
+they take, dangling references (paths that do not exist, with a hint when only
+the letter case differs, since the build is case-sensitive even where the file
+system is not, and the unreferenced files next to it whose name starts with the
+same stem), and referenced files whose header is not an image
+(image_metadata.py). Files outside the bundled directories, such as the README
+screenshots, are counted but never collected. Remote URLs are counted but not
+checked.
+
+Garbage collection is a dry run unless --apply is given. As a last safety
+check, an orphan is kept if its path appears anywhere in the raw text of a data
+file, pubspec.yaml (e.g. the launcher icon), a README or the Dart sources, or if
+it is a candidate for a dangling reference. --apply moves orphans to .cache/asset_gc/<time>/ (same relative paths)
+instead of deleting them, and --restore <dir> moves them back. Directories are
+never removed, since pubspec.yaml lists some of them by name.
+
+Usage:
+    python3 scripts/asset_gc.py                    # report, dry run
+    python3 scripts/asset_gc.py --apply            # quarantine orphans
+    python3 scripts/asset_gc.py --restore .cache/asset_gc/20260101-120000
+"""
+
+from __future__ import annotations
+import argparse
+import glob
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+
+from image_metadata import IMAGE_EXTS, load_metadata
+from image_refs import GUIDES_FILE, SIGNS_FILE, Ref, describe, exam_references, image_path, sign_references
+from question_index import EXAMS_FILE, has_image
+
+PUBSPEC_FILE = "pubspec.yaml"
+# Text that may name an image outside the data files
+PROTECTED_SOURCES = (EXAMS_FILE, SIGNS_FILE, GUIDES_FILE, PUBSPEC_FILE, "README*.md", "lib/**/*.dart")
+IMAGES_DIR = "assets/images"
+QUARANTINE_DIR = ".cache/asset_gc"
+OUTPUT_REPORT = "analysis/asset_gc_report.json"
+# Option texts the app shows as an image instead of text (quiz_screen.dart)
+TEXT_IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".gif")
+
+
+def list_files(images_dir: str = IMAGES_DIR) -> Dict[str, int]:
+    """Path -> bytes for every file under `images_dir`, images or not; hidden directories are skipped."""
+    files = {}
+    for root, dirs, names in os.walk(images_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(names):
+            path = os.path.join(root, name).replace(os.sep, "/")
+            files[path] = os.path.getsize(path)
+    return files
+
+
+def bundled_assets(pubspec: str = PUBSPEC_FILE) -> Tuple[List[str], List[str]]:
+    """(directories, files) listed under flutter: assets: in pubspec.yaml."""
+    dirs, files = [], []
+    section = None
+    with open(pubspec, "r", encoding="utf-8") as f:
+        for line in f:
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            indent = len(line) - len(line.lstrip())
+            if indent == 0:
+                section = stripped if stripped == "flutter:" else None
+            elif section == "flutter:" and indent == 2:
+                section = "flutter:" if stripped != "assets:" else "assets"
+            elif section == "assets" and stripped.startswith("- "):
+                entry = stripped[2:].strip().strip("\"'")
+                (dirs if entry.endswith("/") else files).append(entry.rstrip("/"))
+            elif section == "assets" and indent <= 2:
+                section = "flutter:"
+    return dirs, files
+
+
+def is_bundled(path: str, bundled: Tuple[List[str], List[str]]) -> bool:
+    dirs, files = bundled
+    return path in files or os.path.dirname(path) in dirs
+
+
+def protected_text() -> str:
+    texts = []
+    for pattern in PROTECTED_SOURCES:
+        for path in sorted(glob.glob(pattern, recursive=True)):
+            texts.append(_read(path))
+    return "\n".join(texts)
+
+
+def text_image_references(exams: List[dict]) -> Iterator[Tuple[str, Ref]]:
+    for exam in exams:
+        for q in exam.get("questions", []):
+            options = q.get("options") if isinstance(q.get("options"), dict) else {}
+            for key, value in options.items():
+                text = value.get("text") if isinstance(value, dict) else value
+                if isinstance(text, str) and text.startswith("assets/") and text.lower().endswith(TEXT_IMAGE_EXTS):
+                    yield text, Ref("exams", exam.get("examId", ""), q.get("id"), key)
+
+
+def guide_references(value, title: str = "") -> Iterator[Tuple[str, Ref]]:
+    if isinstance(value, dict):
+        title = value.get("title", title)
+        for key, item in value.items():
+            if key == "imageUrl" and isinstance(item, str) and has_image(item):
+                yield item, Ref("guides", None, title)
+            else:
+                yield from guide_references(item, title)
+    elif isinstance(value, list):
+        for item in value:
+            yield from guide_references(item, title)
+
+
+def _read(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _load(path: str):
+    return json.loads(_read(path))
+
+
+def scan(images_dir: str = IMAGES_DIR) -> dict:
+    """Join the files under `images_dir` against every reference in the data files."""
+    refs: Dict[str, List[Ref]] = {}
+    remote = 0
+    exams = _load(EXAMS_FILE)
+    pairs = list(exam_references(exams)) + list(text_image_references(exams))
+    pairs += list(sign_references(_load(SIGNS_FILE)))
+    if os.path.exists(GUIDES_FILE):
+        pairs += list(guide_references(_load(GUIDES_FILE)))
+    for url, ref in pairs:
+        if url.startswith(("http://", "https://")):
+            remote += 1
+            continue
+        refs.setdefault(image_path(url), []).append(ref)
+
+    files = list_files(images_dir)
+    by_lower = {p.lower(): p for p in files}
+    bundled = bundled_assets() if os.path.exists(PUBSPEC_FILE) else ([images_dir], [])
+    text = protected_text()
+
+    orphans, mentioned, unbundled = [], [], []
+    for path, size in files.items():
+        if path in refs:
+            continue
+        entry = {"path": path, "bytes": size, "image": os.path.splitext(path)[1].lower() in IMAGE_EXTS}
+        if not is_bundled(path, bundled):
+            unbundled.append(entry)
+        elif path in text:
+            mentioned.append(entry)
+        else:
+            orphans.append(entry)
+    dangling = []
+    for path, path_refs in sorted(refs.items()):
+        if path not in files:
+            entry = {"path": path, "references": [f"{r.source}: {describe(r)}" for r in path_refs]}
+            if path.lower() in by_lower:
+                entry["caseMismatch"] = by_lower[path.lower()]
+            stem = os.path.splitext(path)[0]
+            candidates = [o["path"] for o in orphans if o["path"].startswith(stem + "_")]
+            if candidates:
+                entry["candidates"] = candidates
+            dangling.append(entry)
+    # A file a broken path most likely meant is the fix for it, not garbage
+    candidates = {c for e in dangling for c in e.get("candidates", [])}
+    mentioned += [o for o in orphans if o["path"] in candidates]
+    orphans = [o for o in orphans if o["path"] not in candidates]
+
+    metadata, _ = load_metadata()
+    invalid = [
+        {"path": p, "error": metadata[p]["error"], "references": len(refs[p])}
+        for p in sorted(refs) if p in metadata and metadata[p]["format"] is None
+    ]
+    orphans.sort(key=lambda e: (-e["bytes"], e["path"]))
+    return {
+        "summary": {
+            "files": len(files),
+            "bytes": sum(files.values()),
+            "referencedPaths": len(refs),
+            "references": sum(len(r) for r in refs.values()),
+            "remoteReferences": remote,
+            "orphans": len(orphans),
+            "bytesReclaimable": sum(e["bytes"] for e in orphans),
+            "keptMentioned": len(mentioned),
+            "notBundled": len(unbundled),
+            "dangling": len(dangling),
+            "invalidReferenced": len(invalid),
+        },
+        "orphans": orphans,
+        "keptMentioned": mentioned,
+        "notBundled": unbundled,
+        "dangling": dangling,
+        "invalidReferenced": invalid,
+    }
+
+
+def quarantine(paths: List[str], root: str = QUARANTINE_DIR) -> str:
+    """Move `paths` under a new timestamped directory, keeping their relative paths; returns it."""
+    target = os.path.join(root, datetime.now().strftime("%Y%m%d-%H%M%S"))
+    for path in paths:
+        dest = os.path.join(target, path)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.move(path, dest)
+    with open(os.path.join(target, "moved.json"), "w", encoding="utf-8") as f:
+        json.dump(paths, f, ensure_ascii=False, indent=2)
+    return target
+
+
+def restore(target: str) -> List[str]:
+    """Move the files of a quarantine directory back where they came from."""
+    with open(os.path.join(target, "moved.json"), "r", encoding="utf-8") as f:
+        paths = json.load(f)
+    restored = []
+    for path in paths:
+        src = os.path.join(target, path)
+        if os.path.exists(path):
+            print(f"  ⚠️  Atlandı, dosya zaten var: {path}")
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.move(src, path)
+        restored.append(path)
+    return restored
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Find orphan images and dangling image references.")
+    parser.add_argument("--apply", action="store_true", help="move orphans to the quarantine directory")
+    parser.add_argument("--restore", metavar="DIR", help="move quarantined files back")
+    parser.add_argument("--report", default=OUTPUT_REPORT)
+    args = parser.parse_args()
+
+    if args.restore:
+        restored = restore(args.restore)
+        print(f"♻️  {len(restored)} dosya geri taşındı")
+        return 0
+    for path in (EXAMS_FILE, SIGNS_FILE, IMAGES_DIR):
+        if not os.path.exists(path):
+            print(f"❌ Bulunamadı: {path}")
+            return 1
+
+    report = scan()
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    s = report["summary"]
+    print(f"🔍 {s['files']} dosya ({s['bytes'] / 1024 / 1024:.1f} MB), {s['referencedPaths']} yerel yola "
+          f"{s['references']} referans, {s['remoteReferences']} uzak referans")
+    print(f"🗑️  Sahipsiz dosya: {s['orphans']} — {s['bytesReclaimable'] / 1024:.0f} KB geri kazanılabilir")
+    for e in report["orphans"][:15]:
+        print(f"  - {e['path']} ({e['bytes'] / 1024:.0f} KB){'' if e['image'] else ' [görsel değil]'}")
+    if len(report["orphans"]) > 15:
+        print(f"  ... ve {len(report['orphans']) - 15} dosya daha")
+    if report["keptMentioned"]:
+        print(f"🛡️  Korunan: {s['keptMentioned']} (veri, pubspec, README veya Dart kaynaklarında geçiyor "
+              f"ya da kırık bir yolun adayı)")
+    if report["notBundled"]:
+        print(f"📦 Uygulamaya paketlenmeyen klasörlerde: {s['notBundled']} dosya (dokunulmaz)")
+    print(f"🔗 Olmayan dosyaya işaret eden yol: {s['dangling']}")
+    for e in report["dangling"]:
+        hint = f" (büyük/küçük harf farkı: {e['caseMismatch']})" if "caseMismatch" in e else ""
+        print(f"  - {e['path']}{hint}: {', '.join(e['references'][:3])}")
+        for candidate in e.get("candidates", []):
+            print(f"      ↪ aday: {candidate}")
+    for e in report["invalidReferenced"]:
+        print(f"  ⚠️  Görsel olmayan dosya kullanılıyor: {e['path']} ({e['references']} referans)")
+
+    if args.apply and report["orphans"]:
+        target = quarantine([e["path"] for e in report["orphans"]])
+        print(f"✅ {len(report['orphans'])} dosya karantinaya taşındı: {target}")
+        print(f"   Geri almak için: python3 scripts/asset_gc.py --restore {target}")
+    elif report["orphans"]:
+        print("ℹ️ Deneme çalıştırması; taşımak için --apply")
+    print(f"📄 Rapor: {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
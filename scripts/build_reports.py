@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+Builds every read-only analysis report in one pass over exams.json.
+
+Each report used to come from its own script that parsed exams.json and rescanned
+every question. Here the file is parsed once, each question's text is
+normalized once, and the shared QuestionIndex, question feature index, image
+manifest and near-duplicate index are built lazily the first time an analyzer
+asks for them. The pipeline then walks the exams a single time and hands each
+exam and question to every analyzer. Analyzers stream their rows to report writers as they go: CSV rows go
+straight to the file, and each JSON list or object section is spooled to a temp
+file and assembled in key order at the end. The result has the same layout as
+json.dump(indent=2), so summary fields computed last can still come first.
+
+Reports only depend on exams.json and the image files: no dates and no
+last-run state, so rebuilding an unchanged checkout leaves them identical.
+
+Reports:
+- validate:        analysis/exams_report.json, analysis/missing_images.csv (validate_exams.py)
+- repeat-images:   analysis/repeat_image_analysis_11_15.json/.csv (analyze_repeat_images_11_15.py)
+- visual:          analysis/visual_questions_report.json
+- missing-images:  analysis/accurate_missing_images_report.json
+- near-duplicates: analysis/near_duplicates_report.json (near_duplicates.py)
+
+The propagation_report*.json and canonicalize_report.json files record what a
+propagator or canonicalizer changed, so they stay with those tools.
+
+Usage:
+    python3 scripts/build_reports.py                    # all reports
+    python3 scripts/build_reports.py visual validate    # selected analyzers
+"""
+
+from __future__ import annotations
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import analyze_repeat_images_11_15 as repeat_images
+import validate_exams
+from image_manifest import ImageManifest, load_manifest
+from near_duplicates import OUTPUT_REPORT as NEAR_DUPLICATES_REPORT
+from near_duplicates import NearDuplicateIndex, build_near_duplicate_index, build_report
+from question_features import FeatureIndex, load_features
+from question_index import EXAMS_FILE, QuestionIndex, has_image, load_exams, load_index, normalize
+
+
+# Writers ---------------------------------------------------------------------
+
+def _dump(value: Any, depth: int) -> str:
+    """json.dumps(indent=2) of `value` as it appears nested `depth` levels deep."""
+    return json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n" + "  " * depth)
+
+
+class _Section:
+    """A top-level list or object whose items are spooled to disk as they arrive."""
+
+    def __init__(self, kind: type):
+        self.kind = kind
+        self.count = 0
+        self.spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+
+    def _write(self, prefix: str, value: Any) -> None:
+        self.spool.write(",\n" if self.count else "\n")
+        self.spool.write("    " + prefix + _dump(value, 2))
+        self.count += 1
+
+    def append(self, value: Any) -> None:
+        self._write("", value)
+
+    def put(self, key: str, value: Any) -> None:
+        self._write(json.dumps(key, ensure_ascii=False) + ": ", value)
+
+    def copy_to(self, out) -> None:
+        opener, closer = ("[", "]") if self.kind is list else ("{", "}")
+        out.write(opener)
+        if self.count:
+            self.spool.seek(0)
+            shutil.copyfileobj(self.spool, out)
+            out.write("\n  ")
+        out.write(closer)
+        self.spool.close()
+
+
+class JsonReportWriter:
+    """A JSON object report with fixed key order; sections stream, other keys are set directly."""
+
+    def __init__(self, path: str, keys: Sequence[str]):
+        self.path = path
+        self.keys = list(keys)
+        self.values: Dict[str, Any] = {}
+
+    def set(self, key: str, value: Any) -> None:
+        self.values[key] = value
+
+    def stream(self, key: str, kind: type = list) -> _Section:
+        section = _Section(kind)
+        self.values[key] = section
+        return section
+
+    def close(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            out.write("{")
+            for i, key in enumerate(self.keys):
+                out.write(("," if i else "") + "\n  " + json.dumps(key, ensure_ascii=False) + ": ")
+                value = self.values[key]
+                if isinstance(value, _Section):
+                    value.copy_to(out)
+                else:
+                    out.write(_dump(value, 1))
+            out.write("\n}")
+        os.replace(tmp_path, self.path)
+
+
+class CsvReportWriter:
+    def __init__(self, path: str, header: Sequence[str], **csv_options):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.f = open(self.tmp_path, "w", encoding="utf-8", newline="")
+        # Header names never need quoting, whatever quoting the rows use
+        header_options = {k: v for k, v in csv_options.items() if k != "quoting"}
+        csv.writer(self.f, **header_options).writerow(header)
+        self.writer = csv.writer(self.f, **csv_options)
+
+    def row(self, values: Sequence[Any]) -> None:
+        self.writer.writerow(values)
+
+    def close(self) -> None:
+        self.f.close()
+        os.replace(self.tmp_path, self.path)
+
+
+# Shared state ----------------------------------------------------------------
+
+class QuestionRef(NamedTuple):
+    """Where the current question sits in exams.json, and its normalized text."""
+    exam_pos: int
+    question_pos: int
+    norm: str
+
+
+class ReportContext:
+    """The single parse of exams.json plus indexes built on first use and shared by all analyzers."""
+
+    def __init__(self, data: List[dict], source_hash: str):
+        self.data = data
+        self.source_hash = source_hash
+        self.timings: Dict[str, float] = {}
+        self._index: Optional[QuestionIndex] = None
+        self._manifest: Optional[ImageManifest] = None
+        self._near_duplicates: Optional[NearDuplicateIndex] = None
+        self._similar: Optional[Dict[str, List[Tuple[str, float]]]] = None
+        self._features: Optional[FeatureIndex] = None
+
+    def _timed(self, label: str, build):
+        start = time.perf_counter()
+        value = build()
+        self.timings[label] = self.timings.get(label, 0.0) + time.perf_counter() - start
+        return value
+
+    @property
+    def index(self) -> QuestionIndex:
+        if self._index is None:
+            self._index = self._timed("soru dizini", lambda: load_index(self.data, self.source_hash))
+        return self._index
+
+    @property
+    def manifest(self) -> ImageManifest:
+        if self._manifest is None:
+            self._manifest = self._timed("görsel manifesti", load_manifest)
+        return self._manifest
+
+    @property
+    def near_duplicates(self) -> NearDuplicateIndex:
+        if self._near_duplicates is None:
+            self._near_duplicates = self._timed(
+                "yakın-kopya dizini", lambda: build_near_duplicate_index(self.index.entries.keys()))
+        return self._near_duplicates
+
+    @property
+    def features(self) -> FeatureIndex:
+        if self._features is None:
+            self._features = self._timed(
+                "soru özellikleri", lambda: load_features(self.data, source_hash=self.source_hash)[0])
+        return self._features
+
+    def feature(self, ref: QuestionRef) -> dict:
+        return self.features.exams[ref.exam_pos]["questions"][ref.question_pos]
+
+    def similar_texts(self, norm: str) -> List[Tuple[str, float]]:
+        """Near-duplicate variants of a normalized text with their similarity, most similar first."""
+        if self._similar is None:
+            similar: Dict[str, List[Tuple[str, float]]] = {}
+            for a, b, sim in self.near_duplicates.similar_pairs():
+                similar.setdefault(a, []).append((b, sim))
+                similar.setdefault(b, []).append((a, sim))
+            for pairs in similar.values():
+                pairs.sort(key=lambda p: (-p[1], p[0]))
+            self._similar = similar
+        return self._similar.get(norm, [])
+
+
+# Analyzers -------------------------------------------------------------------
+
+class Analyzer:
+    """Base class: hooks are called in one traversal; `finish` writes the outputs and returns a summary line."""
+
+    name = ""
+    outputs: Tuple[str, ...] = ()
+
+    def begin(self, ctx: ReportContext) -> None:
+        pass
+
+    def question(self, ctx: ReportContext, exam: dict, q: dict, ref: QuestionRef) -> None:
+        pass
+
+    def end_exam(self, ctx: ReportContext, exam: dict) -> None:
+        pass
+
+    def finish(self, ctx: ReportContext) -> str:
+        return ""
+
+
+class ValidationAnalyzer(Analyzer):
+    name = "validate"
+    outputs = (validate_exams.REPORT_JSON, validate_exams.MISSING_CSV)
+
+    def begin(self, ctx: ReportContext) -> None:
+        self.cache = validate_exams.ValidationCache(ctx.manifest)
+        self.report = JsonReportWriter(validate_exams.REPORT_JSON, validate_exams.REPORT_KEYS)
+        self.sections = {key: self.report.stream(key) for key, _ in validate_exams.REPORT_SECTIONS}
+        self.csv = CsvReportWriter(validate_exams.MISSING_CSV, validate_exams.CSV_HEADER,
+                                   quoting=csv.QUOTE_ALL, lineterminator="\n")
+        self.records: List[dict] = []
+        self.keys = set()
+
+    def end_exam(self, ctx: ReportContext, exam: dict) -> None:
+        results = self.cache.results(exam)
+        for key, check in validate_exams.REPORT_SECTIONS:
+            for finding in results[check]:
+                self.sections[key].append(finding)
+                self.keys.add(validate_exams.finding_key(check, finding))
+        for finding in results["missingImage"]:
+            self.csv.row(validate_exams.csv_row(finding))
+        self.records.extend(results["duplicates"])
+
+    def finish(self, ctx: ReportContext) -> str:
+        clusters = validate_exams.duplicate_conflicts(self.records)
+        self.keys |= {f"duplicates|{c['questionTextNormalized']}" for c in clusters}
+        counts = {key: section.count for key, section in self.sections.items()}
+        self.report.set("summary", validate_exams.summary(len(ctx.data), len(self.records), counts, len(clusters)))
+        self.report.set("duplicateConflictClusters", clusters)
+        changes = self.cache.changes(self.keys)
+        self.report.close()
+        self.csv.close()
+        self.cache.save(self.keys)
+        line = (f"{counts['missingImageQuestions']} eksik görsel, {counts['invalidCorrectKeyQuestions']} geçersiz "
+                f"anahtar, {len(clusters)} tutarsız küme, {counts['danglingImagePaths']} kayıp dosya, "
+                f"{counts['schemaErrors']} şema hatası")
+        if not changes["baseline"]:
+            line += f"; son çalıştırmadan beri {len(changes['new'])} yeni, {len(changes['resolved'])} çözülen"
+        return line
+
+
+class RepeatImagesAnalyzer(Analyzer):
+    name = "repeat-images"
+    outputs = (repeat_images.OUTPUT_JSON, repeat_images.OUTPUT_CSV)
+
+    def begin(self, ctx: ReportContext) -> None:
+        self.source_map = ctx.index.image_sources(
+            ctx.data, include=lambda exam_id: exam_id not in repeat_images.TARGET_EXAMS, require_main_image=True
+        )
+        self.summary = repeat_images.new_summary()
+        self.report = JsonReportWriter(repeat_images.OUTPUT_JSON, ["summary", "exams"])
+        self.exams = self.report.stream("exams", dict)
+        self.csv = CsvReportWriter(repeat_images.OUTPUT_CSV, repeat_images.CSV_HEADER)
+        self.block: Optional[dict] = None
+
+    def question(self, ctx: ReportContext, exam: dict, q: dict, ref: QuestionRef) -> None:
+        if exam.get("examId") not in repeat_images.TARGET_EXAMS:
+            return
+        if self.block is None:
+            self.block = repeat_images.new_exam_block()
+        detail = repeat_images.classify(q, ref.norm, self.source_map)
+        repeat_images.count_detail((self.block, self.summary), detail)
+        if detail is not None:
+            self.block["details"].append(detail)
+            if detail["status"] == "needs_main_image":
+                self.csv.row(repeat_images.csv_row(exam["examId"], detail))
+
+    def end_exam(self, ctx: ReportContext, exam: dict) -> None:
+        if exam.get("examId") not in repeat_images.TARGET_EXAMS:
+            return
+        self.exams.put(exam["examId"], self.block or repeat_images.new_exam_block())
+        self.summary["total_target_exams"] += 1
+        self.block = None
+
+    def finish(self, ctx: ReportContext) -> str:
+        self.report.set("summary", self.summary)
+        self.report.close()
+        self.csv.close()
+        return (f"{self.summary['repeated_questions']} tekrar eden soru, "
+                f"{self.summary['can_add_main_images']} eklenebilir ana görsel")
+
+
+class VisualQuestionsAnalyzer(Analyzer):
+    """Questions whose text refers to a figure or sign, and whether they have an image."""
+
+    name = "visual"
+    outputs = ("analysis/visual_questions_report.json",)
+
+    def begin(self, ctx: ReportContext) -> None:
+        self.report = JsonReportWriter(self.outputs[0], ["reportType", "summary", "exams"])
+        self.report.set("reportType", "Sadece Görsel İçermesi Gereken Sorular")
+        self.exams = self.report.stream("exams", dict)
+        self.summary = {"totalQuestions": 0, "visualQuestions": 0,
+                        "visualQuestionsWithImage": 0, "visualQuestionsWithoutImage": 0}
+        self.questions: List[dict] = []
+
+    def question(self, ctx: ReportContext, exam: dict, q: dict, ref: QuestionRef) -> None:
+        self.summary["totalQuestions"] += 1
+        if not ctx.feature(ref)["visual"]:
+            return
+        self.questions.append({
+            "examId": exam.get("examId"),
+            "examName": exam.get("examName"),
+            "id": q.get("id"),
+            "questionText": q.get("questionText"),
+            "category": q.get("category"),
+            "hasImage": has_image(q.get("imageUrl")),
+            "imageUrl": q.get("imageUrl"),
+        })
+
+    def end_exam(self, ctx: ReportContext, exam: dict) -> None:
+        if not self.questions:
+            return
+        with_image = sum(1 for q in self.questions if q["hasImage"])
+        self.exams.put(exam.get("examId"), {
+            "questions": self.questions,
+            "total": len(self.questions),
+            "withImage": with_image,
+            "withoutImage": len(self.questions) - with_image,
+        })
+        self.summary["visualQuestions"] += len(self.questions)
+        self.summary["visualQuestionsWithImage"] += with_image
+        self.summary["visualQuestionsWithoutImage"] += len(self.questions) - with_image
+        self.questions = []
+
+    def finish(self, ctx: ReportContext) -> str:
+        self.report.set("summary", self.summary)
+        self.report.close()
+        s = self.summary
+        return f"{s['visualQuestions']} görsel soru, {s['visualQuestionsWithoutImage']} tanesi görselsiz"
+
+
+class MissingImagesAnalyzer(Analyzer):
+    """
+    Every question without an image, with a reusable image from another occurrence of
+    the same question (similarity 1.0) or from its closest near-duplicate.
+    """
+
+    name = "missing-images"
+    outputs = ("analysis/accurate_missing_images_report.json",)
+
+    def begin(self, ctx: ReportContext) -> None:
+        self.report = JsonReportWriter(
+            self.outputs[0], ["totalMissingImages", "examsWithMissingImages", "summary"])
+        self.exams = self.report.stream("examsWithMissingImages", dict)
+        self.total = 0
+        self.exam_count = 0
+        self.questions: List[dict] = []
+        self._donors: Dict[str, Optional[dict]] = {}
+
+    def _donor(self, ctx: ReportContext, norm: str) -> Optional[dict]:
+        """First occurrence of `norm` with an existing main image, in file order."""
+        if norm not in self._donors:
+            donor = None
+            for occ in ctx.index.occurrences(norm):
+                url = ctx.index.question(ctx.data, occ).get("imageUrl")
+                if has_image(url) and ctx.manifest.exists(url):
+                    donor = {"imageUrl": url, "sourceExam": occ.exam_id, "sourceId": occ.question_id}
+                    break
+            self._donors[norm] = donor
+        return self._donors[norm]
+
+    def question(self, ctx: ReportContext, exam: dict, q: dict, ref: QuestionRef) -> None:
+        if has_image(q.get("imageUrl")):
+            return
+        norm = ref.norm
+        donor, score = (self._donor(ctx, norm), 1.0) if norm else (None, 0)
+        if donor is None and norm:
+            for other, sim in ctx.similar_texts(norm):
+                donor, score = self._donor(ctx, other), sim
+                if donor is not None:
+                    break
+        if donor is None:
+            score = 0
+        self.questions.append({
+            "id": q.get("id"),
+            "questionText": q.get("questionText"),
+            "category": q.get("category"),
+            "canUseExistingImage": donor is not None,
+            "existingImage": donor,
+            "similarityScore": score,
+        })
+
+    def end_exam(self, ctx: ReportContext, exam: dict) -> None:
+        self.exam_count += 1
+        if not self.questions:
+            return
+        self.exams.put(exam.get("examId"), {
+            "examName": exam.get("examName"),
+            "missingCount": len(self.questions),
+            "questions": self.questions,
+        })
+        self.total += len(self.questions)
+        self.questions = []
+
+    def finish(self, ctx: ReportContext) -> str:
+        self.report.set("totalMissingImages", self.total)
+        self.report.set("summary", {
+            "totalExams": self.exam_count,
+            "examsWithMissing": self.exams.count,
+            "examsComplete": self.exam_count - self.exams.count,
+        })
+        self.report.close()
+        return f"{self.total} görselsiz soru, {self.exams.count} denemede"
+
+
+class NearDuplicatesAnalyzer(Analyzer):
+    """Clusters come from the shared index, so there is nothing to do per question."""
+
+    name = "near-duplicates"
+    outputs = (NEAR_DUPLICATES_REPORT,)
+
+    def finish(self, ctx: ReportContext) -> str:
+        report = build_report(ctx.data, ctx.index, ctx.near_duplicates)
+        writer = JsonReportWriter(self.outputs[0], ["summary", "clusters"])
+        writer.set("summary", report["summary"])
+        clusters = writer.stream("clusters")
+        for cluster in report["clusters"]:
+            clusters.append(cluster)
+        writer.close()
+        return f"{report['summary']['clusters']} yakın-kopya kümesi"
+
+
+ANALYZERS = [
+    ValidationAnalyzer,
+    RepeatImagesAnalyzer,
+    VisualQuestionsAnalyzer,
+    MissingImagesAnalyzer,
+    NearDuplicatesAnalyzer,
+]
+
+
+# Pipeline --------------------------------------------------------------------
+
+def run(ctx: ReportContext, analyzers: List[Analyzer]) -> Tuple[Dict[str, float], Dict[str, str]]:
+    """One traversal feeding every analyzer; returns per-analyzer seconds and summary lines."""
+    timings = {a.name: 0.0 for a in analyzers}
+    summaries: Dict[str, str] = {}
+    clock = time.perf_counter
+
+    def timed(a: Analyzer, hook, *args):
+        shared_before = sum(ctx.timings.values())
+        start = clock()
+        result = hook(*args)
+        # Shared index builds are reported once on their own, not charged to whoever asked first
+        timings[a.name] += clock() - start - (sum(ctx.timings.values()) - shared_before)
+        return result
+
+    for a in analyzers:
+        timed(a, a.begin, ctx)
+    for exam_pos, exam in enumerate(ctx.data):
+        for question_pos, q in enumerate(exam.get("questions", [])):
+            ref = QuestionRef(exam_pos, question_pos, normalize(q.get("questionText")))
+            for a in analyzers:
+                timed(a, a.question, ctx, exam, q, ref)
+        for a in analyzers:
+            timed(a, a.end_exam, ctx, exam)
+    for a in analyzers:
+        summaries[a.name] = timed(a, a.finish, ctx)
+    return timings, summaries
+
+
+def main() -> int:
+    by_name = {cls.name: cls for cls in ANALYZERS}
+    selected = sys.argv[1:] or list(by_name)
+    unknown = [name for name in selected if name not in by_name]
+    if unknown:
+        print(f"❌ Bilinmeyen analiz: {', '.join(unknown)} (seçenekler: {', '.join(by_name)})")
+        return 1
+    if not os.path.exists(EXAMS_FILE):
+        print(f"❌ Bulunamadı: {EXAMS_FILE}")
+        return 1
+
+    start = time.perf_counter()
+    data, source_hash = load_exams(EXAMS_FILE)
+    ctx = ReportContext(data, source_hash)
+    ctx.timings["exams.json okuma"] = time.perf_counter() - start
+    analyzers = [by_name[name]() for name in selected]
+    timings, summaries = run(ctx, analyzers)
+    total = time.perf_counter() - start
+
+    print(f"📊 {len(analyzers)} analiz, {len(data)} deneme, tek geçiş — {total * 1000:.0f} ms")
+    for label, seconds in ctx.timings.items():
+        print(f"  ⚙️  {label:<18} {seconds * 1000:7.1f} ms")
+    for a in analyzers:
+        print(f"  ✅ {a.name:<18} {timings[a.name] * 1000:7.1f} ms  {summaries[a.name]}")
+        for path in a.outputs:
+            print(f"     📄 {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,11 +7,13 @@ Ayrıca varsa seçenek görsellerini de kaynakla eşler.
 """
 
 from __future__ import annotations
-import json
-import re
 from typing import Dict, List, Tuple
 from pathlib import Path
 
+from exam_store import ExamStore
+from image_refs import report_blast_radius
+from question_index import file_hash, load_index, normalize
+
 EXAMS_FILE = "assets/data/exams.json"
 TARGET_EXAMS = [
     "deneme_sinavi_11",
@@ -22,42 +24,11 @@ TARGET_EXAMS = [
 ]
 
 
-def normalize_text(text: str) -> str:
-    text = text.lower()
-    text = re.sub(r"[^\w\s]", "", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
-
-
-def load() -> List[dict]:
-    with open(EXAMS_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def save(data: List[dict]) -> None:
-    with open(EXAMS_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-
 def build_source_map(data: List[dict]) -> Dict[str, Tuple[str, Dict[str, str]]]:
-    source: Dict[str, Tuple[str, Dict[str, str]]] = {}
-    for exam in data:
-        if exam.get("examId") in TARGET_EXAMS:
-            continue
-        for q in exam.get("questions", []):
-            qt = q.get("questionText", "")
-            if not qt:
-                continue
-            norm = normalize_text(qt)
-            img = q.get("imageUrl")
-            if not img or img == "null":
-                continue
-            opt_imgs: Dict[str, str] = {}
-            for k, v in (q.get("options", {}) or {}).items():
-                if isinstance(v, dict) and v.get("imageUrl"):
-                    opt_imgs[k] = v["imageUrl"]
-            source[norm] = (img, opt_imgs)
-    return source
+    index = load_index(data, file_hash(EXAMS_FILE))
+    return index.image_sources(
+        data, include=lambda exam_id: exam_id not in TARGET_EXAMS, require_main_image=True
+    )
 
 
 def canonicalize(data: List[dict], source_map: Dict[str, Tuple[str, Dict[str, str]]]) -> dict:
@@ -74,7 +45,7 @@ def canonicalize(data: List[dict], source_map: Dict[str, Tuple[str, Dict[str, st
             continue
         for q in exam.get("questions", []):
             qt = q.get("questionText", "")
-            norm = normalize_text(qt)
+            norm = normalize(qt)
             if norm not in source_map:
                 continue
             src_img, src_opt_imgs = source_map[norm]
@@ -119,12 +90,14 @@ def main() -> int:
     if not Path(EXAMS_FILE).exists():
         print(f"❌ Bulunamadı: {EXAMS_FILE}")
         return 1
-    data = load()
+    store = ExamStore(EXAMS_FILE)
+    data = store.data
     source_map = build_source_map(data)
     print(f"🔍 Kaynak soru-görsel eşleşmeleri: {len(source_map)}")
     stats = canonicalize(data, source_map)
     if stats["questions_canonicalized"] > 0:
-        save(data)
+        report_blast_radius(store)
+        store.save("canonicalize_images_11_15")
         print("✅ exams.json güncellendi")
     else:
         print("ℹ️ Güncelleme gerekmedi")
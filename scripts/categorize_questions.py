@@ -3,31 +3,51 @@
 Script to categorize questions based on their content.
 Categories:
 - Trafik ve Çevre Bilgisi
-- Trafik İşaretleri  
+- Trafik İşaretleri
 - İlk Yardım
 - Motor ve Araç Tekniği
 - Trafik Adabı
+
+The keyword lists are compiled once into a single regex that reports every keyword
+occurrence, overlapping ones included, in one pass over the text. A question goes
+to the category with the most hits; ties go to the category listed first in
+CATEGORY_KEYWORDS, which is the order the old first-match loop checked them in.
+
+Batch mode scores every question of exams.json and the given import files and
+writes a confidence report: per-question scores, the winning category, ties and
+questions whose stored category disagrees with the computed one. Scores are kept
+in .cache/category_state.json by question text hash, so unchanged questions are
+not rescanned; large batches are split across a process pool.
+
+Usage:
+    python3 scripts/categorize_questions.py              # categorize imported_questions.json
+    python3 scripts/categorize_questions.py --batch [FILE ...] [--apply]
+    python3 scripts/categorize_questions.py --benchmark  # matcher vs. per-keyword scans
 """
 
+import argparse
+import hashlib
 import json
 import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-def categorize_question(question_text, options_text=""):
-    """Determine the category based on question content."""
-    text = (question_text + " " + options_text).lower()
-    
-    # İlk Yardım keywords
-    ilk_yardim_keywords = [
+from exam_store import ExamStore
+
+DEFAULT_CATEGORY = "Trafik ve Çevre Bilgisi"
+
+# In order of specificity: earlier categories win ties
+CATEGORY_KEYWORDS = {
+    "İlk Yardım": [
         "ilk yardım", "kazazede", "yaralı", "kanama", "kırık", "yanık",
         "şok", "bilinç", "solunum", "nabız", "kalp", "turnike", "sargı",
         "112", "ambulans", "hastane", "tedavi", "hayat kurtarma", "boğulma",
         "zehirlenme", "sara", "epilepsi", "bayılma", "suni solunum", "kalp masajı",
         "abc", "yaşam zinciri", "travma", "omurga", "boyun", "koma",
         "göğüs ağrısı", "nefes darlığı", "alerjik", "anafilaksi"
-    ]
-    
-    # Motor ve Araç Tekniği keywords
-    motor_keywords = [
+    ],
+    "Motor ve Araç Tekniği": [
         "motor", "fren", "lastik", "akü", "yağ", "yakıt", "benzin", "dizel",
         "debriyaj", "vites", "şanzıman", "süspansiyon", "amortisör", "direksiyon",
         "far", "lambası", "sinyal", "silecek", "ayna", "kaporta", "şasi",
@@ -37,90 +57,402 @@ def categorize_question(question_text, options_text=""):
         "conta", "piston", "silindir", "subap", "krank", "kam mili",
         "diferansiyel", "şaft", "aks", "bijon", "jant", "teker",
         "cc", "beygir", "güç", "tork", "hız", "devir"
-    ]
-    
-    # Trafik İşaretleri keywords
-    isaret_keywords = [
+    ],
+    "Trafik İşaretleri": [
         "işaret", "levha", "şekil", "tabela", "ışık", "sinyal",
         "kırmızı", "yeşil", "sarı", "yanıp", "dur", "dikkat", "uyarı",
         "yasak", "mecburi", "bilgi", "yön", "ok", "şerit", "geçiş",
         "yaya", "okul", "hastane", "kavşak", "dönüş", "viraj",
         "eğim", "tümsek", "çukur", "kaygan", "buzlanma", "taş düşebilir"
-    ]
-    
-    # Trafik Adabı keywords
-    adab_keywords = [
+    ],
+    "Trafik Adabı": [
         "saygı", "hoşgörü", "sabır", "nezaket", "adab", "davranış",
         "stres", "öfke", "agresif", "sakin", "dikkatli", "dikkatsiz",
         "alkol", "uyuşturucu", "ilaç", "yorgunluk", "uyku", "uykusuzluk",
         "dikkat dağınıklığı", "telefon", "cep telefonu", "mesaj",
         "empati", "anlayış", "paylaşım", "yol verme", "geçiş hakkı",
         "öncelik", "makas", "korna", "kornaya", "selektör"
-    ]
-    
-    # Check categories in order of specificity
-    for keyword in ilk_yardim_keywords:
-        if keyword in text:
-            return "İlk Yardım"
-    
-    for keyword in motor_keywords:
-        if keyword in text:
-            return "Motor ve Araç Tekniği"
-    
-    for keyword in isaret_keywords:
-        if keyword in text:
-            return "Trafik İşaretleri"
-    
-    for keyword in adab_keywords:
-        if keyword in text:
-            return "Trafik Adabı"
-    
-    # Default category
-    return "Trafik ve Çevre Bilgisi"
+    ],
+}
+
+CATEGORIES = [DEFAULT_CATEGORY] + list(CATEGORY_KEYWORDS)
+
+EXAMS_FILE = "assets/data/exams.json"
+IMPORTED_FILE = "assets/data/imported_questions.json"
+OUTPUT_REPORT = "analysis/category_report.json"
+STATE_FILE = ".cache/category_state.json"
+
+# Batches smaller than this are scored in-process; pool start-up would dominate
+PARALLEL_THRESHOLD = 5000
+CHUNK_SIZE = 500
+
+# Cached scores are only valid for the keyword lists they were computed with
+KEYWORDS_VERSION = hashlib.sha256(
+    json.dumps(CATEGORY_KEYWORDS, ensure_ascii=False).encode("utf-8")
+).hexdigest()[:16]
+
+
+def trie_pattern(keywords):
+    """
+    Regex source matching any of `keywords`, factored into a prefix trie.
+
+    A flat `kw1|kw2|...` makes the engine retry every alternative at each
+    position; nesting alternatives by shared prefix means one character test
+    rules out a whole subtree. Quantifiers are greedy, so the longest keyword
+    at a position wins.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    All-occurrence multi-keyword matcher on top of one compiled regex.
+
+    The trie pattern sits inside a lookahead, so the regex engine tries it at
+    every position of the text and reports the longest keyword starting there.
+    Every shorter keyword that is a prefix of it (e.g. "kalp" inside "kalp
+    masajı") also starts there, so those are precomputed per keyword. Together
+    this yields the same hits as testing each keyword separately, like an
+    Aho-Corasick automaton, but without a per-character loop in Python.
+    """
+
+    def __init__(self, category_keywords):
+        self.categories = list(category_keywords)
+        owners = {}
+        for category, keywords in category_keywords.items():
+            for keyword in keywords:
+                owners.setdefault(keyword, [])
+                if category not in owners[keyword]:
+                    owners[keyword].append(category)
+        keywords = list(owners)
+        self.keywords = keywords
+        self._pattern = re.compile("(?=(" + trie_pattern(keywords) + "))")
+        # keyword matched at a position -> categories of it and every keyword that prefixes it
+        self._hits = {
+            k: [c for p in keywords if k.startswith(p) for c in owners[p]]
+            for k in keywords
+        }
+
+    def scores(self, text):
+        """Number of keyword hits per category in an already lowercased text."""
+        counts = dict.fromkeys(self.categories, 0)
+        hits = self._hits
+        for keyword in self._pattern.findall(text):
+            for category in hits[keyword]:
+                counts[category] += 1
+        return counts
+
+    def matches(self, text):
+        """(position, keyword) for the longest keyword starting at each position where one does."""
+        for m in self._pattern.finditer(text):
+            yield m.start(), m.group(1)
+
+    def groups(self, keyword):
+        """Categories hit when `keyword` is the longest match at a position."""
+        return self._hits[keyword]
+
+
+MATCHER = KeywordMatcher(CATEGORY_KEYWORDS)
+
+
+def question_text(question):
+    """Question text followed by the text of every option, as categorization input."""
+    options_text = ""
+    if "options" in question:
+        for key, value in question["options"].items():
+            if isinstance(value, str):
+                options_text += " " + value
+            elif isinstance(value, dict) and "text" in value:
+                options_text += " " + value["text"]
+    return question.get("questionText") or "", options_text
+
+
+def category_scores(question_text, options_text=""):
+    """Per-category keyword hit counts for a question."""
+    return MATCHER.scores((question_text + " " + options_text).lower())
+
+
+def pick_category(scores):
+    """Category with the most hits, earlier categories winning ties; the default if none hit."""
+    best = max(scores.values(), default=0)
+    if best == 0:
+        return DEFAULT_CATEGORY
+    return next(c for c in MATCHER.categories if scores[c] == best)
+
+
+def categorize_question(question_text, options_text=""):
+    """Determine the category based on question content."""
+    return pick_category(category_scores(question_text, options_text))
+
+
+# Batch mode ----------------------------------------------------------------
+
+def tied_categories(scores):
+    """Categories sharing the top score, if more than one does."""
+    best = max(scores.values(), default=0)
+    tied = [c for c in MATCHER.categories if scores[c] == best] if best else []
+    return tied if len(tied) > 1 else []
+
+
+def text_hash(q_text, o_text):
+    return hashlib.sha256(f"{q_text}\x00{o_text}".encode("utf-8")).hexdigest()
+
+
+def iter_questions(data):
+    """(examId, question) for an exams file (list of exams) or an import file (list of questions)."""
+    for item in data:
+        if isinstance(item, dict) and "questions" in item:
+            for q in item["questions"]:
+                yield item.get("examId"), q
+        else:
+            yield None, item
+
+
+def _score_chunk(texts):
+    return [category_scores(q_text, o_text) for q_text, o_text in texts]
+
+
+def score_texts(texts, workers=None):
+    """category_scores for every (question, options) pair, on a process pool for large batches."""
+    if len(texts) < PARALLEL_THRESHOLD or workers == 1:
+        return _score_chunk(texts)
+    chunks = [texts[i:i + CHUNK_SIZE] for i in range(0, len(texts), CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [scores for chunk in pool.map(_score_chunk, chunks) for scores in chunk]
+
+
+def load_state():
+    if not os.path.exists(STATE_FILE):
+        return {}
+    with open(STATE_FILE, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("keywordsVersion") != KEYWORDS_VERSION:
+        return {}
+    return state.get("scores", {})
+
+
+def save_state(scores_by_hash):
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp_path = STATE_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"keywordsVersion": KEYWORDS_VERSION, "scores": scores_by_hash},
+                  f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, STATE_FILE)
+
+
+def categorize_batch(paths, apply=False, workers=None, report_path=OUTPUT_REPORT):
+    files = []
+    stores = {}
+    for path in paths:
+        if os.path.abspath(path) == os.path.abspath(EXAMS_FILE):
+            stores[path] = ExamStore(path)
+            files.append((path, stores[path].data))
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            files.append((path, json.load(f)))
+
+    entries = []
+    for path, data in files:
+        for exam_id, q in iter_questions(data):
+            q_text, o_text = question_text(q)
+            entries.append((path, exam_id, q, text_hash(q_text, o_text), (q_text, o_text)))
+
+    cached = load_state()
+    pending = {}
+    for _, _, _, digest, texts in entries:
+        if digest not in cached:
+            pending.setdefault(digest, texts)
+    start = time.perf_counter()
+    computed = score_texts(list(pending.values()), workers)
+    elapsed = time.perf_counter() - start
+    scores_by_hash = {digest: cached[digest] for _, _, _, digest, _ in entries if digest in cached}
+    scores_by_hash.update(zip(pending, computed))
+
+    rows = []
+    distribution = dict.fromkeys(CATEGORIES, 0)
+    changed_files = set()
+    for path, exam_id, q, digest, _ in entries:
+        scores = scores_by_hash[digest]
+        category = pick_category(scores)
+        stored = q.get("category")
+        distribution[category] += 1
+        rows.append({
+            "file": path,
+            "examId": exam_id,
+            "questionId": q.get("id"),
+            "scores": scores,
+            "category": category,
+            "storedCategory": stored,
+            "tie": tied_categories(scores),
+            "disagrees": stored is not None and stored != category,
+        })
+        if apply and stored != category:
+            q["category"] = category
+            changed_files.add(path)
+
+    for path, data in files:
+        if path in stores:
+            stores[path].save("categorize_questions")
+        elif path in changed_files:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+    save_state(scores_by_hash)
+    # Cache statistics depend on .cache/category_state.json, so they are printed, not reported
+    scored = len(pending)
+    skipped = len(rows) - sum(1 for *_, d, _ in entries if d in pending)
+
+    report = {
+        "summary": {
+            "files": [path for path, _ in files],
+            "questions": len(rows),
+            "ties": sum(1 for r in rows if r["tie"]),
+            "disagreements": sum(1 for r in rows if r["disagrees"]),
+            "uncategorized": sum(1 for r in rows if r["storedCategory"] is None),
+            "distribution": distribution,
+            "applied": apply,
+        },
+        "questions": rows,
+    }
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    s = report["summary"]
+    print(f"🔍 {s['questions']} soru: {scored} farklı metin puanlandı ({elapsed * 1000:.0f} ms), "
+          f"{skipped} soru değişmediği için atlandı")
+    print(f"  - Beraberlik: {s['ties']}")
+    print(f"  - Kayıtlı kategoriden farklı: {s['disagreements']}")
+    for cat, count in distribution.items():
+        print(f"  - {cat}: {count} soru")
+    if apply:
+        print(f"✅ Güncellenen dosyalar: {', '.join(sorted(changed_files)) or 'yok'}")
+    print(f"📄 Rapor: {report_path}")
+
+
+# Benchmark -----------------------------------------------------------------
+
+def _legacy_categorize_question(question_text, options_text=""):
+    # The previous implementation: lists rebuilt per call, one substring scan
+    # per keyword, first matching category wins.
+    text = (question_text + " " + options_text).lower()
+    category_keywords = {c: list(k) for c, k in CATEGORY_KEYWORDS.items()}
+    for category, keywords in category_keywords.items():
+        for keyword in keywords:
+            if keyword in text:
+                return category
+    return DEFAULT_CATEGORY
+
+
+def _scan_scores(question_text, options_text=""):
+    # Scoring with one str.count scan per keyword, the straightforward alternative.
+    # str.count skips overlapping occurrences ("yaya" twice in "yayaya"), the matcher does not.
+    text = (question_text + " " + options_text).lower()
+    counts = dict.fromkeys(CATEGORY_KEYWORDS, 0)
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        for keyword in keywords:
+            counts[category] += text.count(keyword)
+    return counts
+
+
+def run_benchmark(corpora, repeat=20):
+    for name, questions in corpora:
+        inputs = [question_text(q) for q in questions]
+        print(f"⏱️  {name}: {len(inputs)} soru x {repeat} tekrar")
+        for label, fn in [
+            ("ilk eşleşme (eski)", _legacy_categorize_question),
+            ("anahtar başına sayım", _scan_scores),
+            ("tek geçiş (trie regex)", category_scores),
+        ]:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for q_text, o_text in inputs:
+                    fn(q_text, o_text)
+            print(f"  - {label:<24} {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+        count_mismatches = sum(
+            1 for q_text, o_text in inputs
+            if category_scores(q_text, o_text) != _scan_scores(q_text, o_text)
+        )
+        changed = sum(
+            1 for q_text, o_text in inputs
+            if categorize_question(q_text, o_text) != _legacy_categorize_question(q_text, o_text)
+        )
+        print(f"  - anahtar başına sayımdan farklı puan: {count_mismatches}")
+        print(f"  - puanlamayla kategorisi değişen soru: {changed}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Categorize questions by keyword hits.")
+    parser.add_argument("--batch", nargs="*", metavar="FILE",
+                        help=f"score {EXAMS_FILE} and these import files and write a report")
+    parser.add_argument("--apply", action="store_true", help="with --batch, store the computed categories")
+    parser.add_argument("--workers", type=int, help="process pool size for large batches")
+    parser.add_argument("--report", default=OUTPUT_REPORT)
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.batch is not None:
+        paths = [EXAMS_FILE] + [p for p in args.batch if p != EXAMS_FILE]
+        missing = [p for p in paths if not os.path.exists(p)]
+        if missing:
+            print(f"❌ Bulunamadı: {', '.join(missing)}")
+            return 1
+        categorize_batch(paths, apply=args.apply, workers=args.workers, report_path=args.report)
+        return 0
+
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
-    
+
     imported_path = os.path.join(project_root, "assets", "data", "imported_questions.json")
-    
+
     with open(imported_path, "r", encoding="utf-8") as f:
         questions = json.load(f)
-    
-    categorized_count = {
-        "Trafik ve Çevre Bilgisi": 0,
-        "Trafik İşaretleri": 0,
-        "İlk Yardım": 0,
-        "Motor ve Araç Tekniği": 0,
-        "Trafik Adabı": 0
-    }
-    
+
+    if args.benchmark:
+        with open(os.path.join(project_root, "assets", "data", "exams.json"), "r", encoding="utf-8") as f:
+            exams = json.load(f)
+        run_benchmark([
+            ("imported_questions.json", questions),
+            ("exams.json", [q for exam in exams for q in exam.get("questions", [])]),
+        ])
+        return 0
+
+    categorized_count = dict.fromkeys(CATEGORIES, 0)
+
     for question in questions:
         # Combine question text and options for better categorization
-        options_text = ""
-        if "options" in question:
-            for key, value in question["options"].items():
-                if isinstance(value, str):
-                    options_text += " " + value
-                elif isinstance(value, dict) and "text" in value:
-                    options_text += " " + value["text"]
-        
-        category = categorize_question(question.get("questionText", ""), options_text)
+        category = categorize_question(*question_text(question))
         question["category"] = category
         categorized_count[category] += 1
-    
+
     # Save updated questions
     with open(imported_path, "w", encoding="utf-8") as f:
-        json.dump(questions, f, ensure_ascii=False, indent=4)
-    
+        json.dump(questions, f, ensure_ascii=False, indent=2)
+
     print("Kategorilendirme tamamlandı!")
     print("\nKategori dağılımı:")
     for cat, count in categorized_count.items():
         print(f"  - {cat}: {count} soru")
-    
+
     print(f"\nToplam: {len(questions)} soru güncellendi.")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
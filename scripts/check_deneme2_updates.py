@@ -1,16 +1,8 @@
 #!/usr/bin/env python3
-import json
+from exam_shards import ExamLoader
 
-# JSON dosyasını yükle
-with open('assets/data/exams.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
-
-# Deneme 2'yi bul
-deneme2 = None
-for exam in data:
-    if exam.get('examId') == 'deneme_sinavi_2':
-        deneme2 = exam
-        break
+# Deneme 2'yi yükle (manifest varsa yalnızca bu deneme okunur)
+deneme2 = ExamLoader().load('deneme_sinavi_2')
 
 if deneme2:
     print("🎯 Deneme 2 Güncellemeleri:")
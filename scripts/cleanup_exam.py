@@ -1,6 +1,7 @@
-import json
 import os
 
+from exam_store import ExamStore, RemoveExam
+
 EXAMS_FILE = 'assets/data/exams.json'
 
 def remove_exam(exam_id_to_remove):
@@ -8,16 +9,10 @@ def remove_exam(exam_id_to_remove):
         return
 
     try:
-        with open(EXAMS_FILE, 'r', encoding='utf-8') as f:
-            exams = json.load(f)
-        
-        initial_count = len(exams)
-        exams = [e for e in exams if e['examId'] != exam_id_to_remove]
-        final_count = len(exams)
+        store = ExamStore(EXAMS_FILE)
 
-        if initial_count != final_count:
-            with open(EXAMS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(exams, f, ensure_ascii=False, indent=2)
+        if store.apply([RemoveExam(exam_id_to_remove)]):
+            store.save(f"cleanup_exam: {exam_id_to_remove}")
             print(f"Removed exam '{exam_id_to_remove}'.")
         else:
             print(f"Exam '{exam_id_to_remove}' not found.")
@@ -0,0 +1,610 @@
+#!/usr/bin/env python3
+"""
+SQLite build of the app content: exams.json, traffic_signs.json and study_guides.json.
+
+The app and every script parse the JSON files from scratch, and text search is a
+linear scan. This compiles the three files into one database with a table per
+record type, indexes on examId, category and image path, and contentless FTS5
+tables over text folded with Turkish casing rules (question_index.search_fold), so
+lookups and searches become index probes. As in exam_snapshot.py, every object keeps
+its key order in "shape" (a JSON array of keys) and anything outside the fixed
+columns in "extra" (JSON), so `verify` rebuilds each source file byte for byte.
+
+Tables (row ids follow source order):
+
+    meta             key, value: schema version and sha256 of each source file
+    exams            exam_id, exam_name
+    questions        exam -> exams, question_id, question_text, image_url,
+                     correct_answer_key, explanation, category
+    options          question -> questions, key, text, image_url
+    sign_categories  category_name
+    signs            category -> sign_categories, sign_id, name, image_url, description
+    guides           category, title
+    guide_blocks     guide -> guides, type, text, image_url
+    question_fts     question_text, options, explanation (rowid = questions.id)
+    sign_fts         name, description (rowid = signs.id)
+    guide_fts        text (rowid = guide_blocks.id)
+    image_usage      view: path, source, row for every imageUrl
+
+A NULL shape marks a value that is not an object: a bare string is kept in the
+text column and anything else whole in extra.
+
+Usage:
+    python3 scripts/content_db.py build              # -> .cache/content.db
+    python3 scripts/content_db.py verify             # rebuild the JSON files from the DB and compare,
+                                                     # plus a round trip of a fixture with odd keys
+    python3 scripts/content_db.py search dönel kavşak
+    python3 scripts/content_db.py benchmark          # cold load and query latency vs. the JSON path
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from image_refs import GUIDES_FILE, SIGNS_FILE
+from question_index import EXAMS_FILE, search_fold
+
+DB_FILE = ".cache/content.db"
+DB_VERSION = 2
+
+SOURCES = (("exams", EXAMS_FILE), ("signs", SIGNS_FILE), ("guides", GUIDES_FILE))
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE exams (id INTEGER PRIMARY KEY, exam_id TEXT, exam_name TEXT, shape TEXT, extra TEXT);
+CREATE TABLE questions (
+    id INTEGER PRIMARY KEY, exam INTEGER REFERENCES exams(id), question_id INTEGER,
+    question_text TEXT, image_url TEXT, correct_answer_key TEXT, explanation TEXT, category TEXT,
+    shape TEXT, extra TEXT);
+CREATE TABLE options (
+    id INTEGER PRIMARY KEY, question INTEGER REFERENCES questions(id), key TEXT,
+    text TEXT, image_url TEXT, shape TEXT, extra TEXT);
+CREATE TABLE sign_categories (id INTEGER PRIMARY KEY, category_name TEXT, shape TEXT, extra TEXT);
+CREATE TABLE signs (
+    id INTEGER PRIMARY KEY, category INTEGER REFERENCES sign_categories(id), sign_id TEXT,
+    name TEXT, image_url TEXT, description TEXT, shape TEXT, extra TEXT);
+CREATE TABLE guides (id INTEGER PRIMARY KEY, category TEXT, title TEXT, shape TEXT, extra TEXT);
+CREATE TABLE guide_blocks (
+    id INTEGER PRIMARY KEY, guide INTEGER REFERENCES guides(id), type TEXT, text TEXT,
+    image_url TEXT, shape TEXT, extra TEXT);
+
+CREATE INDEX idx_exams_exam_id ON exams(exam_id);
+CREATE INDEX idx_questions_exam ON questions(exam);
+CREATE INDEX idx_questions_category ON questions(category);
+CREATE INDEX idx_questions_image ON questions(image_url);
+CREATE INDEX idx_options_question ON options(question);
+CREATE INDEX idx_options_image ON options(image_url);
+CREATE INDEX idx_signs_category ON signs(category);
+CREATE INDEX idx_signs_image ON signs(image_url);
+CREATE INDEX idx_guides_category ON guides(category);
+CREATE INDEX idx_guide_blocks_guide ON guide_blocks(guide);
+CREATE INDEX idx_guide_blocks_image ON guide_blocks(image_url);
+
+CREATE VIRTUAL TABLE question_fts USING fts5(
+    question_text, options, explanation, content='', tokenize='unicode61 remove_diacritics 2');
+CREATE VIRTUAL TABLE sign_fts USING fts5(
+    name, description, content='', tokenize='unicode61 remove_diacritics 2');
+CREATE VIRTUAL TABLE guide_fts USING fts5(text, content='', tokenize='unicode61 remove_diacritics 2');
+
+CREATE VIEW image_usage AS
+    SELECT image_url AS path, 'question' AS source, id AS row FROM questions WHERE image_url IS NOT NULL
+    UNION ALL SELECT image_url, 'option', id FROM options WHERE image_url IS NOT NULL
+    UNION ALL SELECT image_url, 'sign', id FROM signs WHERE image_url IS NOT NULL
+    UNION ALL SELECT image_url, 'guide', id FROM guide_blocks WHERE image_url IS NOT NULL;
+"""
+
+# (JSON key, column type); columns are stored in this order after the parent id
+EXAM_COLUMNS = (("examId", str), ("examName", str))
+QUESTION_COLUMNS = (("id", int), ("questionText", str), ("imageUrl", str), ("correctAnswerKey", str),
+                    ("explanation", str), ("category", str))
+OPTION_COLUMNS = (("text", str), ("imageUrl", str))
+CATEGORY_COLUMNS = (("categoryName", str),)
+SIGN_COLUMNS = (("id", str), ("name", str), ("imageUrl", str), ("description", str))
+GUIDE_COLUMNS = (("category", str), ("title", str))
+BLOCK_COLUMNS = (("type", str), ("text", str), ("imageUrl", str))
+
+_FTS_TERM = re.compile(r"\w+")
+
+
+def _fits(value: Any, kind: type) -> bool:
+    return value is None or (isinstance(value, kind) and not isinstance(value, bool))
+
+
+def _split(value: Any, columns: Sequence[Tuple[str, type]], child: Optional[Tuple[str, type]] = None,
+           bare_text: bool = False) -> Tuple[list, Optional[str], Optional[str], bool]:
+    """(column values, shape, extra, has children) for one JSON value."""
+    row: list = [None] * len(columns)
+    if not isinstance(value, dict):
+        if bare_text and isinstance(value, str):
+            return [value if key == "text" else None for key, _ in columns], None, None, False
+        return row, None, json.dumps(value, ensure_ascii=False), False
+    extra: Dict[str, Any] = {}
+    for i, (key, kind) in enumerate(columns):
+        if key in value:
+            if _fits(value[key], kind):
+                row[i] = value[key]
+            else:
+                extra[key] = value[key]
+    for key, item in value.items():
+        if all(key != name for name, _ in columns) and (child is None or key != child[0]):
+            extra[key] = item
+    has_children = child is not None and child[0] in value
+    if has_children and not isinstance(value[child[0]], child[1]):
+        extra[child[0]], has_children = value[child[0]], False
+    shape = json.dumps(list(value), ensure_ascii=False)
+    return row, shape, json.dumps(extra, ensure_ascii=False) if extra else None, has_children
+
+
+def _join(row: Sequence[Any], shape: Optional[str], extra: Optional[str],
+          columns: Sequence[Tuple[str, type]], children: Optional[Tuple[str, Any]] = None) -> Any:
+    """Inverse of _split: the JSON value for one stored row."""
+    if shape is None:
+        if extra is not None:
+            return json.loads(extra)
+        return row[[key for key, _ in columns].index("text")]
+    values = {key: row[i] for i, (key, _) in enumerate(columns)}
+    if children is not None:
+        values[children[0]] = children[1]
+    if extra is not None:
+        values.update(json.loads(extra))
+    return {key: values[key] for key in json.loads(shape)}
+
+
+def _text(value: Any) -> str:
+    return value if isinstance(value, str) else ""
+
+
+def _option_text(value: Any) -> str:
+    return _text(value.get("text") if isinstance(value, dict) else value)
+
+
+# Build -----------------------------------------------------------------------
+
+def _read_sources(sources: Sequence[Tuple[str, str]] = SOURCES) -> Dict[str, Tuple[bytes, Any]]:
+    loaded = {}
+    for name, path in sources:
+        with open(path, "rb") as f:
+            raw = f.read()
+        loaded[name] = (raw, json.loads(raw))
+    return loaded
+
+
+def _write(conn: sqlite3.Connection, loaded: Dict[str, Tuple[bytes, Any]]) -> Dict[str, int]:
+    exams, questions, options, question_fts = [], [], [], []
+    for exam in loaded["exams"][1]:
+        row, shape, extra, has_questions = _split(exam, EXAM_COLUMNS, ("questions", list))
+        exam_row = len(exams) + 1
+        exams.append((exam_row, *row, shape, extra))
+        for q in exam["questions"] if has_questions else []:
+            row, shape, extra, has_options = _split(q, QUESTION_COLUMNS, ("options", dict))
+            q_row = len(questions) + 1
+            questions.append((q_row, exam_row, *row, shape, extra))
+            option_texts = []
+            for key, value in q["options"].items() if has_options else []:
+                row, shape, extra, _ = _split(value, OPTION_COLUMNS, bare_text=True)
+                options.append((len(options) + 1, q_row, key, *row, shape, extra))
+                option_texts.append(_option_text(value))
+            if isinstance(q, dict):
+                question_fts.append((q_row, search_fold(_text(q.get("questionText"))),
+                                     search_fold(" ".join(option_texts)),
+                                     search_fold(_text(q.get("explanation")))))
+
+    categories, signs, sign_fts = [], [], []
+    for category in loaded["signs"][1]:
+        row, shape, extra, has_signs = _split(category, CATEGORY_COLUMNS, ("signs", list))
+        category_row = len(categories) + 1
+        categories.append((category_row, *row, shape, extra))
+        for sign in category["signs"] if has_signs else []:
+            row, shape, extra, _ = _split(sign, SIGN_COLUMNS)
+            sign_row = len(signs) + 1
+            signs.append((sign_row, category_row, *row, shape, extra))
+            sign_fts.append((sign_row, search_fold(_text(row[1])), search_fold(_text(row[3]))))
+
+    guides, blocks, guide_fts = [], [], []
+    for guide in loaded["guides"][1]:
+        row, shape, extra, has_content = _split(guide, GUIDE_COLUMNS, ("content", list))
+        guide_row = len(guides) + 1
+        guides.append((guide_row, *row, shape, extra))
+        for block in guide["content"] if has_content else []:
+            row, shape, extra, _ = _split(block, BLOCK_COLUMNS, bare_text=True)
+            block_row = len(blocks) + 1
+            blocks.append((block_row, guide_row, *row, shape, extra))
+            if row[1]:
+                guide_fts.append((block_row, search_fold(row[1])))
+
+    conn.executescript(SCHEMA)
+    conn.executemany("INSERT INTO exams VALUES (?, ?, ?, ?, ?)", exams)
+    conn.executemany("INSERT INTO questions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", questions)
+    conn.executemany("INSERT INTO options VALUES (?, ?, ?, ?, ?, ?, ?)", options)
+    conn.executemany("INSERT INTO sign_categories VALUES (?, ?, ?, ?)", categories)
+    conn.executemany("INSERT INTO signs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", signs)
+    conn.executemany("INSERT INTO guides VALUES (?, ?, ?, ?, ?)", guides)
+    conn.executemany("INSERT INTO guide_blocks VALUES (?, ?, ?, ?, ?, ?, ?)", blocks)
+    conn.executemany("INSERT INTO question_fts(rowid, question_text, options, explanation) VALUES (?, ?, ?, ?)",
+                     question_fts)
+    conn.executemany("INSERT INTO sign_fts(rowid, name, description) VALUES (?, ?, ?)", sign_fts)
+    conn.executemany("INSERT INTO guide_fts(rowid, text) VALUES (?, ?)", guide_fts)
+    for table in ("question_fts", "sign_fts", "guide_fts"):
+        conn.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+    meta = [("version", str(DB_VERSION))]
+    meta += [(f"{name}Hash", hashlib.sha256(raw).hexdigest()) for name, (raw, _) in loaded.items()]
+    conn.executemany("INSERT INTO meta VALUES (?, ?)", meta)
+    conn.execute("ANALYZE")
+    conn.commit()
+    return {"exams": len(exams), "questions": len(questions), "options": len(options),
+            "signs": len(signs), "guides": len(guides), "guideBlocks": len(blocks)}
+
+
+def build(db_file: str = DB_FILE, sources: Sequence[Tuple[str, str]] = SOURCES) -> Dict[str, int]:
+    loaded = _read_sources(sources)
+    os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+    tmp_path = db_file + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        counts = _write(conn, loaded)
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_file)
+    return counts
+
+
+def _meta(conn: sqlite3.Connection) -> Dict[str, str]:
+    try:
+        return dict(conn.execute("SELECT key, value FROM meta"))
+    except sqlite3.DatabaseError:
+        return {}
+
+
+def has_current_schema(conn: sqlite3.Connection) -> bool:
+    """True if the database was written by this DB_VERSION, so export() can read it."""
+    return _meta(conn).get("version") == str(DB_VERSION)
+
+
+def is_current(conn: sqlite3.Connection, sources: Sequence[Tuple[str, str]] = SOURCES) -> bool:
+    meta = _meta(conn)
+    if meta.get("version") != str(DB_VERSION):
+        return False
+    for name, path in sources:
+        with open(path, "rb") as f:
+            if meta.get(f"{name}Hash") != hashlib.sha256(f.read()).hexdigest():
+                return False
+    return True
+
+
+def connect(db_file: str = DB_FILE, sources: Sequence[Tuple[str, str]] = SOURCES) -> sqlite3.Connection:
+    """Connection to the database, rebuilt first when any source file changed."""
+    if os.path.exists(db_file):
+        conn = sqlite3.connect(db_file)
+        if is_current(conn, sources):
+            return conn
+        conn.close()
+    build(db_file, sources)
+    return sqlite3.connect(db_file)
+
+
+# Export ----------------------------------------------------------------------
+
+def _grouped(conn: sqlite3.Connection, sql: str) -> Dict[int, list]:
+    groups: Dict[int, list] = {}
+    for parent, *rest in conn.execute(sql):
+        groups.setdefault(parent, []).append(rest)
+    return groups
+
+
+def export(conn: sqlite3.Connection) -> Tuple[List[Any], List[Any], List[Any]]:
+    """(exams, signs, guides) rebuilt from the database in source order."""
+    options: Dict[int, Dict[str, Any]] = {}
+    for question, key, text, image, shape, extra in conn.execute(
+            "SELECT question, key, text, image_url, shape, extra FROM options ORDER BY id"):
+        options.setdefault(question, {})[key] = _join((text, image), shape, extra, OPTION_COLUMNS)
+    questions = _grouped(conn, "SELECT exam, id, question_id, question_text, image_url, correct_answer_key, "
+                               "explanation, category, shape, extra FROM questions ORDER BY id")
+    exams = [
+        _join(row, shape, extra, EXAM_COLUMNS, ("questions", [
+            _join(q_row, q_shape, q_extra, QUESTION_COLUMNS, ("options", options.get(q_id, {})))
+            for q_id, *q_row, q_shape, q_extra in questions.get(exam_id, [])
+        ]))
+        for exam_id, *row, shape, extra in conn.execute(
+            "SELECT id, exam_id, exam_name, shape, extra FROM exams ORDER BY id")
+    ]
+
+    signs = _grouped(conn, "SELECT category, sign_id, name, image_url, description, shape, extra "
+                           "FROM signs ORDER BY id")
+    categories = [
+        _join(row, shape, extra, CATEGORY_COLUMNS, ("signs", [
+            _join(s_row, s_shape, s_extra, SIGN_COLUMNS) for *s_row, s_shape, s_extra in signs.get(cat_id, [])
+        ]))
+        for cat_id, *row, shape, extra in conn.execute(
+            "SELECT id, category_name, shape, extra FROM sign_categories ORDER BY id")
+    ]
+
+    blocks = _grouped(conn, "SELECT guide, type, text, image_url, shape, extra FROM guide_blocks ORDER BY id")
+    guides = [
+        _join(row, shape, extra, GUIDE_COLUMNS, ("content", [
+            _join(b_row, b_shape, b_extra, BLOCK_COLUMNS) for *b_row, b_shape, b_extra in blocks.get(guide_id, [])
+        ]))
+        for guide_id, *row, shape, extra in conn.execute(
+            "SELECT id, category, title, shape, extra FROM guides ORDER BY id")
+    ]
+    return exams, categories, guides
+
+
+def verify(db_file: str = DB_FILE, sources: Sequence[Tuple[str, str]] = SOURCES) -> List[dict]:
+    """
+    Compare every source file with its reconstruction from the database.
+
+    A missing database or one written by another DB_VERSION is rebuilt first, since
+    its rows cannot be read back; one that is merely older than the sources is
+    compared as is and reported with "current": False.
+    """
+    rebuilt_db = False
+    if os.path.exists(db_file):
+        conn = sqlite3.connect(db_file)
+        try:
+            rebuilt_db = not has_current_schema(conn)
+        finally:
+            conn.close()
+    else:
+        rebuilt_db = True
+    if rebuilt_db:
+        build(db_file, sources)
+    conn = sqlite3.connect(db_file)
+    try:
+        current = is_current(conn, sources)
+        restored = dict(zip(("exams", "signs", "guides"), export(conn)))
+    finally:
+        conn.close()
+    results = []
+    for name, path in sources:
+        with open(path, "rb") as f:
+            raw = f.read()
+        rebuilt = json.dumps(restored[name], ensure_ascii=False, indent=2).encode("utf-8")
+        result = {"file": path, "identical": rebuilt == raw, "equal": restored[name] == json.loads(raw),
+                  "current": current, "rebuilt": rebuilt_db}
+        if not result["identical"]:
+            result["firstDifference"] = next(
+                (i for i, (a, b) in enumerate(zip(rebuilt, raw)) if a != b), min(len(rebuilt), len(raw)))
+        results.append(result)
+    return results
+
+
+# Keys that a delimited shape could not carry, and values of the wrong type for their column
+ODD_KEYS_FIXTURE = {
+    "exams": [{"examId": "x", "": 1, "a,b": [2], "questions": [
+        {"": "", "id": 1, "questionText": "a", "options": {
+            "": "boş anahtar", "A,B": {"text": "t", "": 0, "x,y": None}, "C": {"imageUrl": "c.png"}, "D": 4},
+         "correctAnswerKey": "A,B"},
+        {"id": "2", "questionText": None, "options": [], "\"": {}},
+        "bare question",
+    ]}, {"examId": "y", "questions": {}}, []],
+    "signs": [{",": 1, "categoryName": "c", "signs": [{"id": 7, "": "e", "name": "n"}, None]}],
+    "guides": [{"title": "t", "content": ["bare text", {"type": "p", "text": "x", "": "y"}, 3], "": []}],
+}
+
+
+def check_round_trip(fixture: Dict[str, Any] = ODD_KEYS_FIXTURE) -> bool:
+    """Build a database from `fixture` written as JSON source files and verify it restores them byte for byte."""
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = []
+        for name, _ in SOURCES:
+            path = os.path.join(tmp, f"{name}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(fixture[name], f, ensure_ascii=False, indent=2)
+            sources.append((name, path))
+        db_file = os.path.join(tmp, "content.db")
+        build(db_file, sources)
+        return all(result["identical"] for result in verify(db_file, sources))
+
+
+# Queries ---------------------------------------------------------------------
+
+def fts_query(text: str) -> str:
+    """FTS5 MATCH expression: every folded word of the query as a quoted prefix term."""
+    return " ".join(f'"{term}"*' for term in _FTS_TERM.findall(search_fold(text)))
+
+
+def search(conn: sqlite3.Connection, text: str, limit: int = 20) -> List[dict]:
+    """Questions, signs and guide blocks matching every word, best BM25 score first per source."""
+    match = fts_query(text)
+    if not match:
+        return []
+    results = []
+    for exam_id, question_id, question_text, score in conn.execute(
+            "SELECT e.exam_id, q.question_id, q.question_text, bm25(question_fts, 1.0, 0.5, 0.5) AS score "
+            "FROM question_fts JOIN questions q ON q.id = question_fts.rowid JOIN exams e ON e.id = q.exam "
+            "WHERE question_fts MATCH ? ORDER BY score LIMIT ?", (match, limit)):
+        results.append({"source": "question", "examId": exam_id, "questionId": question_id,
+                        "text": question_text, "score": score})
+    for sign_id, name, score in conn.execute(
+            "SELECT s.sign_id, s.name, bm25(sign_fts, 1.0, 0.5) AS score "
+            "FROM sign_fts JOIN signs s ON s.id = sign_fts.rowid "
+            "WHERE sign_fts MATCH ? ORDER BY score LIMIT ?", (match, limit)):
+        results.append({"source": "sign", "signId": sign_id, "text": name, "score": score})
+    for title, block_text, score in conn.execute(
+            "SELECT g.title, b.text, bm25(guide_fts) AS score "
+            "FROM guide_fts JOIN guide_blocks b ON b.id = guide_fts.rowid JOIN guides g ON g.id = b.guide "
+            "WHERE guide_fts MATCH ? ORDER BY score LIMIT ?", (match, limit)):
+        results.append({"source": "guide", "title": title, "text": block_text, "score": score})
+    return results
+
+
+def questions_by_exam(conn: sqlite3.Connection, exam_id: str) -> List[tuple]:
+    return conn.execute(
+        "SELECT q.question_id, q.question_text FROM questions q JOIN exams e ON e.id = q.exam "
+        "WHERE e.exam_id = ? ORDER BY q.id", (exam_id,)).fetchall()
+
+
+def questions_by_category(conn: sqlite3.Connection, category: str) -> List[tuple]:
+    return conn.execute(
+        "SELECT q.question_id, q.question_text FROM questions q WHERE q.category = ? ORDER BY q.id",
+        (category,)).fetchall()
+
+
+def image_usage(conn: sqlite3.Connection, path: str) -> List[tuple]:
+    return conn.execute("SELECT source, row FROM image_usage WHERE path = ?", (path,)).fetchall()
+
+
+# Benchmark -------------------------------------------------------------------
+
+def _json_search(loaded: Dict[str, Any], text: str) -> int:
+    """Linear scan with the same folding and prefix semantics as search()."""
+    terms = _FTS_TERM.findall(search_fold(text))
+    hits = 0
+
+    def matches(*fields: Any) -> bool:
+        words = set(_FTS_TERM.findall(" ".join(search_fold(f) for f in fields if isinstance(f, str))))
+        return all(any(word.startswith(term) for word in words) for term in terms)
+
+    for exam in loaded["exams"]:
+        for q in exam.get("questions", []):
+            options = [_option_text(v) for v in (q.get("options") or {}).values()]
+            hits += matches(q.get("questionText"), q.get("explanation"), *options)
+    for category in loaded["signs"]:
+        for sign in category.get("signs", []):
+            hits += matches(sign.get("name"), sign.get("description"))
+    for guide in loaded["guides"]:
+        for block in guide.get("content", []):
+            hits += matches(block.get("text") if isinstance(block, dict) else block)
+    return hits
+
+
+def run_benchmark(repeat: int = 20) -> None:
+    def timed(fn, n: int = repeat) -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        return (time.perf_counter() - start) / n * 1000
+
+    def json_load() -> Dict[str, Any]:
+        loaded = {}
+        for name, path in SOURCES:
+            with open(path, "r", encoding="utf-8") as f:
+                loaded[name] = json.load(f)
+        return loaded
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "content.db")
+        build_ms = timed(lambda: build(path), 3)
+        loaded = json_load()
+        exam_id = loaded["exams"][len(loaded["exams"]) // 2]["examId"]
+        category = loaded["exams"][0]["questions"][0]["category"]
+        image = next(q["imageUrl"] for exam in loaded["exams"] for q in exam["questions"] if q.get("imageUrl"))
+        queries = ("dönel kavşak", "turnike", "İLK YARDIM", "hız sınırı")
+
+        def db_first_query():
+            conn = sqlite3.connect(path)
+            rows = questions_by_exam(conn, exam_id)
+            conn.close()
+            return rows
+
+        def db_export():
+            conn = sqlite3.connect(path)
+            data = export(conn)
+            conn.close()
+            return data
+
+        raw_size = sum(os.path.getsize(p) for _, p in SOURCES)
+        print(f"📦 Boyut: JSON {raw_size / 1024:.0f} KB, SQLite {os.path.getsize(path) / 1024:.0f} KB "
+              f"(derleme {build_ms:.0f} ms)")
+        print(f"⏱️  Soğuk yükleme, {repeat} tekrar ortalaması")
+        print(f"  - json.load (3 dosya)        {timed(json_load):8.2f} ms")
+        print(f"  - SQLite bağlantı + 1 sorgu  {timed(db_first_query):8.2f} ms")
+        print(f"  - SQLite'tan tüm içerik      {timed(db_export):8.2f} ms")
+
+        conn = sqlite3.connect(path)
+        lookups = [
+            (f"examId = {exam_id}",
+             lambda: [q for e in loaded["exams"] if e.get("examId") == exam_id for q in e["questions"]],
+             lambda: questions_by_exam(conn, exam_id)),
+            (f"category = {category}",
+             lambda: [q for e in loaded["exams"] for q in e["questions"] if q.get("category") == category],
+             lambda: questions_by_category(conn, category)),
+            ("görsel yolu",
+             lambda: [q for e in loaded["exams"] for q in e["questions"] if q.get("imageUrl") == image],
+             lambda: image_usage(conn, image)),
+        ]
+        for query in queries:
+            lookups.append((f"metin '{query}'", lambda q=query: _json_search(loaded, q),
+                            lambda q=query: search(conn, q, limit=10_000)))
+        print(f"⏱️  Sorgu gecikmesi, {repeat} tekrar ortalaması (JSON taraması / SQLite)")
+        for label, scan, probe in lookups:
+            found = len(probe())
+            print(f"  - {label:34} {timed(scan):8.3f} ms / {timed(probe):7.3f} ms  ({found} sonuç)")
+        conn.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="exams/işaret/rehber JSON dosyalarından SQLite veritabanı")
+    parser.add_argument("command", choices=("build", "verify", "search", "benchmark"))
+    parser.add_argument("query", nargs="*", help="arama metni (search)")
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    missing = [path for _, path in SOURCES if not os.path.exists(path)]
+    if missing:
+        print(f"❌ Bulunamadı: {', '.join(missing)}")
+        return 1
+
+    if args.command == "build":
+        counts = build(args.db)
+        print(f"✅ {args.db} ({os.path.getsize(args.db) / 1024:.0f} KB)")
+        print("   " + ", ".join(f"{name}: {n}" for name, n in counts.items()))
+    elif args.command == "verify":
+        failed = 0
+        results = verify(args.db)
+        if results[0]["rebuilt"]:
+            print(f"ℹ️  {args.db} yoktu ya da başka bir şema sürümündeydi; yeniden derlendi")
+        for result in results:
+            if result["identical"]:
+                print(f"✅ {result['file']}: birebir aynı")
+            else:
+                failed += 1
+                detail = "içerik aynı, biçim farklı" if result["equal"] else "içerik farklı"
+                print(f"❌ {result['file']}: {detail} (ilk fark bayt {result['firstDifference']})")
+            if not result["current"]:
+                print("   ⚠️  Veritabanı kaynak dosyalardan eski; önce build çalıştırın")
+        if check_round_trip():
+            print("✅ Boş, virgüllü ve tırnaklı anahtarlar: birebir geri dönüşüm")
+        else:
+            failed += 1
+            print("❌ Boş, virgüllü ve tırnaklı anahtarlar geri dönüşümde bozuluyor")
+        return 1 if failed else 0
+    elif args.command == "search":
+        if not args.query:
+            print("❌ Arama metni gerekli")
+            return 1
+        conn = connect(args.db)
+        try:
+            results = search(conn, " ".join(args.query), args.limit)
+        finally:
+            conn.close()
+        if not results:
+            print("ℹ️  Sonuç yok")
+        for r in results:
+            if r["source"] == "question":
+                where = f"{r['examId']} #{r['questionId']}"
+            elif r["source"] == "sign":
+                where = f"işaret {r['signId']}"
+            else:
+                where = f"rehber '{r['title']}'"
+            text = " ".join((r["text"] or "").split())
+            print(f"  {r['score']:7.2f}  {where}: {text[:90]}")
+    else:
+        run_benchmark()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Finds near-identical images under assets/images with a perceptual hash.
+
+The same traffic sign is often saved several times under different names and
+formats. Every raster image gets a 64-bit difference hash (dHash: the image is
+flattened onto white, shrunk to 9x8 grayscale and each bit says whether a pixel
+is brighter than its right neighbour), which survives re-encoding, resizing and
+small colour shifts. Hashes are computed on a process pool and cached in
+.cache/image_hashes.json by file content hash.
+
+A hash alone is not enough here: many traffic signs share a frame (a red
+triangle, a blue disc) and differ only in a small pictogram, which a 64-bit hash
+cannot see. So hashes within --threshold bits (Hamming distance) are only
+candidates. Instead of comparing all pairs they come out of a multi-index hash:
+the 64 bits are split into threshold + 1 bands, any two hashes within the
+threshold agree exactly in at least one band, so only hashes that share a band
+value with the query are compared bit by bit. A candidate then joins a cluster only if its 16x16
+grayscale thumbnail differs from the cluster's canonical image by at most
+--max-diff on average (0-255). Clusters are built around canonical images, never
+by chaining matches, so every member is compared with its canonical image
+directly. The canonical image is the one used by traffic_signs.json if any
+(signs are never rewritten), then the most referenced, the largest and the
+smallest file.
+
+The report lists the clusters and the bytes that dropping the other members
+would reclaim. --apply points exams.json references at the canonical image
+(through ExamStore) and deletes members that are no longer referenced by
+exams.json, traffic_signs.json or study_guides.json. Images with a flat hash
+(blank or single-colour) are left out, since they all look alike to dHash.
+
+Pillow is needed to hash images; --benchmark (multi-index hashing vs. all pairs
+on synthetic hashes) runs without it.
+
+Usage:
+    python3 scripts/dedupe_images.py [--threshold 6] [--max-diff 2] [--workers N]   # report only
+    python3 scripts/dedupe_images.py --apply
+    python3 scripts/dedupe_images.py --benchmark
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from exam_store import ExamStore
+from image_refs import SIGNS_FILE, Ref, collect_references, report_blast_radius
+from optimize_images import (
+    EXAMS_FILE, IMAGES_DIR, PILLOW_HINT, file_sha256, list_images, other_references, pillow_available,
+    rewrite_references,
+)
+
+CACHE_FILE = ".cache/image_hashes.json"
+OUTPUT_REPORT = "analysis/image_duplicates_report.json"
+
+HASH_SIZE = 8
+THUMB_SIZE = 16
+DEFAULT_THRESHOLD = 6
+# Mean absolute difference of the thumbnails; distinct sign variants start around 3.5
+DEFAULT_MAX_DIFF = 2.0
+FLAT_HASHES = {0, (1 << HASH_SIZE * HASH_SIZE) - 1}
+# Bump when the hash computation changes so cached hashes are recomputed
+HASH_VERSION = 1
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class MultiIndexHash:
+    """
+    Multi-index hashing over fixed-width integer hashes; `comparisons` counts Hamming checks.
+
+    Each hash is split into radius + 1 bit bands and filed under every band value.
+    Two hashes within `radius` bits differ in at most `radius` bands, so by the
+    pigeonhole principle they agree exactly in at least one: looking up the query's
+    own band values yields every match, and only those bucket hits are compared.
+    """
+
+    def __init__(self, radius: int, bits: int = HASH_SIZE * HASH_SIZE):
+        self.radius = radius
+        self.bits = bits
+        count = min(radius + 1, bits)
+        widths = [bits // count + (1 if i < bits % count else 0) for i in range(count)]
+        self.bands: List[Tuple[int, int]] = []
+        shift = 0
+        for width in widths:
+            self.bands.append((shift, (1 << width) - 1))
+            shift += width
+        self.tables: List[Dict[int, List[int]]] = [{} for _ in self.bands]
+        self.values: List[int] = []
+        self.comparisons = 0
+
+    def add(self, value: int) -> None:
+        self.values.append(value)
+        for (shift, mask), table in zip(self.bands, self.tables):
+            table.setdefault((value >> shift) & mask, []).append(value)
+
+    def search(self, value: int) -> List[Tuple[int, int]]:
+        """Every stored value within `radius` bits of `value`, with its distance."""
+        if self.radius >= self.bits:
+            candidates = set(self.values)
+        else:
+            candidates = set()
+            for (shift, mask), table in zip(self.bands, self.tables):
+                candidates.update(table.get((value >> shift) & mask, ()))
+        found = []
+        for other in candidates:
+            d = hamming(value, other)
+            self.comparisons += 1
+            if d <= self.radius:
+                found.append((d, other))
+        return found
+
+
+# Hashing ---------------------------------------------------------------------
+
+def _grayscale(img, size: Tuple[int, int]) -> bytes:
+    from PIL import Image
+
+    img = img.convert("RGBA")
+    background = Image.new("RGBA", img.size, (255, 255, 255, 255))
+    return Image.alpha_composite(background, img).convert("L").resize(size, Image.LANCZOS).tobytes()
+
+
+def dhash(path: str, size: int = HASH_SIZE) -> Tuple[int, bytes, int, int]:
+    """(64-bit difference hash, 16x16 grayscale thumbnail, width, height) of the first frame of an image."""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        width, height = img.size
+        px = _grayscale(img, (size + 1, size))
+        thumb = _grayscale(img, (THUMB_SIZE, THUMB_SIZE))
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            i = row * (size + 1) + col
+            bits = (bits << 1) | (px[i] > px[i + 1])
+    return bits, thumb, width, height
+
+
+def pixel_diff(a: bytes, b: bytes) -> float:
+    return sum(abs(x - y) for x, y in zip(a, b)) / len(a)
+
+
+def _hash_task(task: Tuple[str, str]) -> dict:
+    path, digest = task
+    try:
+        value, thumb, width, height = dhash(path)
+    except OSError as e:
+        return {"digest": digest, "error": str(e)}
+    return {"digest": digest, "hash": value, "thumb": thumb.hex(), "width": width, "height": height}
+
+
+def load_hashes(path: str = CACHE_FILE) -> Dict[str, dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    return payload.get("hashes", {}) if payload.get("version") == HASH_VERSION else {}
+
+
+def save_hashes(hashes: Dict[str, dict], path: str = CACHE_FILE) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": HASH_VERSION, "hashes": hashes}, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def hash_images(paths: List[str], workers: Optional[int] = None) -> Tuple[Dict[str, dict], int]:
+    """Hash record per path (from the cache where the content is unchanged); returns (records, computed)."""
+    cache = load_hashes()
+    digests = {path: file_sha256(path) for path in paths}
+    pending = sorted({(path, d) for path, d in digests.items() if d not in cache}, key=lambda t: t[1])
+    unique = list({d: (p, d) for p, d in pending}.values())
+    if unique:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for record in pool.map(_hash_task, unique, chunksize=4):
+                cache[record.pop("digest")] = record
+        save_hashes(cache)
+    return {path: dict(cache[d], sha256=d) for path, d in digests.items()}, len(unique)
+
+
+# Clustering ------------------------------------------------------------------
+
+def cluster_images(
+    items: Dict[str, int], threshold: int, rank: Callable[[str], tuple], verify: Callable[[str, str], bool]
+) -> Tuple[List[List[str]], int, int]:
+    """
+    Clusters of paths, each led by its best-ranked path; returns (clusters, comparisons, rejected).
+
+    Paths are taken in rank order; an unassigned path starts a cluster and takes
+    every unassigned path whose hash is within `threshold` bits and that passes
+    `verify` against it.
+    """
+    by_hash: Dict[int, List[str]] = {}
+    for path, value in items.items():
+        by_hash.setdefault(value, []).append(path)
+    index = MultiIndexHash(threshold)
+    for value in by_hash:
+        index.add(value)
+
+    assigned = set()
+    clusters = []
+    rejected = 0
+    for leader in sorted(items, key=rank):
+        if leader in assigned:
+            continue
+        members = [leader]
+        assigned.add(leader)
+        for _, value in sorted(index.search(items[leader])):
+            for path in by_hash[value]:
+                if path in assigned:
+                    continue
+                if verify(leader, path):
+                    members.append(path)
+                    assigned.add(path)
+                else:
+                    rejected += 1
+        if len(members) > 1:
+            clusters.append(members)
+    return sorted(clusters, key=lambda c: (-len(c), c)), index.comparisons, rejected
+
+
+def canonical_rank(records: Dict[str, dict], refs: Dict[str, List[Ref]]) -> Callable[[str], tuple]:
+    def rank(path: str) -> tuple:
+        r = records[path]
+        sign_refs = sum(1 for ref in refs.get(path, []) if ref.source == "signs")
+        return (-bool(sign_refs), -len(refs.get(path, [])), -(r["width"] * r["height"]), os.path.getsize(path), path)
+    return rank
+
+
+def find_duplicates(threshold: int, max_diff: float, workers: Optional[int]) -> Tuple[dict, Dict[str, List[Ref]], ExamStore]:
+    store = ExamStore(EXAMS_FILE)
+    with open(SIGNS_FILE, "r", encoding="utf-8") as f:
+        signs = json.load(f)
+    refs = collect_references(store.data, signs)
+
+    paths = list_images(IMAGES_DIR)
+    start = time.perf_counter()
+    records, computed = hash_images(paths, workers)
+    hash_seconds = time.perf_counter() - start
+    undecodable = sorted(p for p, r in records.items() if "error" in r)
+    hashed = {p: r["hash"] for p, r in records.items() if "hash" in r and r["hash"] not in FLAT_HASHES}
+    flat = sum(1 for r in records.values() if r.get("hash") in FLAT_HASHES)
+
+    thumbs = {p: bytes.fromhex(records[p]["thumb"]) for p in hashed}
+    start = time.perf_counter()
+    groups, comparisons, rejected = cluster_images(
+        hashed, threshold, canonical_rank(records, refs),
+        lambda a, b: pixel_diff(thumbs[a], thumbs[b]) <= max_diff,
+    )
+    cluster_seconds = time.perf_counter() - start
+
+    clusters = []
+    for group in groups:
+        canonical = group[0]
+        members = []
+        for path in group:
+            r = records[path]
+            members.append({
+                "path": path,
+                "distance": hamming(r["hash"], records[canonical]["hash"]),
+                "pixelDiff": round(pixel_diff(thumbs[path], thumbs[canonical]), 2),
+                "sameBytes": r["sha256"] == records[canonical]["sha256"],
+                "bytes": os.path.getsize(path),
+                "width": r["width"],
+                "height": r["height"],
+                "examReferences": sum(1 for ref in refs.get(path, []) if ref.source == "exams"),
+                "signReferences": sum(1 for ref in refs.get(path, []) if ref.source == "signs"),
+            })
+        clusters.append({
+            "canonical": canonical,
+            "bytesReclaimable": sum(m["bytes"] for m in members[1:]),
+            "members": members,
+        })
+    n = len(hashed)
+    report = {
+        "summary": {
+            "threshold": threshold,
+            "maxDiff": max_diff,
+            "images": len(paths),
+            "hashed": len(hashed),
+            "hashesComputed": computed,
+            "flat": flat,
+            "undecodable": undecodable,
+            "clusters": len(clusters),
+            "duplicates": sum(len(c["members"]) - 1 for c in clusters),
+            "bytesReclaimable": sum(c["bytesReclaimable"] for c in clusters),
+            "hashSeconds": round(hash_seconds, 2),
+            "clusterSeconds": round(cluster_seconds, 4),
+            "hammingComparisons": comparisons,
+            "rejectedCandidates": rejected,
+            "allPairsComparisons": n * (n - 1) // 2,
+        },
+        "clusters": clusters,
+    }
+    return report, refs, store
+
+
+def apply_canonical(report: dict, refs: Dict[str, List[Ref]], store: ExamStore) -> Tuple[int, List[str]]:
+    """Rewrite exam references to each cluster's canonical image and delete members nothing uses anymore."""
+    mapping = {}
+    for cluster in report["clusters"]:
+        for member in cluster["members"][1:]:
+            if member["examReferences"]:
+                mapping[member["path"]] = cluster["canonical"]
+    # Signs are passed as an empty list so traffic_signs.json stays untouched
+    changed = rewrite_references(mapping, refs, store, [])
+    report_blast_radius(store)
+    store.save("dedupe_images")
+
+    other_text = other_references()
+    deleted = []
+    for cluster in report["clusters"]:
+        for member in cluster["members"][1:]:
+            path = member["path"]
+            still_used = any(ref.source == "signs" for ref in refs.get(path, [])) or path in other_text
+            if path in mapping and not still_used:
+                os.remove(path)
+                deleted.append(path)
+    return changed, deleted
+
+
+# Benchmark -----------------------------------------------------------------
+
+def run_benchmark(threshold: int = DEFAULT_THRESHOLD, sizes=(500, 2000, 4000)) -> None:
+    """Multi-index candidate search vs. all-pairs comparison on random hashes with planted near-duplicates."""
+    rng = random.Random(7)
+    print(f"⏱️  Eşik {threshold} bit, sentetik 64-bit özetler (%20'si yakın kopya)")
+    print(f"  {'görsel':>7} {'çoklu dizin (s)':>15} {'karşılaştırma':>14} {'tüm çiftler (s)':>16} {'n²/2':>12} {'küme':>6}")
+    for n in sizes:
+        bases = [rng.getrandbits(64) for _ in range(int(n * 0.8))]
+        values = list(bases)
+        while len(values) < n:
+            v = rng.choice(bases)
+            for _ in range(rng.randint(0, threshold)):
+                v ^= 1 << rng.randrange(64)
+            values.append(v)
+        items = {f"img_{i}": v for i, v in enumerate(values)}
+
+        start = time.perf_counter()
+        clusters, comparisons, _ = cluster_images(items, threshold, lambda p: p, lambda a, b: True)
+        index_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i, a in enumerate(values):
+            for b in values[i + 1:]:
+                hamming(a, b) <= threshold
+        pairs_s = time.perf_counter() - start
+        print(f"  {n:>7} {index_s:>15.2f} {comparisons:>14} {pairs_s:>16.2f} {n * (n - 1) // 2:>12} {len(clusters):>6}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cluster near-identical images by perceptual hash.")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD, help="max differing hash bits (0-64)")
+    parser.add_argument("--max-diff", type=float, default=DEFAULT_MAX_DIFF, help="max mean thumbnail difference (0-255)")
+    parser.add_argument("--workers", type=int, help="process pool size for hashing")
+    parser.add_argument("--apply", action="store_true", help="point exam references at canonical images")
+    parser.add_argument("--report", default=OUTPUT_REPORT)
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.threshold)
+        return 0
+    for path in (EXAMS_FILE, SIGNS_FILE, IMAGES_DIR):
+        if not os.path.exists(path):
+            print(f"❌ Bulunamadı: {path}")
+            return 1
+    if not pillow_available():
+        print(PILLOW_HINT)
+        return 1
+
+    report, refs, store = find_duplicates(args.threshold, args.max_diff, args.workers)
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    s = report["summary"]
+    print(f"🔍 {s['hashed']} görsel özetlendi ({s['hashesComputed']} yeni, {s['hashSeconds']} sn), "
+          f"{s['flat']} düz görsel atlandı, {len(s['undecodable'])} okunamadı")
+    print(f"🧩 {s['clusters']} küme, {s['duplicates']} yakın kopya — {s['bytesReclaimable'] / 1024:.0f} KB geri kazanılabilir")
+    print(f"   Çoklu dizin {s['hammingComparisons']} karşılaştırma (tüm çiftler: {s['allPairsComparisons']}), "
+          f"{s['rejectedCandidates']} aday piksel kontrolünde elendi")
+    if args.apply:
+        changed, deleted = apply_canonical(report, refs, store)
+        print(f"✅ {changed} referans kanonik görsele yönlendirildi, {len(deleted)} dosya silindi")
+    print(f"📄 Rapor: {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Optional per-exam layout of exams.json with a lazy loader.
+
+`split` writes every exam to assets/data/exams/<examId>.json next to a small
+manifest.json holding each exam's name, question count, content hash and the
+byte offset and length of the exam inside the monolithic exams.json. ExamLoader
+reads the manifest and opens only the exams a command asks for: from its shard
+when the sharded layout is in use, otherwise by seeking to its span in
+exams.json as long as that file is unchanged since the manifest was written.
+Without a usable manifest it streams exams.json (exam_stream.py) up to the
+requested exam instead of parsing the whole file.
+
+With shards, the shard files are the source of truth and `export` reassembles
+exams.json for the app (through ExamStore, so the write is atomic and
+journaled). `index` writes a manifest of offsets only, without shards.
+
+The manifest records the size, mtime and sha256 of exams.json as of the last
+split/export. Every other tool still edits exams.json directly, so once it
+differs from that record the shards are stale: `export` refuses to overwrite
+those edits until exams.json is split again, and ExamLoader reads exams.json.
+
+The monolith is laid out exactly as json.dumps(data, indent=2) does it, which
+is what makes the recorded offsets valid for files written by ExamStore.
+
+Usage:
+    python3 scripts/exam_shards.py index      # offsets-only manifest for exams.json
+    python3 scripts/exam_shards.py split      # exams.json -> shards + manifest
+    python3 scripts/exam_shards.py export     # shards -> exams.json
+    python3 scripts/exam_shards.py benchmark  # single-exam load vs. full parse
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sys
+import textwrap
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from exam_store import ExamStore
+from exam_stream import iter_exams
+
+EXAMS_FILE = "assets/data/exams.json"
+SHARD_DIR = "assets/data/exams"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def _dump_exam(exam: dict) -> str:
+    return json.dumps(exam, ensure_ascii=False, indent=2)
+
+
+def _fingerprint(path: str) -> Dict[str, int]:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtimeNs": st.st_mtime_ns}
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def monolith_unchanged(manifest: dict, exams_file: str) -> bool:
+    """Whether exams.json still matches the manifest; the hash settles a changed mtime."""
+    recorded = manifest.get("monolith", {})
+    if not os.path.exists(exams_file):
+        return False
+    if {k: recorded.get(k) for k in ("size", "mtimeNs")} == _fingerprint(exams_file):
+        return True
+    return bool(recorded.get("sha256")) and recorded["sha256"] == _sha256(exams_file)
+
+
+def layout(exams: List[dict]) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    The monolithic file for `exams` plus the (offset, length) of each exam in it.
+
+    Byte-identical to json.dumps(exams, ensure_ascii=False, indent=2): each exam
+    is dumped on its own and indented one level, which is how the encoder nests
+    array items (string values never contain a raw newline).
+    """
+    parts: List[bytes] = []
+    spans: List[Tuple[int, int]] = []
+    offset = len(b"[\n")
+    for exam in exams:
+        chunk = textwrap.indent(_dump_exam(exam), "  ").encode("utf-8")
+        spans.append((offset, len(chunk)))
+        parts.append(chunk)
+        offset += len(chunk) + len(b",\n")
+    raw = b"[\n" + b",\n".join(parts) + b"\n]" if exams else b"[]"
+    return raw, spans
+
+
+def build_manifest(exams: List[dict], spans: List[Tuple[int, int]], exams_file: str, sharded: bool) -> dict:
+    entries = []
+    for exam, (offset, length) in zip(exams, spans):
+        exam_id = exam.get("examId", "")
+        entries.append({
+            "examId": exam_id,
+            "examName": exam.get("examName"),
+            "questions": len(exam.get("questions", [])),
+            "sha256": hashlib.sha256(_dump_exam(exam).encode("utf-8")).hexdigest(),
+            "file": f"{exam_id}.json" if sharded else None,
+            "offset": offset,
+            "length": length,
+        })
+    return {
+        "version": MANIFEST_VERSION,
+        "sharded": sharded,
+        "monolith": dict(path=exams_file, **_fingerprint(exams_file), sha256=_sha256(exams_file)),
+        "exams": entries,
+    }
+
+
+def _write_json(path: str, payload) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_monolith(exams_file: str) -> Tuple[List[dict], List[Tuple[int, int]]]:
+    with open(exams_file, "rb") as f:
+        raw = f.read()
+    exams = json.loads(raw)
+    rebuilt, spans = layout(exams)
+    if rebuilt != raw:
+        raise ValueError(f"{exams_file} json.dumps(indent=2) düzeninde değil; önce ExamStore ile kaydedin")
+    return exams, spans
+
+
+def write_index(exams_file: str = EXAMS_FILE, shard_dir: str = SHARD_DIR) -> dict:
+    """Offsets-only manifest for the current exams.json."""
+    exams, spans = _read_monolith(exams_file)
+    os.makedirs(shard_dir, exist_ok=True)
+    manifest = build_manifest(exams, spans, exams_file, sharded=False)
+    _write_json(os.path.join(shard_dir, MANIFEST_NAME), manifest)
+    return manifest
+
+
+def split(exams_file: str = EXAMS_FILE, shard_dir: str = SHARD_DIR) -> dict:
+    """Write one shard per exam and a manifest; the shards become the source of truth."""
+    exams, spans = _read_monolith(exams_file)
+    os.makedirs(shard_dir, exist_ok=True)
+    manifest = build_manifest(exams, spans, exams_file, sharded=True)
+    for exam, entry in zip(exams, manifest["exams"]):
+        with open(os.path.join(shard_dir, entry["file"]), "w", encoding="utf-8") as f:
+            f.write(_dump_exam(exam))
+    current = {entry["file"] for entry in manifest["exams"]}
+    for name in os.listdir(shard_dir):
+        if name.endswith(".json") and name != MANIFEST_NAME and name not in current:
+            os.remove(os.path.join(shard_dir, name))
+    _write_json(os.path.join(shard_dir, MANIFEST_NAME), manifest)
+    return manifest
+
+
+def export(shard_dir: str = SHARD_DIR, exams_file: str = EXAMS_FILE) -> int:
+    """Reassemble exams.json from the shards in manifest order; returns the number of changes."""
+    loader = ExamLoader(shard_dir, exams_file)
+    if not loader.sharded:
+        raise ValueError(f"{shard_dir} içinde parçalı düzen yok; önce split çalıştırın")
+    if loader.stale:
+        raise ValueError(f"{exams_file} son split/export'tan sonra değişti; parçalar bu düzenlemeleri "
+                         f"içermiyor. Üzerine yazmamak için önce yeniden split çalıştırın")
+    exams = [loader._read_shard(entry) for entry in loader.entries.values()]
+    store = ExamStore(exams_file)
+    store.data[:] = exams
+    changes = store.save("exam_shards export")
+    _, spans = layout(exams)
+    _write_json(os.path.join(shard_dir, MANIFEST_NAME), build_manifest(exams, spans, exams_file, sharded=True))
+    return len(changes)
+
+
+class ExamLoader:
+    """Opens only the exams that are asked for, using the manifest when it is valid."""
+
+    def __init__(self, shard_dir: str = SHARD_DIR, exams_file: str = EXAMS_FILE):
+        self.shard_dir = shard_dir
+        self.exams_file = exams_file
+        self.manifest: Optional[dict] = None
+        manifest_path = os.path.join(shard_dir, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") == MANIFEST_VERSION:
+                self.manifest = manifest
+        self.entries: Dict[str, dict] = {
+            e["examId"]: e for e in (self.manifest or {}).get("exams", [])
+        }
+        self.sharded = bool(self.manifest and self.manifest.get("sharded"))
+        unchanged = bool(self.manifest) and monolith_unchanged(self.manifest, exams_file)
+        # Sharded, but exams.json was edited by another tool since: the shards are out of date
+        self.stale = self.sharded and os.path.exists(exams_file) and not unchanged
+        self._offsets_valid = bool(self.manifest) and not self.sharded and unchanged
+        self._cache: Dict[str, dict] = {}
+
+    @property
+    def mode(self) -> str:
+        if self.sharded and not self.stale:
+            return "shards"
+        return "offsets" if self._offsets_valid else "full"
+
+    def exam_ids(self) -> List[str]:
+        if self.mode != "full":
+            return list(self.entries)
+        return [e.get("examId", "") for e in iter_exams(self.exams_file)]
+
+    def info(self, exam_id: str) -> Optional[dict]:
+        """Manifest entry (name, question count, hash) without opening the exam."""
+        return self.entries.get(exam_id)
+
+    def load(self, exam_id: str) -> Optional[dict]:
+        if exam_id in self._cache:
+            return self._cache[exam_id]
+        mode = self.mode
+        if mode == "full":
+            exam = next(iter_exams(self.exams_file, [exam_id]), None)
+        elif exam_id not in self.entries:
+            exam = None
+        elif mode == "shards":
+            exam = self._read_shard(self.entries[exam_id])
+        else:
+            entry = self.entries[exam_id]
+            with open(self.exams_file, "rb") as f:
+                f.seek(entry["offset"])
+                exam = json.loads(f.read(entry["length"]))
+        if exam is not None:
+            self._cache[exam_id] = exam
+        return exam
+
+    def exams(self, exam_ids: Optional[Iterable[str]] = None) -> Iterator[dict]:
+        for exam_id in (self.exam_ids() if exam_ids is None else exam_ids):
+            exam = self.load(exam_id)
+            if exam is not None:
+                yield exam
+
+    def _read_shard(self, entry: dict) -> dict:
+        with open(os.path.join(self.shard_dir, entry["file"]), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+# Benchmark -----------------------------------------------------------------
+
+def run_benchmark(exam_id: str = "deneme_sinavi_2", repeat: int = 50) -> None:
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        exams_copy = os.path.join(tmp, "exams.json")
+        with open(EXAMS_FILE, "rb") as src, open(exams_copy, "wb") as dst:
+            dst.write(src.read())
+        offsets_dir = os.path.join(tmp, "offsets")
+        shards_dir = os.path.join(tmp, "shards")
+        write_index(exams_copy, offsets_dir)
+        split(exams_copy, shards_dir)
+
+        def timed(fn) -> float:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                fn()
+            return (time.perf_counter() - start) / repeat * 1000
+
+        def full_parse():
+            with open(exams_copy, "r", encoding="utf-8") as f:
+                return next(e for e in json.load(f) if e.get("examId") == exam_id)
+
+        expected = full_parse()
+        results = [
+            ("json.load + arama", timed(full_parse)),
+            ("manifest + ofset", timed(lambda: ExamLoader(offsets_dir, exams_copy).load(exam_id))),
+            ("manifest + parça", timed(lambda: ExamLoader(shards_dir, exams_copy).load(exam_id))),
+        ]
+        same = (ExamLoader(offsets_dir, exams_copy).load(exam_id) == expected
+                == ExamLoader(shards_dir, exams_copy).load(exam_id))
+        size = os.path.getsize(exams_copy)
+        print(f"⏱️  {exam_id} yükleme, {repeat} tekrar ortalaması ({size / 1024:.0f} KB exams.json)")
+        for label, ms in results:
+            print(f"  - {label:<20} {ms:7.2f} ms  ({results[0][1] / ms:5.1f}x)")
+        print(f"  - Sonuçlar aynı: {same}")
+
+
+def main() -> int:
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command in ("index", "split", "benchmark") and not os.path.exists(EXAMS_FILE):
+        print(f"❌ Bulunamadı: {EXAMS_FILE}")
+        return 1
+    try:
+        if command == "index":
+            manifest = write_index()
+            print(f"✅ {len(manifest['exams'])} deneme için ofset manifesti: {SHARD_DIR}/{MANIFEST_NAME}")
+        elif command == "split":
+            manifest = split()
+            print(f"✅ {len(manifest['exams'])} deneme {SHARD_DIR}/ altına ayrıldı")
+        elif command == "export":
+            changes = export()
+            print(f"✅ {EXAMS_FILE} parçalardan yeniden oluşturuldu ({changes} değişiklik)")
+        elif command == "benchmark":
+            run_benchmark(*sys.argv[2:3])
+        else:
+            print("❌ Komut: index | split | export | benchmark [examId]")
+            return 1
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
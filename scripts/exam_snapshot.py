@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Compact binary snapshot of exams.json.
+
+exams.json is indented JSON that stores a repeated question's text, options and
+explanation once per exam. The snapshot interns every string into one table and
+stores exams, questions and options as fixed-width little-endian records that
+point into it, so the file can be memory-mapped and single questions or exams
+decoded without touching the rest.
+
+Layout (all integers little-endian uint32 unless noted):
+
+    header        magic, version, section counts and offsets, sha256, size and
+                  mtime (ns) of the source
+    offsets       n_strings + 1 byte offsets into the blob
+    char offsets  n_strings + 1 character offsets into the decoded blob
+    blob          UTF-8 bytes of every distinct string
+    exams         examId, examName, shape, first question, question count, extra
+    questions     id (int32), shape, questionText, imageUrl, correctAnswerKey,
+                  explanation, category, first option, option count, extra
+    options       key, text, imageUrl, kind
+    shape offsets n_shapes + 1 offsets into shape keys
+    shape keys    string index of every key of every shape
+
+A "shape" is the key order of an original object as a list of string indices,
+so the JSON can be rebuilt byte for byte whatever the keys contain; NULL marks
+a JSON null. Keys outside the fixed columns, and values of unexpected types, go
+to "extra" as a JSON string.
+
+load_exams() trusts the snapshot while exams.json has the size and mtime it was
+built from, so a fresh snapshot is used without reading exams.json at all.
+
+Usage:
+    python3 scripts/exam_snapshot.py build       # exams.json -> .cache/exams.snapshot
+    python3 scripts/exam_snapshot.py export OUT  # snapshot -> JSON file
+    python3 scripts/exam_snapshot.py benchmark   # size and load time vs. exams.json
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+EXAMS_FILE = "assets/data/exams.json"
+SNAPSHOT_FILE = ".cache/exams.snapshot"
+
+MAGIC = b"EXSNAP\x00\x01"
+VERSION = 2
+NULL = 0xFFFFFFFF
+NO_ID = -(1 << 31)
+
+_HEADER = struct.Struct("<8sI5I9I32sQq")
+_EXAM = struct.Struct("<6I")
+_QUESTION = struct.Struct("<i9I")
+_OPTION = struct.Struct("<4I")
+
+EXAM_COLUMNS = ("examId", "examName")
+QUESTION_COLUMNS = ("questionText", "imageUrl", "correctAnswerKey", "explanation", "category")
+
+# Option kinds
+OPT_TEXT = 0   # "A": "text"
+OPT_IMAGE = 1  # "A": {"text": ..., "imageUrl": ...}
+OPT_JSON = 2   # anything else, stored as JSON in the text column
+
+
+class _Strings:
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.items: List[str] = []
+
+    def add(self, s: str) -> int:
+        i = self.index.get(s)
+        if i is None:
+            i = self.index[s] = len(self.items)
+            self.items.append(s)
+        return i
+
+    def column(self, value: Any) -> Optional[int]:
+        """String table index for a str, NULL for None, None if the value needs the extra column."""
+        if value is None:
+            return NULL
+        if isinstance(value, str):
+            return self.add(value)
+        return None
+
+
+class _Shapes:
+    def __init__(self, strings: _Strings):
+        self.strings = strings
+        self.index: Dict[Tuple[str, ...], int] = {}
+        self.items: List[List[int]] = []
+
+    def add(self, obj: dict) -> int:
+        keys = tuple(obj)
+        i = self.index.get(keys)
+        if i is None:
+            i = self.index[keys] = len(self.items)
+            self.items.append([self.strings.add(k) for k in keys])
+        return i
+
+
+def _pad4(b: bytearray) -> None:
+    b.extend(b"\x00" * (-len(b) % 4))
+
+
+def encode(exams: List[dict], source_hash: str = "", source_stat: Tuple[int, int] = (0, 0)) -> bytes:
+    strings = _Strings()
+    shapes = _Shapes(strings)
+    exam_rows: List[Tuple[int, ...]] = []
+    question_rows: List[Tuple[int, ...]] = []
+    option_rows: List[Tuple[int, ...]] = []
+
+    for exam in exams:
+        cols, extra = [], {}
+        for name in EXAM_COLUMNS:
+            idx = strings.column(exam.get(name)) if name in exam else NULL
+            if idx is None:
+                extra[name], idx = exam[name], NULL
+            cols.append(idx)
+        for key, value in exam.items():
+            if key not in EXAM_COLUMNS and key != "questions":
+                extra[key] = value
+        questions = exam.get("questions", [])
+        if "questions" in exam and not isinstance(questions, list):
+            extra["questions"], questions = questions, []
+        q_start = len(question_rows)
+        for q in questions:
+            q_extra = {k: v for k, v in q.items() if k not in QUESTION_COLUMNS and k not in ("id", "options")}
+            qid = q.get("id")
+            if "id" in q and not (isinstance(qid, int) and not isinstance(qid, bool) and NO_ID < qid < (1 << 31)):
+                q_extra["id"], qid = qid, None
+            q_cols = []
+            for name in QUESTION_COLUMNS:
+                idx = strings.column(q.get(name)) if name in q else NULL
+                if idx is None:
+                    q_extra[name], idx = q[name], NULL
+                q_cols.append(idx)
+            opt_start = len(option_rows)
+            options = q.get("options")
+            if "options" in q and not isinstance(options, dict):
+                q_extra["options"], options = options, None
+            for key, value in (options or {}).items():
+                if isinstance(value, str):
+                    option_rows.append((strings.add(key), strings.add(value), NULL, OPT_TEXT))
+                elif (isinstance(value, dict) and list(value) == ["text", "imageUrl"]
+                      and isinstance(value["text"], str) and strings.column(value["imageUrl"]) is not None):
+                    option_rows.append((strings.add(key), strings.add(value["text"]),
+                                        strings.column(value["imageUrl"]), OPT_IMAGE))
+                else:
+                    option_rows.append((strings.add(key), strings.add(json.dumps(value, ensure_ascii=False)),
+                                        NULL, OPT_JSON))
+            question_rows.append((
+                qid if isinstance(qid, int) else NO_ID,
+                shapes.add(q),
+                *q_cols,
+                opt_start,
+                len(option_rows) - opt_start,
+                strings.add(json.dumps(q_extra, ensure_ascii=False)) if q_extra else NULL,
+            ))
+        exam_rows.append((
+            *cols,
+            shapes.add(exam),
+            q_start,
+            len(question_rows) - q_start,
+            strings.add(json.dumps(extra, ensure_ascii=False)) if extra else NULL,
+        ))
+
+    out = bytearray(_HEADER.size)
+    offsets_at = len(out)
+    blob = bytearray()
+    offsets, char_offsets = [0], [0]
+    for s in strings.items:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+        char_offsets.append(char_offsets[-1] + len(s))
+    out += struct.pack(f"<{len(offsets)}I", *offsets)
+    chars_at = len(out)
+    out += struct.pack(f"<{len(char_offsets)}I", *char_offsets)
+    blob_at = len(out)
+    out += blob
+    _pad4(out)
+    exams_at = len(out)
+    for row in exam_rows:
+        out += _EXAM.pack(*row)
+    questions_at = len(out)
+    for row in question_rows:
+        out += _QUESTION.pack(*row)
+    options_at = len(out)
+    for row in option_rows:
+        out += _OPTION.pack(*row)
+    shape_offsets = [0]
+    for keys in shapes.items:
+        shape_offsets.append(shape_offsets[-1] + len(keys))
+    shape_offsets_at = len(out)
+    out += struct.pack(f"<{len(shape_offsets)}I", *shape_offsets)
+    shape_keys_at = len(out)
+    out += struct.pack(f"<{shape_offsets[-1]}I", *(k for keys in shapes.items for k in keys))
+    _HEADER.pack_into(
+        out, 0, MAGIC, VERSION,
+        len(strings.items), len(exam_rows), len(question_rows), len(option_rows), len(shapes.items),
+        offsets_at, chars_at, blob_at, exams_at, questions_at, options_at, shape_offsets_at, shape_keys_at,
+        len(blob),
+        bytes.fromhex(source_hash) if source_hash else b"\x00" * 32,
+        *source_stat,
+    )
+    return bytes(out)
+
+
+class Snapshot:
+    """Memory-mapped snapshot; strings and records are decoded on access."""
+
+    def __init__(self, path: str = SNAPSHOT_FILE):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self.n_strings, self.n_exams, self.n_questions, self.n_options, self.n_shapes,
+             self._offsets_at, self._chars_at, self._blob_at, self._exams_at, self._questions_at,
+             self._options_at, self._shape_offsets_at, self._shape_keys_at, self._blob_size,
+             digest, self.source_size, self.source_mtime_ns) = _HEADER.unpack_from(self._mm, 0)
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"Geçersiz anlık görüntü: {path}")
+        self.source_hash = digest.hex() if any(digest) else ""
+        self._offsets = struct.unpack_from(f"<{self.n_strings + 1}I", self._mm, self._offsets_at)
+        self._strings: Dict[int, str] = {}
+        self._shapes: Dict[int, Tuple[str, ...]] = {}
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def matches(self, path: str) -> bool:
+        """Whether `path` still has the size and mtime the snapshot was built from."""
+        st = os.stat(path)
+        return (self.source_size, self.source_mtime_ns) == (st.st_size, st.st_mtime_ns)
+
+    def string(self, i: int) -> Optional[str]:
+        if i == NULL:
+            return None
+        s = self._strings.get(i)
+        if s is None:
+            start = self._blob_at + self._offsets[i]
+            end = self._blob_at + self._offsets[i + 1]
+            s = self._strings[i] = self._mm[start:end].decode("utf-8")
+        return s
+
+    def shape(self, i: int) -> Tuple[str, ...]:
+        keys = self._shapes.get(i)
+        if keys is None:
+            start, end = struct.unpack_from("<2I", self._mm, self._shape_offsets_at + i * 4)
+            indices = struct.unpack_from(f"<{end - start}I", self._mm, self._shape_keys_at + start * 4)
+            keys = self._shapes[i] = tuple(self.string(k) for k in indices)
+        return keys
+
+    def exam_ids(self) -> List[str]:
+        return [self.string(_EXAM.unpack_from(self._mm, self._exams_at + i * _EXAM.size)[0])
+                for i in range(self.n_exams)]
+
+    def exam(self, pos: int) -> dict:
+        exam_id, name, shape, q_start, q_count, extra = _EXAM.unpack_from(
+            self._mm, self._exams_at + pos * _EXAM.size)
+        values: Dict[str, Any] = {"examId": self.string(exam_id), "examName": self.string(name)}
+        values["questions"] = [self.question(q_start + i) for i in range(q_count)]
+        if extra != NULL:
+            values.update(json.loads(self.string(extra)))
+        return {key: values[key] for key in self.shape(shape)}
+
+    def question(self, pos: int) -> dict:
+        qid, shape, *cols, opt_start, opt_count, extra = _QUESTION.unpack_from(
+            self._mm, self._questions_at + pos * _QUESTION.size)
+        values: Dict[str, Any] = {"id": qid}
+        for name, idx in zip(QUESTION_COLUMNS, cols):
+            values[name] = self.string(idx)
+        options: Dict[str, Any] = {}
+        for i in range(opt_start, opt_start + opt_count):
+            key, text, image, kind = _OPTION.unpack_from(self._mm, self._options_at + i * _OPTION.size)
+            if kind == OPT_TEXT:
+                options[self.string(key)] = self.string(text)
+            elif kind == OPT_IMAGE:
+                options[self.string(key)] = {"text": self.string(text), "imageUrl": self.string(image)}
+            else:
+                options[self.string(key)] = json.loads(self.string(text))
+        values["options"] = options
+        if extra != NULL:
+            values.update(json.loads(self.string(extra)))
+        return {key: values[key] for key in self.shape(shape)}
+
+    def to_exams(self, exam_ids: Optional[Iterable[str]] = None) -> List[dict]:
+        """
+        Exams in file order (only those in `exam_ids` when given).
+
+        For every exam the string table is decoded with one UTF-8 decode of the
+        blob sliced by character offsets; for a subset only the strings it uses are
+        decoded. Records of each exam are unpacked section by section and each shape
+        becomes an itemgetter over the record's values, so plain records build their
+        dict without a per-key Python loop.
+        """
+        mm = self._mm
+        if exam_ids is None:
+            n = self.n_strings
+            text = mm[self._blob_at:self._blob_at + self._blob_size].decode("utf-8")
+            chars = struct.unpack_from(f"<{n + 1}I", mm, self._chars_at)
+            strings: Dict[int, Optional[str]] = {i: text[chars[i]:chars[i + 1]] for i in range(n)}
+            strings[NULL] = None
+        else:
+            strings = _LazyStrings(self)
+
+        shape_offsets = struct.unpack_from(f"<{self.n_shapes + 1}I", mm, self._shape_offsets_at)
+        shape_keys = struct.unpack_from(f"<{shape_offsets[-1]}I", mm, self._shape_keys_at)
+        shapes = [tuple(strings[k] for k in shape_keys[shape_offsets[i]:shape_offsets[i + 1]])
+                  for i in range(self.n_shapes)]
+
+        q_fields = ("id",) + QUESTION_COLUMNS + ("options",)
+        plans: Dict[int, Optional[Callable[[tuple], Any]]] = {}
+
+        def plan(shape: int) -> Optional[Callable[[tuple], Any]]:
+            # itemgetter over (id, columns..., options) when every key is a fixed field
+            if shape not in plans:
+                keys = shapes[shape]
+                if keys and all(k in q_fields for k in keys):
+                    getter = itemgetter(*(q_fields.index(k) for k in keys))
+                    plans[shape] = getter if len(keys) > 1 else (lambda vals, g=getter: (g(vals),))
+                else:
+                    plans[shape] = None
+            return plans[shape]
+
+        exam_rows = list(_EXAM.iter_unpack(mm[self._exams_at:self._exams_at + self.n_exams * _EXAM.size]))
+        if exam_ids is not None:
+            wanted = set(exam_ids)
+            exam_rows = [row for row in exam_rows if strings[row[0]] in wanted]
+
+        exams = []
+        for exam_id, name, shape, q_start, q_count, extra in exam_rows:
+            at = self._questions_at + q_start * _QUESTION.size
+            q_rows = list(_QUESTION.iter_unpack(mm[at:at + q_count * _QUESTION.size]))
+            o_start = q_rows[0][7] if q_rows else 0
+            o_end = q_rows[-1][7] + q_rows[-1][8] if q_rows else 0
+            at = self._options_at + o_start * _OPTION.size
+            options = [
+                (strings[key], strings[value]) if kind == OPT_TEXT
+                else (strings[key], {"text": strings[value], "imageUrl": strings[image]}) if kind == OPT_IMAGE
+                else (strings[key], json.loads(strings[value]))
+                for key, value, image, kind in _OPTION.iter_unpack(
+                    mm[at:at + (o_end - o_start) * _OPTION.size])
+            ]
+
+            questions = []
+            for qid, q_shape, q_text, image, answer, explanation, category, opt_start, opt_count, q_extra in q_rows:
+                first = opt_start - o_start
+                vals = (qid, strings[q_text], strings[image], strings[answer],
+                        strings[explanation], strings[category],
+                        dict(options[first:first + opt_count]))
+                getter = plan(q_shape) if q_extra == NULL else None
+                if getter is not None:
+                    questions.append(dict(zip(shapes[q_shape], getter(vals))))
+                    continue
+                values = dict(zip(q_fields, vals))
+                if q_extra != NULL:
+                    values.update(json.loads(strings[q_extra]))
+                questions.append({key: values[key] for key in shapes[q_shape]})
+
+            values = {"examId": strings[exam_id], "examName": strings[name], "questions": questions}
+            if extra != NULL:
+                values.update(json.loads(strings[extra]))
+            exams.append({key: values[key] for key in shapes[shape]})
+        return exams
+
+
+class _LazyStrings(dict):
+    """String table index -> str, decoded from the snapshot on first lookup."""
+
+    def __init__(self, snap: Snapshot):
+        super().__init__({NULL: None})
+        self.snap = snap
+
+    def __missing__(self, i: int) -> str:
+        value = self[i] = self.snap.string(i)
+        return value
+
+
+def build(exams_file: str = EXAMS_FILE, snapshot_file: str = SNAPSHOT_FILE) -> int:
+    st = os.stat(exams_file)
+    with open(exams_file, "rb") as f:
+        raw = f.read()
+    payload = encode(json.loads(raw), hashlib.sha256(raw).hexdigest(), (st.st_size, st.st_mtime_ns))
+    os.makedirs(os.path.dirname(snapshot_file) or ".", exist_ok=True)
+    tmp_path = snapshot_file + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, snapshot_file)
+    return len(payload)
+
+
+def load_exams(exams_file: str = EXAMS_FILE, snapshot_file: str = SNAPSHOT_FILE,
+               exam_ids: Optional[Iterable[str]] = None) -> List[dict]:
+    """
+    exams.json contents (only `exam_ids` when given), from the snapshot while
+    exams.json keeps the size and mtime it was built from; otherwise the snapshot
+    is rebuilt and the file parsed.
+    """
+    if os.path.exists(snapshot_file):
+        try:
+            snap = Snapshot(snapshot_file)
+        except ValueError:
+            snap = None
+        if snap is not None:
+            try:
+                if snap.matches(exams_file):
+                    return snap.to_exams(exam_ids)
+            finally:
+                snap.close()
+    build(exams_file, snapshot_file)
+    with open(exams_file, "r", encoding="utf-8") as f:
+        exams = json.load(f)
+    if exam_ids is not None:
+        wanted = set(exam_ids)
+        exams = [e for e in exams if e.get("examId") in wanted]
+    return exams
+
+
+# Benchmark -----------------------------------------------------------------
+
+def run_benchmark(repeat: int = 20) -> None:
+    import tempfile
+
+    with open(EXAMS_FILE, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+    exam_id = data[len(data) // 2].get("examId")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "exams.snapshot")
+        build(EXAMS_FILE, path)
+        payload_size = os.path.getsize(path)
+
+        def timed(fn) -> float:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                fn()
+            return (time.perf_counter() - start) / repeat * 1000
+
+        def json_load():
+            with open(EXAMS_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        def json_one():
+            return [e for e in json_load() if e.get("examId") == exam_id]
+
+        def snap_one_question():
+            snap = Snapshot(path)
+            q = snap.question(snap.n_questions // 2)
+            snap.close()
+            return q
+
+        restored = load_exams(EXAMS_FILE, path)
+        identical = (json.dumps(restored, ensure_ascii=False, indent=2).encode("utf-8") == raw
+                     and load_exams(EXAMS_FILE, path, [exam_id]) == json_one())
+        odd = [{"examId": "x", "": 1, "a,b": [2], "questions": [
+            {"id": 1, "": None, "c,d": "e", "options": {"": "f", "A,B": {"text": "g"}}}]}]
+        odd_path = os.path.join(tmp, "odd.snapshot")
+        with open(odd_path, "wb") as f:
+            f.write(encode(odd))
+        odd_snap = Snapshot(odd_path)
+        odd_ok = json.dumps(odd_snap.to_exams()) == json.dumps(odd) == json.dumps([odd_snap.exam(0)])
+        odd_snap.close()
+        compact = len(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        full_json, full_snap = timed(json_load), timed(lambda: load_exams(EXAMS_FILE, path))
+        one_json, one_snap = timed(json_one), timed(lambda: load_exams(EXAMS_FILE, path, [exam_id]))
+
+        print(f"📦 Boyut: exams.json {len(raw) / 1024:.0f} KB, girintisiz JSON {compact / 1024:.0f} KB, "
+              f"anlık görüntü {payload_size / 1024:.0f} KB")
+        print(f"⏱️  Yükleme, {repeat} tekrar ortalaması (tazelik denetimi dahil)")
+        print(f"  - json.load                     {full_json:7.2f} ms")
+        print(f"  - load_exams (tümü)             {full_snap:7.2f} ms  ({full_json / full_snap:4.1f}x)")
+        print(f"  - json.load + {exam_id:<16}{one_json:7.2f} ms")
+        print(f"  - load_exams ({exam_id}) {one_snap:7.2f} ms  ({one_json / one_snap:4.1f}x)")
+        print(f"  - anlık görüntü (1 soru)        {timed(snap_one_question):7.2f} ms")
+        print(f"  - Birebir geri dönüşüm: {identical}; boş/virgüllü anahtarlar: {odd_ok}")
+
+
+def main() -> int:
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command in ("build", "benchmark") and not os.path.exists(EXAMS_FILE):
+        print(f"❌ Bulunamadı: {EXAMS_FILE}")
+        return 1
+    if command == "build":
+        size = build()
+        print(f"✅ {SNAPSHOT_FILE} ({size / 1024:.0f} KB)")
+    elif command == "export" and len(sys.argv) > 2:
+        snap = Snapshot()
+        exams = snap.to_exams()
+        snap.close()
+        with open(sys.argv[2], "w", encoding="utf-8") as f:
+            json.dump(exams, f, ensure_ascii=False, indent=2)
+        print(f"✅ {sys.argv[2]} ({len(exams)} deneme)")
+    elif command == "benchmark":
+        run_benchmark()
+    else:
+        print("❌ Komut: build | export OUT | benchmark")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
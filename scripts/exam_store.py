@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Transactional access to exams.json.
+
+Scripts load the file once through ExamStore, change it either with typed
+mutations (SetImage, SetImageSize, SetField, FillField, AddExam, RemoveExam) or by editing
+`store.data` in place, and call `store.save(reason)`. Saving diffs the data
+against what was loaded, writes the file atomically (temp file + fsync +
+os.replace) only if something changed, and appends the diff to a journal in
+assets/data/.journal instead of leaving a full-size exams.json.bak copy behind.
+
+The journal holds one JSON line per save with the file hash before and after
+and every changed exam or question field with its old and new value, a change
+in the order of the exams, plus the
+old position of a key that was removed or moved, so undo puts it back in place
+and the file comes back byte for byte. It is
+rotated once it reaches JOURNAL_MAX_BYTES and only JOURNAL_KEEP files are kept,
+so it stays bounded. `undo` reverts the latest entry if the file has not been
+changed since.
+
+Usage:
+    python3 scripts/exam_store.py log    # list journal entries
+    python3 scripts/exam_store.py undo   # revert the latest save
+"""
+
+from __future__ import annotations
+import glob
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+EXAMS_FILE = "assets/data/exams.json"
+JOURNAL_DIRNAME = ".journal"
+JOURNAL_MAX_BYTES = 512 * 1024
+JOURNAL_KEEP = 3
+
+_MISSING = object()
+
+
+# Mutations -----------------------------------------------------------------
+
+class SetImage(NamedTuple):
+    """Set a question's imageUrl, or an option's imageUrl when `option` is given."""
+    exam_id: str
+    question_id: int
+    url: Optional[str]
+    option: Optional[str] = None
+
+
+class SetImageSize(NamedTuple):
+    """Set imageWidth/imageHeight right after a question's (or an option's) imageUrl."""
+    exam_id: str
+    question_id: int
+    width: int
+    height: int
+    option: Optional[str] = None
+
+
+class SetField(NamedTuple):
+    exam_id: str
+    question_id: int
+    field: str
+    value: Any
+
+
+class FillField(NamedTuple):
+    """Set `field` on every question where it is missing or null, in one exam or all."""
+    field: str
+    value: Any
+    exam_id: Optional[str] = None
+
+
+class AddExam(NamedTuple):
+    """Append an exam; with `replace`, an exam with the same examId is replaced in place."""
+    exam: dict
+    replace: bool = False
+
+
+class RemoveExam(NamedTuple):
+    exam_id: str
+
+
+Mutation = Union[SetImage, SetImageSize, SetField, FillField, AddExam, RemoveExam]
+
+IMAGE_SIZE_FIELDS = ("imageWidth", "imageHeight")
+
+
+def _set_image_size(target: dict, width: int, height: int) -> bool:
+    """Put the size fields right after imageUrl; returns whether anything changed."""
+    if (target.get("imageWidth"), target.get("imageHeight")) == (width, height):
+        return False
+    items = [(k, v) for k, v in target.items() if k not in IMAGE_SIZE_FIELDS]
+    target.clear()
+    for key, value in items:
+        target[key] = value
+        if key == "imageUrl":
+            target.update(imageWidth=width, imageHeight=height)
+    return True
+
+
+def _drop_image_size(target: dict) -> None:
+    # A size describes the previous image, not the new one
+    for key in IMAGE_SIZE_FIELDS:
+        target.pop(key, None)
+
+
+def _serialize(data: List[dict]) -> bytes:
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _sha256(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+class ExamStore:
+    """exams.json loaded once, with atomic journaled saves."""
+
+    def __init__(self, path: str = EXAMS_FILE, journal_dir: Optional[str] = None):
+        self.path = path
+        self.journal_dir = journal_dir or os.path.join(os.path.dirname(path) or ".", JOURNAL_DIRNAME)
+        with open(path, "rb") as f:
+            self._raw = f.read()
+        self.data: List[dict] = json.loads(self._raw)
+        self.source_hash = _sha256(self._raw)
+
+    # Lookup ------------------------------------------------------------------
+
+    def exam(self, exam_id: str) -> dict:
+        for exam in self.data:
+            if exam.get("examId") == exam_id:
+                return exam
+        raise ValueError(f"Deneme bulunamadı: {exam_id}")
+
+    def question(self, exam_id: str, question_id: int) -> dict:
+        for q in self.exam(exam_id).get("questions", []):
+            if q.get("id") == question_id:
+                return q
+        raise ValueError(f"Soru bulunamadı: {exam_id} #{question_id}")
+
+    def exam_ids(self) -> List[str]:
+        return [exam.get("examId", "") for exam in self.data]
+
+    # Mutations ---------------------------------------------------------------
+
+    def apply(self, mutations: Iterable[Mutation]) -> int:
+        """Apply mutations in order; returns how many questions or exams actually changed."""
+        changed = 0
+        for m in mutations:
+            if isinstance(m, SetImage):
+                q = self.question(m.exam_id, m.question_id)
+                if m.option is None:
+                    if q.get("imageUrl") != m.url:
+                        q["imageUrl"] = m.url
+                        _drop_image_size(q)
+                        changed += 1
+                    continue
+                options = q.setdefault("options", {})
+                if m.option not in options:
+                    raise ValueError(f"Seçenek bulunamadı: {m.exam_id} #{m.question_id} {m.option}")
+                value = options[m.option]
+                if not isinstance(value, dict):
+                    options[m.option] = {"text": value, "imageUrl": m.url}
+                    changed += 1
+                elif value.get("imageUrl") != m.url:
+                    value["imageUrl"] = m.url
+                    _drop_image_size(value)
+                    changed += 1
+            elif isinstance(m, SetImageSize):
+                q = self.question(m.exam_id, m.question_id)
+                target = q if m.option is None else q.get("options", {}).get(m.option)
+                if not isinstance(target, dict) or "imageUrl" not in target:
+                    raise ValueError(f"Görsel bulunamadı: {m.exam_id} #{m.question_id} {m.option or ''}".rstrip())
+                if _set_image_size(target, m.width, m.height):
+                    changed += 1
+            elif isinstance(m, SetField):
+                q = self.question(m.exam_id, m.question_id)
+                if q.get(m.field, _MISSING) != m.value:
+                    q[m.field] = m.value
+                    changed += 1
+            elif isinstance(m, FillField):
+                exams = [self.exam(m.exam_id)] if m.exam_id else self.data
+                for exam in exams:
+                    for q in exam.get("questions", []):
+                        if q.get(m.field) is None:
+                            q[m.field] = m.value
+                            changed += 1
+            elif isinstance(m, AddExam):
+                exam_id = m.exam.get("examId")
+                positions = [i for i, e in enumerate(self.data) if e.get("examId") == exam_id]
+                if positions and not m.replace:
+                    raise ValueError(f"Deneme zaten var: {exam_id}")
+                if positions:
+                    if self.data[positions[0]] != m.exam:
+                        self.data[positions[0]] = m.exam
+                        changed += 1
+                else:
+                    self.data.append(m.exam)
+                    changed += 1
+            elif isinstance(m, RemoveExam):
+                before = len(self.data)
+                self.data[:] = [e for e in self.data if e.get("examId") != m.exam_id]
+                changed += before - len(self.data)
+            else:
+                raise TypeError(f"Unknown mutation: {m!r}")
+        return changed
+
+    # Saving ------------------------------------------------------------------
+
+    def original(self) -> List[dict]:
+        """The data as loaded (or last saved), before any unsaved changes."""
+        return json.loads(self._raw)
+
+    def diff(self) -> List[dict]:
+        """Changes of `data` relative to the file as loaded, in journal form.
+
+        Exams are matched by examId, so a duplicate examId on either side raises
+        ValueError instead of comparing one copy against the other.
+        """
+        old_by_id = _exams_by_id(self.original())
+        new_by_id = _exams_by_id(self.data)
+        changes: List[dict] = []
+        for exam_id, (pos, old) in old_by_id.items():
+            if exam_id not in new_by_id:
+                changes.append({"op": "removeExam", "examId": exam_id, "position": pos, "exam": old})
+        old_order = [exam_id for exam_id in old_by_id if exam_id in new_by_id]
+        new_order = [exam_id for exam_id in new_by_id if exam_id in old_by_id]
+        if old_order != new_order:
+            changes.append({"op": "moveExams", "old": old_order, "new": new_order})
+        for pos, exam in enumerate(self.data):
+            exam_id = exam.get("examId")
+            if exam_id not in old_by_id:
+                changes.append({"op": "addExam", "examId": exam_id, "position": pos, "exam": exam})
+                continue
+            old = old_by_id[exam_id][1]
+            if old != exam:
+                changes.extend(_exam_changes(exam_id, old, exam))
+        return changes
+
+    def save(self, reason: str) -> List[dict]:
+        """Write the file atomically and journal the diff; no-op when nothing changed."""
+        changes = self.diff()
+        if not changes:
+            return changes
+        raw = _serialize(self.data)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._append_journal({
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "reason": reason,
+            "before": self.source_hash,
+            "after": _sha256(raw),
+            "changes": changes,
+        })
+        self._raw = raw
+        self.source_hash = _sha256(raw)
+        return changes
+
+    # Journal -----------------------------------------------------------------
+
+    def journal_files(self) -> List[str]:
+        """Journal files, newest first."""
+        current = os.path.join(self.journal_dir, "exams.jsonl")
+        rotated = sorted(
+            glob.glob(current + ".*"), key=lambda p: int(p.rsplit(".", 1)[1])
+        )
+        return ([current] if os.path.exists(current) else []) + rotated
+
+    def _append_journal(self, entry: dict) -> None:
+        os.makedirs(self.journal_dir, exist_ok=True)
+        current = os.path.join(self.journal_dir, "exams.jsonl")
+        if os.path.exists(current) and os.path.getsize(current) >= JOURNAL_MAX_BYTES:
+            for n in range(JOURNAL_KEEP - 1, 0, -1):
+                src = current if n == 1 else f"{current}.{n - 1}"
+                if os.path.exists(src):
+                    os.replace(src, f"{current}.{n}")
+            overflow = f"{current}.{JOURNAL_KEEP}"
+            if os.path.exists(overflow):
+                os.remove(overflow)
+        with open(current, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def journal(self) -> List[dict]:
+        """All journal entries, oldest first."""
+        entries: List[dict] = []
+        for path in reversed(self.journal_files()):
+            with open(path, "r", encoding="utf-8") as f:
+                entries.extend(json.loads(line) for line in f if line.strip())
+        return entries
+
+    def undo(self) -> dict:
+        """Revert the latest journal entry and drop it from the journal."""
+        files = self.journal_files()
+        if not files:
+            raise ValueError("Günlük boş")
+        with open(files[0], "r", encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+        entry = json.loads(lines[-1])
+        if entry["after"] != self.source_hash:
+            raise ValueError("exams.json son kayıttan sonra değişmiş; geri alınamaz")
+
+        changes = entry["changes"]
+        # Removed exams and keys go back last and in ascending position, so each lands where it was
+        for change in reversed(changes):
+            if not _reinserts(change):
+                _revert(self.data, change)
+            elif "keyIndex" in change:
+                _target(self.data, change).pop(change["field"], None)
+        for change in sorted(filter(_reinserts, changes), key=_position):
+            _revert(self.data, change)
+        raw = _serialize(self.data)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._raw = raw
+        self.source_hash = _sha256(raw)
+
+        if len(lines) > 1:
+            with open(files[0], "w", encoding="utf-8") as f:
+                f.writelines(lines[:-1])
+        else:
+            os.remove(files[0])
+            # Promote the next rotated file so the journal stays contiguous
+            for n, path in enumerate(files[1:]):
+                os.replace(path, files[0] if n == 0 else f"{files[0]}.{n}")
+        return entry
+
+
+def _exams_by_id(exams: List[dict]) -> Dict[Any, Tuple[int, dict]]:
+    by_id: Dict[Any, Tuple[int, dict]] = {}
+    for pos, exam in enumerate(exams):
+        exam_id = exam.get("examId")
+        if exam_id in by_id:
+            raise ValueError(f"Aynı examId birden fazla denemede: {exam_id}")
+        by_id[exam_id] = (pos, exam)
+    return by_id
+
+
+def _exam_changes(exam_id: str, old: dict, new: dict) -> List[dict]:
+    changes: List[dict] = []
+    for field in sorted(set(old) | set(new)):
+        if field == "questions":
+            continue
+        if old.get(field, _MISSING) != new.get(field, _MISSING):
+            changes.append(_field_change({"op": "setExamField", "examId": exam_id, "field": field},
+                                         old.get(field, _MISSING), new.get(field, _MISSING), old, new))
+    old_qs, new_qs = old.get("questions", []), new.get("questions", [])
+    if len(old_qs) != len(new_qs):
+        changes.append(_field_change({"op": "setExamField", "examId": exam_id, "field": "questions"},
+                                     old_qs, new_qs, old, new))
+        return changes
+    for pos, (oq, nq) in enumerate(zip(old_qs, new_qs)):
+        if oq == nq:
+            continue
+        for field in sorted(set(oq) | set(nq)):
+            ov, nv = oq.get(field, _MISSING), nq.get(field, _MISSING)
+            if ov != nv:
+                changes.append(_field_change(
+                    {"op": "setField", "examId": exam_id, "position": pos, "questionId": nq.get("id"), "field": field},
+                    ov, nv, oq, nq,
+                ))
+    return changes
+
+
+def _field_change(change: dict, old: Any, new: Any, old_target: dict, new_target: dict) -> dict:
+    # A missing key is recorded by leaving out "old" / "new"
+    field = change["field"]
+    if old is not _MISSING:
+        change["old"] = old
+    if field in old_target:
+        key_index = list(old_target).index(field)
+        if field not in new_target or list(new_target).index(field) != key_index:
+            change["keyIndex"] = key_index
+    if new is not _MISSING:
+        change["new"] = new
+    return change
+
+
+def _reinserts(change: dict) -> bool:
+    return change["op"] == "removeExam" or "keyIndex" in change
+
+
+def _position(change: dict) -> int:
+    return change["position"] if change["op"] == "removeExam" else change["keyIndex"]
+
+
+def _target(data: List[dict], change: dict) -> dict:
+    exam = next(e for e in data if e.get("examId") == change["examId"])
+    return exam if change["op"] == "setExamField" else exam["questions"][change["position"]]
+
+
+def _revert(data: List[dict], change: dict) -> None:
+    op = change["op"]
+    if op == "addExam":
+        data[:] = [e for e in data if e.get("examId") != change["examId"]]
+    elif op == "removeExam":
+        data.insert(min(change["position"], len(data)), change["exam"])
+    elif op == "moveExams":
+        # Put the exams both sides share back in their old order, in the slots they occupy now
+        by_id = {e.get("examId"): e for e in data}
+        shared = set(change["old"])
+        slots = [i for i, e in enumerate(data) if e.get("examId") in shared]
+        for i, exam_id in zip(slots, change["old"]):
+            data[i] = by_id[exam_id]
+    else:
+        target = _target(data, change)
+        if "keyIndex" in change:
+            items = [(k, v) for k, v in target.items() if k != change["field"]]
+            items.insert(min(change["keyIndex"], len(items)), (change["field"], change["old"]))
+            target.clear()
+            target.update(items)
+        elif "old" in change:
+            target[change["field"]] = change["old"]
+        else:
+            target.pop(change["field"], None)
+
+
+def main() -> int:
+    command = sys.argv[1] if len(sys.argv) > 1 else "log"
+    if not os.path.exists(EXAMS_FILE):
+        print(f"❌ Bulunamadı: {EXAMS_FILE}")
+        return 1
+    store = ExamStore()
+
+    if command == "log":
+        entries = store.journal()
+        if not entries:
+            print("ℹ️ Günlük boş")
+            return 0
+        for entry in entries:
+            print(f"  {entry['time']}  {entry['reason']:<32} {len(entry['changes']):>5} değişiklik")
+        journal_bytes = sum(os.path.getsize(p) for p in store.journal_files())
+        print(f"📄 {len(entries)} kayıt, {journal_bytes / 1024:.1f} KB "
+              f"(tam yedekler: {len(entries) * len(store._raw) / 1024:.1f} KB)")
+        return 0
+    if command == "undo":
+        try:
+            entry = store.undo()
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"✅ Geri alındı: {entry['time']} {entry['reason']} ({len(entry['changes'])} değişiklik)")
+        return 0
+    print(f"❌ Bilinmeyen komut: {command} (log | undo)")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Incremental reader for exams.json.
+
+json.load builds the whole object graph before a tool can look at the first
+question. iter_questions instead reads the file in fixed-size chunks and decodes
+one question object at a time with JSONDecoder.raw_decode, yielding
+(examId, question) pairs. Only the current chunk and the current question are
+held, so memory stays bounded by the largest single question rather than the
+file; breaking out of the loop stops reading. Questions of exams outside
+`exam_ids` are decoded and dropped without being yielded, and reading stops
+once every wanted exam has been passed. iter_exams does the same one whole exam
+at a time for callers that need exam-level fields.
+
+Usage:
+    python3 scripts/exam_stream.py [examId ...]   # count questions per exam
+    python3 scripts/exam_stream.py --benchmark    # peak RSS and time vs. json.load
+"""
+
+from __future__ import annotations
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+EXAMS_FILE = "assets/data/exams.json"
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"\s*")
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Character buffer over a text file that grows on demand and drops consumed text."""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file), without consuming it."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        found = self.peek()
+        if found != ch:
+            raise ValueError(f"Beklenen '{ch}', bulunan '{found or 'EOF'}'")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode one JSON value, reading more of the file until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_questions(
+    path: str = EXAMS_FILE,
+    exam_ids: Optional[Iterable[str]] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Tuple[str, dict]]:
+    """Yield (examId, question) for every question, optionally only from `exam_ids`."""
+    wanted = set(exam_ids) if exam_ids is not None else None
+    with open(path, "r", encoding="utf-8") as f:
+        r = _Reader(f, chunk_size)
+        r.expect("[")
+        if r.peek() == "]":
+            return
+        while True:
+            r.expect("{")
+            exam_id: Optional[str] = None
+            pending = []  # questions seen before the examId key, if the file orders keys that way
+            if r.peek() != "}":
+                while True:
+                    key = r.value()
+                    r.expect(":")
+                    if key != "questions":
+                        value = r.value()
+                        if key == "examId":
+                            exam_id = value
+                            if wanted is None or exam_id in wanted:
+                                yield from ((exam_id, q) for q in pending)
+                            pending = []
+                    else:
+                        r.expect("[")
+                        if r.peek() != "]":
+                            while True:
+                                q = r.value()
+                                if exam_id is None:
+                                    pending.append(q)
+                                elif wanted is None or exam_id in wanted:
+                                    yield exam_id, q
+                                if r.peek() != ",":
+                                    break
+                                r.pos += 1
+                        r.expect("]")
+                    if r.peek() != ",":
+                        break
+                    r.pos += 1
+            r.expect("}")
+            if exam_id is None and (wanted is None or "" in wanted):
+                yield from (("", q) for q in pending)
+            if wanted is not None and exam_id in wanted:
+                wanted.discard(exam_id)
+                if not wanted:
+                    return
+            if r.peek() != ",":
+                break
+            r.pos += 1
+        r.expect("]")
+
+
+def iter_exams(
+    path: str = EXAMS_FILE,
+    exam_ids: Optional[Iterable[str]] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[dict]:
+    """Yield whole exam objects one at a time, stopping once every wanted exam was seen."""
+    wanted = set(exam_ids) if exam_ids is not None else None
+    with open(path, "r", encoding="utf-8") as f:
+        r = _Reader(f, chunk_size)
+        r.expect("[")
+        if r.peek() == "]":
+            return
+        while True:
+            exam = r.value()
+            exam_id = exam.get("examId", "")
+            if wanted is None or exam_id in wanted:
+                yield exam
+                if wanted is not None:
+                    wanted.discard(exam_id)
+                    if not wanted:
+                        return
+            if r.peek() != ",":
+                break
+            r.pos += 1
+        r.expect("]")
+
+
+# Benchmark -----------------------------------------------------------------
+
+def _measure(method: str, path: str) -> Dict[str, float]:
+    import resource
+
+    start = time.perf_counter()
+    if method == "json.load":
+        with open(path, "r", encoding="utf-8") as f:
+            count = sum(len(e.get("questions", [])) for e in json.load(f))
+    elif method == "stream":
+        count = sum(1 for _ in iter_questions(path))
+    elif method == "stream-first":
+        count = sum(1 for _ in iter_questions(path, ["deneme_sinavi_1"]))
+    else:
+        count = 0
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is KiB on Linux
+    return {"seconds": elapsed, "peakKiB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "questions": count}
+
+
+def _synthetic(path: str, scale: int, out_path: str) -> None:
+    with open(path, "r", encoding="utf-8") as f:
+        exams = json.load(f)
+    big = []
+    for i in range(scale):
+        for exam in exams:
+            # The first copy keeps the real ids so filtered reads can stop early
+            big.append(exam if i == 0 else dict(exam, examId=f"{exam.get('examId')}_x{i}"))
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(big, f, ensure_ascii=False, indent=2)
+
+
+def run_benchmark(scale: int = 50) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        big_path = os.path.join(tmp, f"exams_x{scale}.json")
+        _synthetic(EXAMS_FILE, scale, big_path)
+        for label, path in [("exams.json", EXAMS_FILE), (f"{scale}x sentetik", big_path)]:
+            print(f"⏱️  {label} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+            for method in ("baseline", "json.load", "stream", "stream-first"):
+                # A fresh interpreter per method, since peak RSS never goes down
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--measure", method, path],
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                m = json.loads(out)
+                print(f"  - {method:<13} {m['seconds'] * 1000:9.1f} ms  tepe RSS {m['peakKiB'] / 1024:7.1f} MB  "
+                      f"{m['questions']:>7} soru")
+
+
+def main() -> int:
+    if len(sys.argv) == 4 and sys.argv[1] == "--measure":
+        print(json.dumps(_measure(sys.argv[2], sys.argv[3])))
+        return 0
+    if not os.path.exists(EXAMS_FILE):
+        print(f"❌ Bulunamadı: {EXAMS_FILE}")
+        return 1
+    if "--benchmark" in sys.argv:
+        run_benchmark()
+        return 0
+
+    counts: Dict[str, int] = {}
+    for exam_id, _ in iter_questions(EXAMS_FILE, sys.argv[1:] or None):
+        counts[exam_id] = counts.get(exam_id, 0) + 1
+    for exam_id, count in counts.items():
+        print(f"  - {exam_id}: {count} soru")
+    print(f"✅ {len(counts)} deneme, {sum(counts.values())} soru")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
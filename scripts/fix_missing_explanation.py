@@ -1,6 +1,7 @@
-import json
 import os
 
+from exam_store import ExamStore, FillField
+
 EXAMS_FILE = 'assets/data/exams.json'
 
 def fix_explanations():
@@ -9,19 +10,12 @@ def fix_explanations():
         return
 
     try:
-        with open(EXAMS_FILE, 'r', encoding='utf-8') as f:
-            exams = json.load(f)
+        store = ExamStore(EXAMS_FILE)
         
-        fixed_count = 0
-        for exam in exams:
-            for question in exam['questions']:
-                if 'explanation' not in question or question['explanation'] is None:
-                    question['explanation'] = "Açıklama henüz eklenmedi."
-                    fixed_count += 1
+        fixed_count = store.apply([FillField("explanation", "Açıklama henüz eklenmedi.")])
         
         if fixed_count > 0:
-            with open(EXAMS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(exams, f, ensure_ascii=False, indent=2)
+            store.save("fix_missing_explanation")
             print(f"Fixed {fixed_count} questions by adding default explanation.")
         else:
             print("No questions found missing explanations.")
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+In-memory manifest of the files under assets/images.
+
+Propagation scripts check whether a question's imageUrl exists on disk once per
+source occurrence, so the same shared image path is stat'ed over and over. This
+module walks assets/images (downloaded/ and traffic_signs/ included) once into a
+set of project-relative paths and answers existence checks from it.
+
+The manifest can be persisted to .cache/image_manifest.json together with the
+mtime of every scanned directory. Adding, removing or renaming a file changes
+its directory's mtime, so a later run only has to stat the directories (a dozen
+or so) instead of every image to know whether the saved manifest is current.
+
+Usage:
+    python3 scripts/image_manifest.py              # scan (or reuse) and persist the manifest
+    python3 scripts/image_manifest.py --benchmark  # manifest lookups vs. os.path.exists
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, Optional, Set
+
+from question_index import EXAMS_FILE, has_image, load_exams
+
+IMAGES_DIR = "assets/images"
+MANIFEST_FILE = ".cache/image_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def _relative(url: str) -> str:
+    return os.path.normpath(url).replace(os.sep, "/")
+
+
+class ImageManifest:
+    """Set of project-relative file paths under assets/images plus the mtimes they were read at."""
+
+    def __init__(self, files: Set[str], dir_mtimes: Dict[str, int], project_dir: str = "."):
+        self.files = files
+        self.dir_mtimes = dir_mtimes
+        self.project_dir = project_dir
+
+    @classmethod
+    def scan(cls, project_dir: str = ".", images_dir: str = IMAGES_DIR) -> "ImageManifest":
+        files: Set[str] = set()
+        dir_mtimes: Dict[str, int] = {}
+        pending = [images_dir]
+        while pending:
+            rel_dir = pending.pop()
+            abs_dir = os.path.join(project_dir, rel_dir)
+            try:
+                dir_mtimes[rel_dir] = os.stat(abs_dir).st_mtime_ns
+                entries = list(os.scandir(abs_dir))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                rel = f"{rel_dir}/{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(rel)
+                else:
+                    files.add(rel)
+        return cls(files, dir_mtimes, project_dir)
+
+    def is_current(self) -> bool:
+        """True if no scanned directory has been modified, added to or removed since the scan."""
+        for rel_dir, mtime in self.dir_mtimes.items():
+            try:
+                if os.stat(os.path.join(self.project_dir, rel_dir)).st_mtime_ns != mtime:
+                    return False
+            except FileNotFoundError:
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def key(self) -> str:
+        """sha256 of the sorted file set; changes whenever a file is added, removed or renamed."""
+        return hashlib.sha256("\n".join(sorted(self.files)).encode("utf-8")).hexdigest()
+
+    def exists(self, image_url: Optional[str]) -> bool:
+        if not has_image(image_url):
+            return False
+        if image_url in self.files:
+            return True
+        rel = _relative(image_url)
+        if rel.startswith(IMAGES_DIR + "/"):
+            return rel in self.files
+        # Outside the scanned tree: fall back to the filesystem
+        return os.path.exists(os.path.join(self.project_dir, image_url))
+
+    # Persistence -------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        payload = {
+            "version": MANIFEST_VERSION,
+            "dirMtimes": self.dir_mtimes,
+            "files": sorted(self.files),
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, project_dir: str = ".") -> Optional["ImageManifest"]:
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != MANIFEST_VERSION:
+            return None
+        return cls(set(payload["files"]), payload["dirMtimes"], project_dir)
+
+
+def load_manifest(project_dir: str = ".", cache_path: Optional[str] = MANIFEST_FILE) -> ImageManifest:
+    """Reuse the persisted manifest if no directory changed since it was written, else rescan."""
+    abs_cache = os.path.join(project_dir, cache_path) if cache_path else None
+    if abs_cache:
+        cached = ImageManifest.load(abs_cache, project_dir)
+        if cached is not None and cached.is_current():
+            return cached
+    manifest = ImageManifest.scan(project_dir)
+    if abs_cache:
+        manifest.save(abs_cache)
+    return manifest
+
+
+_manifests: Dict[str, ImageManifest] = {}
+
+
+def shared_manifest(project_dir: str = ".") -> ImageManifest:
+    """One manifest per project dir for the lifetime of the process."""
+    manifest = _manifests.get(project_dir)
+    if manifest is None:
+        manifest = _manifests[project_dir] = load_manifest(project_dir)
+    return manifest
+
+
+def image_exists(image_url: Optional[str], project_dir: str = ".") -> bool:
+    """Existence check backed by the shared manifest."""
+    return shared_manifest(project_dir).exists(image_url)
+
+
+# Benchmark -----------------------------------------------------------------
+
+def run_benchmark(data: list, repeat: int = 20) -> None:
+    urls = [q.get("imageUrl") for exam in data for q in exam.get("questions", []) if has_image(q.get("imageUrl"))]
+    print(f"⏱️  {len(urls)} imageUrl ({len(set(urls))} farklı) x {repeat} tekrar")
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for url in urls:
+            os.path.exists(url)
+    stat_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    manifest = ImageManifest.scan()
+    scan_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for url in urls:
+            manifest.exists(url)
+    lookup_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "image_manifest.json")
+        manifest.save(path)
+        start = time.perf_counter()
+        cached = ImageManifest.load(path)
+        current = cached is not None and cached.is_current()
+        reload_s = time.perf_counter() - start
+
+    mismatches = sum(1 for url in set(urls) if manifest.exists(url) != os.path.exists(url))
+    print(f"  - os.path.exists:          {stat_s * 1000:8.1f} ms")
+    print(f"  - tarama ({len(manifest)} dosya):   {scan_s * 1000:8.1f} ms")
+    print(f"  - manifest sorguları:      {lookup_s * 1000:8.1f} ms")
+    print(f"  - kayıtlı manifest (güncel={current}, {len(manifest.dir_mtimes)} dizin stat): {reload_s * 1000:.1f} ms")
+    print(f"  - os.path.exists ile farklı sonuç: {mismatches}")
+
+
+def main() -> int:
+    if "--benchmark" in sys.argv:
+        if not os.path.exists(EXAMS_FILE):
+            print(f"❌ Bulunamadı: {EXAMS_FILE}")
+            return 1
+        data, _ = load_exams()
+        run_benchmark(data)
+        return 0
+
+    start = time.perf_counter()
+    manifest = load_manifest()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"✅ {len(manifest)} görsel dosyası, {len(manifest.dir_mtimes)} dizin ({elapsed:.1f} ms)")
+    print(f"📄 Manifest: {MANIFEST_FILE}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Header-only metadata index of assets/images: format, width, height and bytes.
+
+Nothing used to know image dimensions until the app decoded each file. Here the
+dimensions come from the first bytes of each file, without decoding pixels:
+the IHDR chunk of PNG, the logical screen descriptor of GIF, the VP8/VP8L/VP8X
+chunk header of WebP and the root element attributes (width/height, else
+viewBox) of SVG, each from a bounded read. JPEG stores its size in the SOF
+segment, which can sit behind large EXIF/ICC segments, so JPEG files are
+memory-mapped and only the segment headers are walked. The format is taken from
+the file signature, not the extension; a file whose signature is not an image
+(e.g. a saved HTML page) is listed as an error.
+
+Files are read on a thread pool (the work is a few small reads per file, so
+processes would cost more than they save). The manifest is saved to
+assets/data/.index/image_metadata.json, keyed by path; an entry is reused while
+the file's mtime and size are unchanged.
+
+--inject writes imageWidth/imageHeight right after every imageUrl in exams.json
+(through ExamStore) and traffic_signs.json, so the app can reserve the space
+before decoding. ExamStore's SetImage drops the size when it changes a path;
+run --inject again after tools that rewrite image paths.
+
+Usage:
+    python3 scripts/image_metadata.py [--workers N]   # build or update the manifest
+    python3 scripts/image_metadata.py --inject
+    python3 scripts/image_metadata.py --benchmark
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from exam_store import ExamStore, SetImageSize
+from image_refs import SIGNS_FILE, exam_references, image_path
+from optimize_images import EXAMS_FILE, IMAGES_DIR, file_sha256, write_signs
+from question_index import has_image
+
+MANIFEST_FILE = "assets/data/.index/image_metadata.json"
+
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg"}
+HEADER_BYTES = 32
+SVG_READ_LIMIT = 64 * 1024
+# Bump when header parsing changes so manifest entries are re-read
+METADATA_VERSION = 1
+
+# Start-of-frame markers; C4 (DHT), C8 (JPG) and CC (DAC) share the range but are not frames
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Markers without a length field
+_JPEG_STANDALONE = {0x01, 0xD8} | set(range(0xD0, 0xD8))
+_SVG_ROOT = re.compile(rb"<svg\b[^>]*>", re.IGNORECASE)
+_SVG_LENGTH = re.compile(r"^\s*([0-9.]+)\s*(px)?\s*$")
+_EXT_FORMATS = {".jpg": "jpeg", ".jpeg": "jpeg"}
+
+
+# Header parsing --------------------------------------------------------------
+
+def _jpeg_size(path: str) -> Tuple[int, int]:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos, end = 2, len(mm)
+        while pos + 4 <= end:
+            if mm[pos] != 0xFF:
+                raise ValueError(f"JPEG segment başlığı bozuk (konum {pos})")
+            marker = mm[pos + 1]
+            if marker == 0xFF:
+                pos += 1  # fill byte
+                continue
+            if marker in _JPEG_STANDALONE:
+                pos += 2
+                continue
+            if marker in _JPEG_SOF:
+                height, width = struct.unpack(">HH", mm[pos + 5:pos + 9])
+                return width, height
+            if marker == 0xDA:
+                break
+            pos += 2 + struct.unpack(">H", mm[pos + 2:pos + 4])[0]
+    raise ValueError("JPEG SOF segmenti bulunamadı")
+
+
+def _webp_size(head: bytes) -> Tuple[int, int]:
+    chunk = head[12:16]
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        b0, b1, b2, b3 = head[21:25]
+        return 1 + (((b1 & 0x3F) << 8) | b0), 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+    if chunk == b"VP8X":
+        return 1 + int.from_bytes(head[24:27], "little"), 1 + int.from_bytes(head[27:30], "little")
+    raise ValueError(f"Bilinmeyen WebP parçası: {chunk!r}")
+
+
+def _svg_attribute(root: str, name: str) -> Optional[str]:
+    match = re.search(r"\s" + name + r"\s*=\s*[\"']([^\"']*)[\"']", root)
+    return match.group(1) if match else None
+
+
+def _svg_size(path: str) -> Tuple[Optional[int], Optional[int]]:
+    with open(path, "rb") as f:
+        match = _SVG_ROOT.search(f.read(SVG_READ_LIMIT))
+    if not match:
+        raise ValueError("SVG kök elemanı bulunamadı")
+    root = match.group(0).decode("utf-8", "replace")
+    width, height = (_SVG_LENGTH.match(_svg_attribute(root, a) or "") for a in ("width", "height"))
+    if width and height:
+        return round(float(width.group(1))), round(float(height.group(1)))
+    view_box = (_svg_attribute(root, "viewBox") or "").replace(",", " ").split()
+    if len(view_box) == 4:
+        return round(float(view_box[2])), round(float(view_box[3]))
+    # Scales to its container; there is no intrinsic size to record
+    return None, None
+
+
+def read_header(path: str) -> dict:
+    """{format, width, height} from the file header; {format: None, error} if it is not a known image."""
+    with open(path, "rb") as f:
+        head = f.read(HEADER_BYTES)
+    try:
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            fmt, (width, height) = "png", struct.unpack(">II", head[16:24])
+        elif head[:6] in (b"GIF87a", b"GIF89a"):
+            fmt, (width, height) = "gif", struct.unpack("<HH", head[6:10])
+        elif head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            fmt, (width, height) = "webp", _webp_size(head)
+        elif head[:3] == b"\xff\xd8\xff":
+            fmt, (width, height) = "jpeg", _jpeg_size(path)
+        elif os.path.splitext(path)[1].lower() == ".svg":
+            fmt, (width, height) = "svg", _svg_size(path)
+        else:
+            return {"format": None, "error": f"Tanınmayan imza: {head[:8]!r}"}
+    except (ValueError, struct.error) as e:
+        return {"format": None, "error": str(e)}
+    return {"format": fmt, "width": width, "height": height}
+
+
+# Manifest --------------------------------------------------------------------
+
+def list_assets(images_dir: str = IMAGES_DIR) -> List[str]:
+    """Image files (raster and SVG) under `images_dir`, skipping hidden directories."""
+    paths = []
+    for root, dirs, files in os.walk(images_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTS:
+                paths.append(os.path.join(root, name).replace(os.sep, "/"))
+    return paths
+
+
+def _read_entry(path: str) -> dict:
+    st = os.stat(path)
+    return {"mtime": st.st_mtime_ns, "bytes": st.st_size, **read_header(path)}
+
+
+def load_manifest(path: str = MANIFEST_FILE) -> Dict[str, dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    return payload.get("images", {}) if payload.get("version") == METADATA_VERSION else {}
+
+
+def save_manifest(entries: Dict[str, dict], path: str = MANIFEST_FILE) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": METADATA_VERSION, "images": entries}, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def update_manifest(
+    previous: Dict[str, dict], images_dir: str = IMAGES_DIR, workers: Optional[int] = None
+) -> Tuple[Dict[str, dict], dict]:
+    """Manifest for the files under `images_dir`, re-reading only new or touched files; returns (entries, stats)."""
+    entries: Dict[str, dict] = {}
+    stale = []
+    for path in list_assets(images_dir):
+        st = os.stat(path)
+        old = previous.get(path)
+        if old is not None and old["mtime"] == st.st_mtime_ns and old["bytes"] == st.st_size:
+            entries[path] = old
+        else:
+            stale.append(path)
+    if stale:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            entries.update(zip(stale, pool.map(_read_entry, stale)))
+    entries = dict(sorted(entries.items()))
+    stats = {"images": len(entries), "read": len(stale), "removed": len(set(previous) - set(entries))}
+    return entries, stats
+
+
+def load_metadata(path: Optional[str] = MANIFEST_FILE, workers: Optional[int] = None) -> Tuple[Dict[str, dict], dict]:
+    """Up-to-date manifest: the saved one, updated for whatever changed and saved again if it did."""
+    previous = load_manifest(path) if path else {}
+    entries, stats = update_manifest(previous, workers=workers)
+    if path and (stats["read"] or stats["removed"] or not os.path.exists(path)):
+        save_manifest(entries, path)
+    return entries, stats
+
+
+def extension_mismatches(entries: Dict[str, dict]) -> List[Tuple[str, str]]:
+    """(path, actual format) for files whose extension names another format."""
+    found = []
+    for path, entry in entries.items():
+        ext = os.path.splitext(path)[1].lower()
+        if entry["format"] and _EXT_FORMATS.get(ext, ext[1:]) != entry["format"]:
+            found.append((path, entry["format"]))
+    return found
+
+
+# Injection -----------------------------------------------------------------
+
+def inject_sizes(entries: Dict[str, dict]) -> Tuple[int, int]:
+    """Write imageWidth/imageHeight next to imageUrl in exams.json and traffic_signs.json; returns (exams, signs) changed."""
+    def size(url: str) -> Optional[Tuple[int, int]]:
+        entry = entries.get(image_path(url))
+        if entry is None or entry.get("width") is None:
+            return None
+        return entry["width"], entry["height"]
+
+    store = ExamStore(EXAMS_FILE)
+    mutations = []
+    for url, ref in exam_references(store.data):
+        found = size(url)
+        if found:
+            mutations.append(SetImageSize(ref.exam_id, ref.item_id, *found, ref.option))
+    exams_changed = store.apply(mutations)
+    store.save("image_metadata --inject")
+
+    with open(SIGNS_FILE, "r", encoding="utf-8") as f:
+        signs = json.load(f)
+    signs_changed = 0
+    for category in signs:
+        for i, sign in enumerate(category.get("signs", [])):
+            found = has_image(sign.get("imageUrl")) and size(sign["imageUrl"])
+            if not found or (sign.get("imageWidth"), sign.get("imageHeight")) == found:
+                continue
+            items = [(k, v) for k, v in sign.items() if k not in ("imageWidth", "imageHeight")]
+            sized = {}
+            for key, value in items:
+                sized[key] = value
+                if key == "imageUrl":
+                    sized.update(imageWidth=found[0], imageHeight=found[1])
+            category["signs"][i] = sized
+            signs_changed += 1
+    if signs_changed:
+        write_signs(signs)
+    return exams_changed, signs_changed
+
+
+# Benchmark -----------------------------------------------------------------
+
+def run_benchmark(workers: Optional[int]) -> None:
+    import importlib.util
+
+    paths = list_assets()
+    total = sum(os.path.getsize(p) for p in paths)
+
+    def timed(fn) -> float:
+        start = time.perf_counter()
+        fn()
+        return (time.perf_counter() - start) * 1000
+
+    def decode_all() -> None:
+        from PIL import Image
+        for path in paths:
+            try:
+                with Image.open(path) as img:
+                    img.load()
+            except OSError:
+                pass
+
+    results = [
+        ("başlık okuma, tek iş parçacığı", timed(lambda: [read_header(p) for p in paths])),
+        ("başlık okuma, iş parçacığı havuzu", timed(lambda: update_manifest({}, workers=workers))),
+        ("manifest güncel (mtime aynı)", timed(lambda: load_metadata(MANIFEST_FILE, workers))),
+        ("tüm dosyaları okuma (sha256)", timed(lambda: [file_sha256(p) for p in paths])),
+    ]
+    if importlib.util.find_spec("PIL") is not None:
+        results.append(("Pillow ile tam çözme", timed(decode_all)))
+    print(f"⏱️  {len(paths)} görsel, {total / 1024 / 1024:.1f} MB")
+    for label, ms in results:
+        print(f"  - {label:<36} {ms:9.1f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the header-only image metadata manifest.")
+    parser.add_argument("--workers", type=int, help="thread pool size for header reads")
+    parser.add_argument("--inject", action="store_true", help="write imageWidth/imageHeight next to imageUrl")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if not os.path.isdir(IMAGES_DIR):
+        print(f"❌ Bulunamadı: {IMAGES_DIR}")
+        return 1
+    if args.benchmark:
+        run_benchmark(args.workers)
+        return 0
+
+    start = time.perf_counter()
+    entries, stats = load_metadata(workers=args.workers)
+    elapsed = (time.perf_counter() - start) * 1000
+    formats: Dict[str, int] = {}
+    for entry in entries.values():
+        formats[entry["format"] or "hata"] = formats.get(entry["format"] or "hata", 0) + 1
+    print(f"✅ {stats['images']} görsel ({elapsed:.0f} ms): {stats['read']} dosya okundu, {stats['removed']} kayıt silindi")
+    print(f"   Biçimler: {', '.join(f'{k} {v}' for k, v in sorted(formats.items()))}; "
+          f"toplam {sum(e['bytes'] for e in entries.values()) / 1024 / 1024:.1f} MB")
+    for path, entry in entries.items():
+        if entry["format"] is None:
+            print(f"  ⚠️  {path}: {entry['error']}")
+    for path, fmt in extension_mismatches(entries):
+        print(f"  ⚠️  {path}: uzantısı farklı, gerçek biçim {fmt}")
+
+    if args.inject:
+        for path in (EXAMS_FILE, SIGNS_FILE):
+            if not os.path.exists(path):
+                print(f"❌ Bulunamadı: {path}")
+                return 1
+        exams_changed, signs_changed = inject_sizes(entries)
+        print(f"📐 Boyut yazıldı: {exams_changed} soru/seçenek, {signs_changed} levha")
+    print(f"📄 Manifest: {MANIFEST_FILE}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Reverse index from image path to everything that uses it.
+
+Finding out which questions use an image used to mean grepping exams.json or
+rerunning a propagator, and canonicalize_images_11_15.py replaced main images
+without knowing who else shared them. This index maps every path to its
+references: (examId, question id, option key) in exams.json and sign ids in
+traffic_signs.json. It is saved to assets/data/.index/image_refs.json, so "what
+breaks if I replace or delete this file" is a dictionary lookup.
+
+Updates are incremental: exams whose content hash is unchanged keep their
+references, a changed exam's old references are dropped path by path and its
+new ones added, and the signs are re-read only when traffic_signs.json changed.
+
+Scripts that change images call report_blast_radius(store) before
+store.save(...). It reads the pending image changes from the store's diff and
+prints how many references each replaced image still has elsewhere, which
+images nothing will use anymore and which new images are already shared.
+
+Usage:
+    python3 scripts/image_refs.py                    # build or update the index
+    python3 scripts/image_refs.py PATH [PATH ...]    # who uses these images
+    python3 scripts/image_refs.py --benchmark        # full scans vs. index lookups
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from question_index import EXAMS_FILE, exam_hash, file_hash, has_image
+
+SIGNS_FILE = "assets/data/traffic_signs.json"
+GUIDES_FILE = "assets/data/study_guides.json"
+REFS_FILE = "assets/data/.index/image_refs.json"
+REFS_VERSION = 1
+
+
+class Ref(NamedTuple):
+    """One place an image path is used: an exam question (or option) or a traffic sign."""
+    source: str
+    exam_id: Optional[str]
+    item_id: object
+    option: Optional[str] = None
+
+
+def image_path(url: str) -> str:
+    return os.path.normpath(url).replace(os.sep, "/")
+
+
+def _is_local(url: Optional[str]) -> bool:
+    return has_image(url) and not url.startswith(("http://", "https://"))
+
+
+def exam_references(exams: List[dict]) -> Iterator[Tuple[str, Ref]]:
+    for exam in exams:
+        exam_id = exam.get("examId", "")
+        for q in exam.get("questions", []):
+            if has_image(q.get("imageUrl")):
+                yield q["imageUrl"], Ref("exams", exam_id, q.get("id"))
+            options = q.get("options") if isinstance(q.get("options"), dict) else {}
+            for key, value in options.items():
+                if isinstance(value, dict) and has_image(value.get("imageUrl")):
+                    yield value["imageUrl"], Ref("exams", exam_id, q.get("id"), key)
+
+
+def sign_references(categories: List[dict]) -> Iterator[Tuple[str, Ref]]:
+    for category in categories:
+        for sign in category.get("signs", []):
+            if has_image(sign.get("imageUrl")):
+                yield sign["imageUrl"], Ref("signs", None, sign.get("id"))
+
+
+def collect_references(exams: List[dict], signs: List[dict]) -> Dict[str, List[Ref]]:
+    """Path -> references, built from scratch."""
+    refs: Dict[str, List[Ref]] = {}
+    for url, ref in list(exam_references(exams)) + list(sign_references(signs)):
+        refs.setdefault(image_path(url), []).append(ref)
+    return refs
+
+
+def describe(ref: Ref) -> str:
+    if ref.source == "signs":
+        return f"levha {ref.item_id}"
+    return f"{ref.exam_id} #{ref.item_id}" + (f" {ref.option}" if ref.option else "")
+
+
+class ImageRefIndex:
+    """Path -> references, plus the paths each exam contributes so a changed exam can be swapped out."""
+
+    def __init__(self, by_path: Dict[str, List[Ref]], exams: Dict[str, dict],
+                 source_hash: str = "", signs_hash: str = ""):
+        self.by_path = by_path
+        self.exams = exams
+        self.source_hash = source_hash
+        self.signs_hash = signs_hash
+
+    def refs(self, url: str) -> List[Ref]:
+        return self.by_path.get(image_path(url), [])
+
+    def __contains__(self, url: str) -> bool:
+        return image_path(url) in self.by_path
+
+    def _drop(self, paths: Iterable[str], keep) -> None:
+        for path in paths:
+            remaining = [r for r in self.by_path.get(path, []) if keep(r)]
+            if remaining:
+                self.by_path[path] = remaining
+            else:
+                self.by_path.pop(path, None)
+
+    def _add(self, pairs: Iterable[Tuple[str, Ref]]) -> List[str]:
+        paths = []
+        for url, ref in pairs:
+            path = image_path(url)
+            self.by_path.setdefault(path, []).append(ref)
+            if path not in paths:
+                paths.append(path)
+        return paths
+
+    @classmethod
+    def build(
+        cls, data: List[dict], signs: Optional[List[dict]], previous: Optional["ImageRefIndex"] = None,
+        source_hash: str = "", signs_hash: str = "",
+    ) -> Tuple["ImageRefIndex", dict]:
+        """
+        Index for `data` and `signs`, reusing what `previous` already knows; returns (index, stats).
+
+        `signs` may be None when `signs_hash` matches `previous`, i.e. the signs did not change.
+        """
+        stats = {"exams": len(data), "examsReused": 0, "signsReused": False}
+        if previous is None:
+            index = cls({}, {}, source_hash, signs_hash)
+        else:
+            index = cls({p: list(r) for p, r in previous.by_path.items()}, dict(previous.exams),
+                        source_hash, signs_hash)
+
+        seen = set()
+        for exam in data:
+            exam_id = exam.get("examId", "")
+            seen.add(exam_id)
+            digest = exam_hash(exam)
+            old = index.exams.get(exam_id)
+            if old is not None and old["hash"] == digest:
+                stats["examsReused"] += 1
+                continue
+            if old is not None:
+                index._drop(old["paths"], lambda r: r.exam_id != exam_id)
+            index.exams[exam_id] = {"hash": digest, "paths": index._add(exam_references([exam]))}
+        for exam_id in set(index.exams) - seen:
+            index._drop(index.exams.pop(exam_id)["paths"], lambda r: r.exam_id != exam_id)
+
+        if previous is not None and signs_hash and previous.signs_hash == signs_hash:
+            stats["signsReused"] = True
+        else:
+            index._drop(list(index.by_path), lambda r: r.source != "signs")
+            index._add(sign_references(signs or []))
+        return index, stats
+
+    # Persistence -------------------------------------------------------------
+
+    def save(self, path: str = REFS_FILE) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": REFS_VERSION,
+                "sourceHash": self.source_hash,
+                "signsHash": self.signs_hash,
+                "exams": self.exams,
+                "paths": {p: [list(r) for r in refs] for p, refs in self.by_path.items()},
+            }, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = REFS_FILE) -> Optional["ImageRefIndex"]:
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != REFS_VERSION:
+            return None
+        by_path = {p: [Ref(*r) for r in refs] for p, refs in payload["paths"].items()}
+        return cls(by_path, payload["exams"], payload.get("sourceHash", ""), payload.get("signsHash", ""))
+
+
+def load_refs(
+    data: List[dict], path: Optional[str] = REFS_FILE, source_hash: str = "",
+    signs_file: str = SIGNS_FILE,
+) -> Tuple[ImageRefIndex, dict]:
+    """
+    Index for `data` and the signs in `signs_file`: the saved one, updated and saved again if needed.
+
+    Pass the file hash of exams.json as `source_hash` when `data` is exactly what
+    was read from it; a saved index for the same hashes is then used as is.
+    """
+    previous = ImageRefIndex.load(path) if path else None
+    signs_hash = file_hash(signs_file) if os.path.exists(signs_file) else ""
+    if (previous is not None and source_hash and previous.source_hash == source_hash
+            and previous.signs_hash == signs_hash):
+        return previous, {"exams": len(previous.exams), "examsReused": len(previous.exams), "signsReused": True}
+    signs = None
+    if previous is None or previous.signs_hash != signs_hash:
+        with open(signs_file, "r", encoding="utf-8") as f:
+            signs = json.load(f)
+    index, stats = ImageRefIndex.build(data, signs, previous, source_hash, signs_hash)
+    if path:
+        index.save(path)
+    return index, stats
+
+
+# Blast radius --------------------------------------------------------------
+
+def _option_image(options: dict, key: str) -> Optional[str]:
+    value = options.get(key)
+    return value.get("imageUrl") if isinstance(value, dict) else None
+
+
+def pending_image_changes(store) -> List[Tuple[Ref, Optional[str], Optional[str]]]:
+    """(reference, old path, new path) for every image the store's unsaved changes touch."""
+    changes = []
+    for change in store.diff():
+        op = change["op"]
+        if op in ("addExam", "removeExam"):
+            for url, ref in exam_references([change["exam"]]):
+                changes.append((ref, None, url) if op == "addExam" else (ref, url, None))
+            continue
+        if op != "setField" or change["field"] not in ("imageUrl", "options"):
+            continue
+        exam_id, qid = change["examId"], change["questionId"]
+        old, new = change.get("old"), change.get("new")
+        if change["field"] == "imageUrl":
+            pairs = [(None, old, new)]
+        else:
+            old_opts = old if isinstance(old, dict) else {}
+            new_opts = new if isinstance(new, dict) else {}
+            keys = sorted(set(old_opts) | set(new_opts))
+            pairs = [(key, _option_image(old_opts, key), _option_image(new_opts, key)) for key in keys]
+        for option, old_url, new_url in pairs:
+            old_url = old_url if has_image(old_url) else None
+            new_url = new_url if has_image(new_url) else None
+            if old_url != new_url:
+                changes.append((Ref("exams", exam_id, qid, option), old_url, new_url))
+    return changes
+
+
+def blast_radius(index: ImageRefIndex, changes: List[Tuple[Ref, Optional[str], Optional[str]]]) -> dict:
+    """What the changes do to each image they move references away from or onto."""
+    leaving: Dict[str, set] = {}
+    arriving: Dict[str, int] = {}
+    for ref, old, new in changes:
+        if _is_local(old):
+            leaving.setdefault(image_path(old), set()).add(ref)
+        if _is_local(new):
+            arriving[image_path(new)] = arriving.get(image_path(new), 0) + 1
+
+    replaced = []
+    for path, moved in sorted(leaving.items()):
+        remaining = [r for r in index.refs(path) if r not in moved]
+        replaced.append({"path": path, "referencesMoved": len(moved), "remaining": [describe(r) for r in remaining]})
+    shared = [
+        {"path": path, "referencesAdded": count, "existing": [describe(r) for r in index.refs(path)]}
+        for path, count in sorted(arriving.items()) if index.refs(path)
+    ]
+    return {
+        "references": len(changes),
+        "replaced": replaced,
+        "orphaned": [r["path"] for r in replaced if not r["remaining"]],
+        "shared": shared,
+    }
+
+
+def report_blast_radius(store, project_dir: str = ".", limit: int = 10) -> dict:
+    """Print the blast radius of the store's unsaved image changes; returns it as a dict."""
+    data = store.original()
+    index, _ = load_refs(data, os.path.join(project_dir, REFS_FILE), store.source_hash,
+                         os.path.join(project_dir, SIGNS_FILE))
+    radius = blast_radius(index, pending_image_changes(store))
+    still_used = [r for r in radius["replaced"] if r["remaining"]]
+    print(f"💥 Etki alanı: {radius['references']} görsel referansı değişiyor; "
+          f"{len(radius['replaced'])} görselden referans ayrılıyor, {len(radius['shared'])} görsel zaten başka yerde kullanılıyor")
+    for r in still_used[:limit]:
+        print(f"  - {r['path']}: {len(r['remaining'])} yerde kullanılmaya devam ediyor ({', '.join(r['remaining'][:5])})")
+    if radius["orphaned"]:
+        print(f"  🗑️  Artık hiçbir yerde kullanılmayacak: {len(radius['orphaned'])} görsel")
+        for path in radius["orphaned"][:limit]:
+            print(f"    - {path}")
+    return radius
+
+
+# Benchmark -----------------------------------------------------------------
+
+def run_benchmark(data: List[dict], repeat: int = 20) -> None:
+    import tempfile
+
+    with open(SIGNS_FILE, "r", encoding="utf-8") as f:
+        signs = json.load(f)
+    paths = sorted(collect_references(data, signs))
+
+    def timed(fn, n: int = repeat) -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        return (time.perf_counter() - start) / n * 1000
+
+    def scan(path: str) -> List[Ref]:
+        # What a one-off script did: parse the file and walk every reference
+        with open(EXAMS_FILE, "r", encoding="utf-8") as f:
+            exams = json.load(f)
+        return [r for url, r in list(exam_references(exams)) + list(sign_references(signs)) if image_path(url) == path]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = os.path.join(tmp, "image_refs.json")
+        source_hash = file_hash(EXAMS_FILE)
+        load_refs(data, index_path, source_hash)
+        edited = json.loads(json.dumps(data))
+        edited[-1]["questions"][0]["imageUrl"] = "assets/images/benchmark.png"
+
+        results = [
+            ("tam tarama, görsel başına", timed(lambda: scan(paths[0]), 5)),
+            ("tam dizin kurulumu", timed(lambda: ImageRefIndex.build(data, signs))),
+            ("yükle, dosya özeti aynı", timed(lambda: load_refs(data, index_path, source_hash))),
+            ("güncelle, 1 deneme değişti",
+             timed(lambda: ImageRefIndex.build(edited, None, ImageRefIndex.load(index_path), "", file_hash(SIGNS_FILE)))),
+        ]
+        index = ImageRefIndex.load(index_path)
+        results.append(("sorgu (tüm görseller)", timed(lambda: [index.refs(p) for p in paths])))
+        same = all(sorted(index.refs(p), key=str) == sorted(scan(p), key=str) for p in paths[:20])
+        print(f"⏱️  {len(paths)} görsel yolu, {repeat} tekrar ortalaması")
+        for label, ms in results:
+            print(f"  - {label:<30} {ms:8.2f} ms")
+        print(f"  - Sonuçlar aynı (ilk 20 yol): {same}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build or query the image path -> references index.")
+    parser.add_argument("paths", nargs="*", help="image paths to look up")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    for path in (EXAMS_FILE, SIGNS_FILE):
+        if not os.path.exists(path):
+            print(f"❌ Bulunamadı: {path}")
+            return 1
+    with open(EXAMS_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if args.benchmark:
+        run_benchmark(data)
+        return 0
+
+    start = time.perf_counter()
+    index, stats = load_refs(data, source_hash=file_hash(EXAMS_FILE))
+    elapsed = (time.perf_counter() - start) * 1000
+    total = sum(len(r) for r in index.by_path.values())
+    print(f"✅ {len(index.by_path)} görsel yolu, {total} referans ({elapsed:.0f} ms): "
+          f"{stats['examsReused']} / {stats['exams']} deneme değişmemiş")
+    print(f"📄 Dizin: {REFS_FILE}")
+    for path in args.paths:
+        refs = index.refs(path)
+        print(f"\n🔗 {image_path(path)}: {len(refs)} referans")
+        for ref in refs:
+            print(f"  - {describe(ref)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
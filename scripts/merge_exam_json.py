@@ -1,6 +1,8 @@
 import json
 import os
 
+from exam_store import AddExam, ExamStore
+
 EXAMS_FILE = 'assets/data/exams.json'
 IMPORTED_FILE = 'assets/data/imported_questions.json'
 
@@ -14,8 +16,7 @@ def merge_exams():
         return
 
     try:
-        with open(EXAMS_FILE, 'r', encoding='utf-8') as f:
-            exams = json.load(f)
+        store = ExamStore(EXAMS_FILE)
         
         with open(IMPORTED_FILE, 'r', encoding='utf-8') as f:
             new_questions = json.load(f)
@@ -28,15 +29,11 @@ def merge_exams():
         }
 
         # Check if already exists to avoid duplicates (by ID)
-        existing_ids = [e['examId'] for e in exams]
-        if new_exam['examId'] in existing_ids:
+        if new_exam['examId'] in store.exam_ids():
             print(f"Exam {new_exam['examId']} already exists. Replacing it.")
-            exams = [e for e in exams if e['examId'] != new_exam['examId']]
-        
-        exams.append(new_exam)
 
-        with open(EXAMS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(exams, f, ensure_ascii=False, indent=2)
+        store.apply([AddExam(new_exam, replace=True)])
+        store.save("merge_exam_json")
 
         print(f"Successfully added exam '{new_exam['examName']}' with {len(new_questions)} questions.")
 
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Offline optimization of the raster images under assets/images.
+
+Every .png/.jpg/.gif/.webp file is re-encoded with Pillow: metadata (EXIF, XMP,
+text chunks) is dropped, PNG/GIF are recompressed losslessly and JPEG/WebP are
+re-encoded at --quality. With --webp, images referenced only from exams.json and
+traffic_signs.json are converted to WebP and those references are rewritten
+(exams.json through ExamStore); anything else, e.g. study guide images, keeps its
+format so no other file or code path has to change. A result is kept only if
+it is at least MIN_SAVING smaller than the source.
+
+Files are processed on a process pool. .cache/image_optimization.json records
+the content hash of every processed source and of every file written here, per
+settings, so unchanged images are skipped on the next run. The report lists the
+bytes each exam's images take before and after, against a per-exam budget.
+
+Pillow is only needed for optimizing; --report-only prints the budget report for
+the files as they are.
+
+Usage:
+    python3 scripts/optimize_images.py [--webp] [--quality 85] [--budget-kb 1024] [--workers N]
+    python3 scripts/optimize_images.py --dry-run      # measure savings, write nothing
+    python3 scripts/optimize_images.py --report-only  # budget report only, no Pillow needed
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from exam_store import ExamStore, SetImage
+from image_refs import SIGNS_FILE, Ref, collect_references, image_path
+from question_index import has_image
+
+EXAMS_FILE = "assets/data/exams.json"
+IMAGES_DIR = "assets/images"
+CACHE_FILE = ".cache/image_optimization.json"
+OUTPUT_REPORT = "analysis/image_optimization_report.json"
+OTHER_DATA_FILES = ("assets/data/study_guides.json",)
+
+RASTER_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+DEFAULT_QUALITY = 85
+DEFAULT_BUDGET_KB = 1024
+# Re-encoded output must be at least this much smaller to replace the source
+MIN_SAVING = 0.05
+# Bump when the encoding below changes so cached results are redone
+OPTIMIZER_VERSION = 1
+
+PILLOW_HINT = "❌ Görsel optimizasyonu için Pillow gerekli: python3 -m pip install Pillow"
+
+
+class Settings(NamedTuple):
+    quality: int = DEFAULT_QUALITY
+    webp: bool = False
+
+    @property
+    def key(self) -> str:
+        return f"v{OPTIMIZER_VERSION}-q{self.quality}-{'webp' if self.webp else 'same'}"
+
+
+def pillow_available() -> bool:
+    return importlib.util.find_spec("PIL") is not None
+
+
+def file_sha256(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def list_images(images_dir: str = IMAGES_DIR) -> List[str]:
+    """Raster files under `images_dir`, skipping hidden directories such as .staging."""
+    paths = []
+    for root, dirs, files in os.walk(images_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in RASTER_EXTS:
+                paths.append(os.path.join(root, name).replace(os.sep, "/"))
+    return paths
+
+
+def other_references(paths: Tuple[str, ...] = OTHER_DATA_FILES) -> str:
+    """Raw text of data files whose image paths are not rewritten here; a path found in it keeps its format."""
+    texts = []
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                texts.append(f.read())
+    return "\n".join(texts)
+
+
+# Worker ----------------------------------------------------------------------
+
+def _encode(path: str, target_ext: str, quality: int) -> Optional[bytes]:
+    """Re-encoded bytes of `path` as `target_ext`, without metadata; None if it cannot be done."""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        animated = getattr(img, "n_frames", 1) > 1
+        out = io.BytesIO()
+        # Only the colour profile is carried over; EXIF/XMP/text chunks are not passed on
+        icc = img.info.get("icc_profile")
+        extra = {"icc_profile": icc} if icc else {}
+        if target_ext == ".webp":
+            if animated:
+                return None
+            lossless = img.format in ("PNG", "GIF")
+            if img.mode not in ("RGB", "RGBA", "L", "LA"):
+                img = img.convert("RGBA" if "transparency" in img.info or img.mode == "P" else "RGB")
+            img.save(out, "WEBP", quality=quality, lossless=lossless, method=6, **extra)
+        elif target_ext in (".jpg", ".jpeg"):
+            if img.mode not in ("RGB", "L", "CMYK"):
+                img = img.convert("RGB")
+            img.save(out, "JPEG", quality=quality, optimize=True, progressive=True, **extra)
+        elif target_ext == ".png":
+            img.save(out, "PNG", optimize=True, **extra)
+        elif target_ext == ".gif":
+            img.save(out, "GIF", optimize=True, save_all=animated)
+        else:
+            return None
+    return out.getvalue()
+
+
+def optimize_file(task: Tuple[str, str, bool, int, bool]) -> dict:
+    """Pool entry point: optimize one file; returns what happened to it."""
+    path, digest, convert, quality, dry_run = task
+    before = os.path.getsize(path)
+    ext = os.path.splitext(path)[1]
+    target_ext = ".webp" if convert and ext.lower() != ".webp" else ext.lower()
+    output = os.path.splitext(path)[0] + (target_ext if target_ext != ext.lower() else ext)
+    result = {"path": path, "output": path, "digest": digest, "status": "kept",
+              "bytesBefore": before, "bytesAfter": before, "outputDigest": digest}
+    if output != path and os.path.exists(output):
+        # Another file already has the WebP name; only recompress in place
+        target_ext, output = ext.lower(), path
+    try:
+        encoded = _encode(path, target_ext, quality)
+    except OSError as e:
+        result.update(status="error", error=str(e))
+        return result
+    if encoded is None and output != path:
+        target_ext, output = ext.lower(), path
+        encoded = _encode(path, target_ext, quality)
+    if encoded is None or len(encoded) > before * (1 - MIN_SAVING):
+        return result
+    result.update(
+        status="converted" if output != path else "optimized",
+        output=output,
+        bytesAfter=len(encoded),
+        outputDigest=hashlib.sha256(encoded).hexdigest(),
+    )
+    if not dry_run:
+        tmp_path = output + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encoded)
+        os.replace(tmp_path, output)
+    return result
+
+
+# Pipeline --------------------------------------------------------------------
+
+def load_cache(path: str = CACHE_FILE) -> Dict[str, str]:
+    """Content hash -> settings key it was last processed (or written) with."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("hashes", {})
+
+
+def save_cache(hashes: Dict[str, str], path: str = CACHE_FILE) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"hashes": hashes}, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def rewrite_references(mapping: Dict[str, str], refs: Dict[str, List[Ref]], store: ExamStore, signs: List[dict]) -> int:
+    """Point every exam and sign reference in `mapping` at its new path; returns the number of references."""
+    mutations = []
+    signs_changed = 0
+    for old, new in mapping.items():
+        for ref in refs.get(old, []):
+            if ref.source == "exams":
+                mutations.append(SetImage(ref.exam_id, ref.item_id, new, ref.option))
+    store.apply(mutations)
+    for category in signs:
+        for sign in category.get("signs", []):
+            url = sign.get("imageUrl")
+            if has_image(url) and image_path(url) in mapping:
+                sign["imageUrl"] = mapping[image_path(url)]
+                signs_changed += 1
+    return len(mutations) + signs_changed
+
+
+def write_signs(signs: List[dict], path: str = SIGNS_FILE) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(signs, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def budget_report(refs: Dict[str, List[Ref]], sizes: Dict[str, Tuple[int, int]], budget_bytes: int) -> List[dict]:
+    """Bytes of each exam's (and the sign set's) distinct images, before and after, against the budget."""
+    groups: Dict[str, set] = {}
+    for url, url_refs in refs.items():
+        for ref in url_refs:
+            groups.setdefault(ref.exam_id if ref.source == "exams" else "traffic_signs", set()).add(url)
+    rows = []
+    for group, urls in groups.items():
+        before = sum(sizes.get(u, (0, 0))[0] for u in urls)
+        after = sum(sizes.get(u, (0, 0))[1] for u in urls)
+        rows.append({
+            "examId": group,
+            "images": len(urls),
+            "missingFiles": sum(1 for u in urls if u not in sizes),
+            "bytesBefore": before,
+            "bytesAfter": after,
+            "bytesSaved": before - after,
+            "budgetBytes": budget_bytes,
+            "overBudget": after > budget_bytes,
+        })
+    return sorted(rows, key=lambda r: -r["bytesAfter"])
+
+
+def optimize_images(settings: Settings, workers: Optional[int], budget_kb: int,
+                    dry_run: bool = False, report_only: bool = False) -> dict:
+    store = ExamStore(EXAMS_FILE)
+    with open(SIGNS_FILE, "r", encoding="utf-8") as f:
+        signs = json.load(f)
+    refs = collect_references(store.data, signs)
+
+    paths = list_images()
+    cache = load_cache()
+    tasks = []
+    results: List[dict] = []
+    skipped = 0
+    other_text = other_references()
+    for path in paths:
+        digest = file_sha256(path)
+        if report_only or cache.get(digest) == settings.key:
+            size = os.path.getsize(path)
+            results.append({"path": path, "output": path, "status": "cached", "bytesBefore": size, "bytesAfter": size})
+            skipped += 1
+            continue
+        convert = settings.webp and path in refs and path not in other_text
+        tasks.append((path, digest, convert, settings.quality, dry_run))
+
+    start = time.perf_counter()
+    if tasks:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results.extend(pool.map(optimize_file, tasks, chunksize=4))
+    elapsed = time.perf_counter() - start
+
+    mapping = {r["path"]: r["output"] for r in results if r["status"] == "converted"}
+    rewritten = 0
+    if not dry_run and not report_only:
+        for r in results:
+            if r["status"] in ("kept", "optimized", "converted"):
+                cache[r["digest"]] = settings.key
+                cache[r["outputDigest"]] = settings.key
+        if mapping:
+            rewritten = rewrite_references(mapping, refs, store, signs)
+            store.save("optimize_images")
+            write_signs(signs)
+            for old in mapping:
+                os.remove(old)
+        save_cache(cache)
+
+    sizes = {r["path"]: (r["bytesBefore"], r["bytesAfter"]) for r in results}
+    exams = budget_report(refs, sizes, budget_kb * 1024)
+    before = sum(r["bytesBefore"] for r in results)
+    after = sum(r["bytesAfter"] for r in results)
+    return {
+        "summary": {
+            "settings": settings.key,
+            "dryRun": dry_run,
+            "reportOnly": report_only,
+            "files": len(results),
+            "skippedUnchanged": skipped if not report_only else 0,
+            "optimized": sum(1 for r in results if r["status"] == "optimized"),
+            "converted": len(mapping),
+            "kept": sum(1 for r in results if r["status"] == "kept"),
+            "errors": sum(1 for r in results if r["status"] == "error"),
+            "referencesRewritten": rewritten,
+            "bytesBefore": before,
+            "bytesAfter": after,
+            "bytesSaved": before - after,
+            "seconds": round(elapsed, 2),
+            "budgetBytesPerExam": budget_kb * 1024,
+            "examsOverBudget": sum(1 for e in exams if e["overBudget"]),
+        },
+        "exams": exams,
+        "files": [
+            {k: r[k] for k in ("path", "output", "status", "bytesBefore", "bytesAfter", "error") if k in r}
+            for r in sorted(results, key=lambda r: r["path"]) if r["status"] != "cached"
+        ],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recompress and optionally convert images under assets/images.")
+    parser.add_argument("--webp", action="store_true", help="convert images referenced only by exams/signs to WebP")
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY, help="JPEG/lossy WebP quality (1-100)")
+    parser.add_argument("--budget-kb", type=int, default=DEFAULT_BUDGET_KB, help="image bytes allowed per exam")
+    parser.add_argument("--workers", type=int, help="process pool size")
+    parser.add_argument("--dry-run", action="store_true", help="measure savings without writing anything")
+    parser.add_argument("--report-only", action="store_true", help="budget report for the current files")
+    parser.add_argument("--report", default=OUTPUT_REPORT)
+    args = parser.parse_args()
+
+    for path in (EXAMS_FILE, SIGNS_FILE, IMAGES_DIR):
+        if not os.path.exists(path):
+            print(f"❌ Bulunamadı: {path}")
+            return 1
+    if not args.report_only and not pillow_available():
+        print(PILLOW_HINT)
+        print("   (--report-only ile mevcut boyutlar Pillow olmadan raporlanabilir)")
+        return 1
+
+    report = optimize_images(Settings(args.quality, args.webp), args.workers, args.budget_kb,
+                             dry_run=args.dry_run, report_only=args.report_only)
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    s = report["summary"]
+    print(f"🖼️  {s['files']} görsel: {s['optimized']} sıkıştırıldı, {s['converted']} WebP'ye çevrildi, "
+          f"{s['kept']} aynı kaldı, {s['skippedUnchanged']} önbellekten atlandı ({s['seconds']} sn)")
+    if s["errors"]:
+        print(f"⚠️  Okunamayan görsel: {s['errors']}")
+        for r in report["files"]:
+            if r["status"] == "error":
+                print(f"  - {r['path']}: {r['error']}")
+    print(f"💾 {s['bytesBefore'] / 1024 / 1024:.1f} MB → {s['bytesAfter'] / 1024 / 1024:.1f} MB "
+          f"({s['bytesSaved'] / 1024:.0f} KB kazanç){' — deneme çalıştırması, dosyalar değişmedi' if s['dryRun'] else ''}")
+    if s["referencesRewritten"]:
+        print(f"✅ {s['referencesRewritten']} görsel referansı güncellendi")
+    print(f"📊 Deneme başına bütçe {args.budget_kb} KB: {s['examsOverBudget']} deneme bütçeyi aşıyor")
+    for e in report["exams"]:
+        if e["overBudget"]:
+            print(f"  - {e['examId']}: {e['bytesAfter'] / 1024:.0f} KB ({e['images']} görsel)")
+    print(f"📄 Rapor: {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,73 +5,32 @@ Bu script, ilk 8 denemede eklenen görselleri, diğer denemelerde tekrar eden ay
 """
 
 import json
-import re
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple
 from pathlib import Path
 
+from exam_store import ExamStore
+from image_refs import report_blast_radius
+from question_index import exam_selector, file_hash, load_index, normalize
+
 # Dosya yolları
 EXAMS_FILE = "assets/data/exams.json"
 OUTPUT_REPORT = "analysis/propagation_report_first_8.json"
 
-def normalize_text(text: str) -> str:
-    """Metni normalize eder (büyük/küçük harf, noktalama, boşluk)"""
-    # Küçük harfe çevir
-    text = text.lower()
-    # Noktalama işaretlerini kaldır
-    text = re.sub(r'[^\w\s]', '', text)
-    # Fazla boşlukları tek boşluğa çevir
-    text = re.sub(r'\s+', ' ', text)
-    # Başındaki ve sonundaki boşlukları kaldır
-    text = text.strip()
-    return text
-
-def load_exams() -> List[dict]:
-    """exams.json dosyasını yükler"""
-    with open(EXAMS_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-def save_exams(data: List[dict]) -> None:
-    """exams.json dosyasını kaydeder"""
-    with open(EXAMS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
 
 def build_source_image_map(data: List[dict]) -> Dict[str, Tuple[str, Dict[str, str]]]:
     """
     İlk 8 denemede bulunan görselleri, soru metninden görsel yoluna eşleyen map oluşturur.
     """
-    norm_to_images = {}
     source_exam_ids = ["deneme_sinavi_1", "deneme_sinavi_2", "deneme_sinavi_3",
                        "deneme_sinavi_4", "deneme_sinavi_5", "deneme_sinavi_6",
                        "deneme_sinavi_7", "deneme_sinavi_8"]
     
     print(f"🔍 İlk 8 denemede görsel aranıyor...")
     
-    for exam in data:
-        if exam.get("examId") not in source_exam_ids:
-            continue
-            
-        for question in exam.get("questions", []):
-            question_text = question.get("questionText", "")
-            image_url = question.get("imageUrl")
-            
-            if not image_url or image_url == "null":
-                continue
-                
-            # Soru metnini normalize et
-            norm_text = normalize_text(question_text)
-            
-            if norm_text:
-                # Ana görsel
-                main_image = image_url
-                
-                # Seçenek görselleri
-                option_images = {}
-                options = question.get("options", {})
-                for key, option in options.items():
-                    if isinstance(option, dict) and option.get("imageUrl"):
-                        option_images[key] = option["imageUrl"]
-                
-                norm_to_images[norm_text] = (main_image, option_images)
+    index = load_index(data, file_hash(EXAMS_FILE))
+    norm_to_images = index.image_sources(
+        data, include=exam_selector(source_exam_ids), require_main_image=True
+    )
     
     print(f"✅ {len(norm_to_images)} soru metni-görsel eşleşmesi bulundu")
     return norm_to_images
@@ -110,7 +69,7 @@ def propagate_images(data: List[dict], source_map: Dict[str, Tuple[str, Dict[str
                 continue
                 
             # Soru metnini normalize et
-            norm_text = normalize_text(question_text)
+            norm_text = normalize(question_text)
             
             if norm_text in source_map:
                 main_image, option_images = source_map[norm_text]
@@ -161,7 +120,8 @@ def main():
         return 1
     
     # exams.json'ı yükle
-    data = load_exams()
+    store = ExamStore(EXAMS_FILE)
+    data = store.data
     print(f"✅ {len(data)} deneme yüklendi")
     
     # İlk 8 denemede bulunan görselleri topla
@@ -175,7 +135,8 @@ def main():
     stats = propagate_images(data, source_map)
     
     if stats["total_questions_updated"] > 0:
-        save_exams(data)
+        report_blast_radius(store)
+        store.save("propagate_from_first_8")
         print(f"✅ exams.json güncellendi!")
     else:
         print("ℹ️ Güncelleme gerekli değil")
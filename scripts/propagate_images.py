@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Generic image propagation between exams.
+
+Copies question and option images from source exams to the repeated questions of
+target exams in one pass over the shared question index, then writes exams.json
+once. Replaces the per-range scripts, whose runs map onto it roughly as:
+
+    advanced_image_propagator.py       --sources 1-6 --targets all
+    propagate_from_first_8.py          --sources 1-8 --targets 9-15 --require-main-image
+    propagate_images_to_7_10.py        --sources others --targets 7-10 --require-files
+    propagate_images_from_deneme1_3.py --sources 1-3 --targets others --require-files
+    canonicalize_images_11_15.py       --sources others --targets 11-15 --policy overwrite
+
+Exam selectors are comma separated: exam numbers ("5"), ranges ("1-8"), full ids,
+globs ("deneme_sinavi_2*"), "all", and "others" (every exam not selected on the
+other side).
+
+Policies:
+    fill-missing  add images only where the target has none (default)
+    overwrite     also replace target images that differ from the source
+    report-only   compute the same changes without writing exams.json
+
+With --fuzzy THRESHOLD, target questions whose text is a near duplicate of an
+imaged source question (see near_duplicates.py) also receive its main image.
+
+Runs are incremental: .cache/propagation_state.json keeps a content hash and the
+normalized texts of every exam plus the last text -> image map. A rerun with the
+same options only re-normalizes exams whose hash changed and only revisits
+questions whose text occurs in a changed exam. With --require-files the state is
+also tied to the set of files under assets/images (see image_manifest.py), so
+adding or removing an image reprocesses everything. --full ignores the state; --fuzzy
+always runs in full because clusters span every exam.
+"""
+
+from __future__ import annotations
+import argparse
+import fnmatch
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from exam_store import ExamStore
+from image_manifest import image_exists, shared_manifest
+from image_refs import report_blast_radius
+from near_duplicates import fuzzy_image_sources
+from question_index import (
+    ImageSource, Occurrence, QuestionIndex, exam_hash, exam_selector, file_hash, has_image, load_index, normalize,
+)
+
+EXAMS_FILE = "assets/data/exams.json"
+OUTPUT_REPORT = "analysis/propagation_report.json"
+STATE_FILE = ".cache/propagation_state.json"
+STATE_VERSION = 1
+POLICIES = ("fill-missing", "overwrite", "report-only")
+
+_EXAM_NUMBER = re.compile(r"_(\d+)$")
+
+
+def exam_number(exam_id: str) -> Optional[int]:
+    m = _EXAM_NUMBER.search(exam_id)
+    return int(m.group(1)) if m else None
+
+
+def select_exams(spec: str, exam_ids: List[str], other: Optional[Set[str]] = None) -> Set[str]:
+    """Resolve a selector such as "1-8,12,deneme_sinavi_2*" against the known exam ids."""
+    selected: Set[str] = set()
+    for token in (t.strip() for t in spec.split(",")):
+        if not token:
+            continue
+        if token == "all":
+            selected.update(exam_ids)
+        elif token == "others":
+            if other is None:
+                raise ValueError('"others" needs an explicit selection on the other side')
+            selected.update(e for e in exam_ids if e not in other)
+        elif re.fullmatch(r"\d+(-\d+)?", token):
+            lo, _, hi = token.partition("-")
+            lo_n, hi_n = int(lo), int(hi or lo)
+            selected.update(e for e in exam_ids if (exam_number(e) or -1) in range(lo_n, hi_n + 1))
+        else:
+            matches = fnmatch.filter(exam_ids, token)
+            if not matches:
+                raise ValueError(f"no exam matches {token!r}")
+            selected.update(matches)
+    return selected
+
+
+def resolve_selectors(sources: str, targets: str, exam_ids: List[str]) -> Tuple[Set[str], Set[str]]:
+    if "others" in sources.split(",") and "others" in targets.split(","):
+        raise ValueError('"others" can only be used on one side')
+    if "others" in sources.split(","):
+        target_ids = select_exams(targets, exam_ids)
+        return select_exams(sources, exam_ids, target_ids), target_ids
+    source_ids = select_exams(sources, exam_ids)
+    return source_ids, select_exams(targets, exam_ids, source_ids)
+
+
+def _apply_option_images(q: dict, source_options: Dict[str, str], overwrite: bool, stats: dict, updates: List[str]) -> None:
+    options = q.get("options") or {}
+    for key, src_url in source_options.items():
+        if key not in options:
+            continue
+        value = options[key]
+        if isinstance(value, str):
+            options[key] = {"text": value, "imageUrl": src_url}
+            stats["option_images_added"] += 1
+            updates.append(f"Added option {key} image")
+        elif isinstance(value, dict):
+            current = value.get("imageUrl")
+            if not current:
+                value["imageUrl"] = src_url
+                stats["option_images_added"] += 1
+                updates.append(f"Added option {key} image")
+            elif overwrite and current != src_url:
+                value["imageUrl"] = src_url
+                stats["option_images_replaced"] += 1
+                updates.append(f"Replaced option {key} image: {current} -> {src_url}")
+
+
+def propagate(
+    data: List[dict],
+    index: QuestionIndex,
+    sources: Dict[str, ImageSource],
+    target_ids: Set[str],
+    overwrite: bool = False,
+) -> dict:
+    """
+    Apply `sources` (normalized text -> images) to every occurrence in `target_ids`.
+    Mutates `data` in place and returns statistics with one entry per updated question.
+    """
+    stats = {
+        "total_questions_updated": 0,
+        "main_images_added": 0,
+        "main_images_replaced": 0,
+        "option_images_added": 0,
+        "option_images_replaced": 0,
+        "exams_affected": set(),
+        "detailed_updates": [],
+    }
+
+    for norm, (source_url, source_options) in sources.items():
+        for occ in index.occurrences(norm):
+            if occ.exam_id not in target_ids:
+                continue
+            q = index.question(data, occ)
+            updates: List[str] = []
+
+            current = q.get("imageUrl")
+            if source_url and not has_image(current):
+                q["imageUrl"] = source_url
+                stats["main_images_added"] += 1
+                updates.append(f"Added main image: {source_url}")
+            elif source_url and overwrite and current != source_url:
+                q["imageUrl"] = source_url
+                stats["main_images_replaced"] += 1
+                updates.append(f"Replaced main image: {current} -> {source_url}")
+
+            if source_options:
+                _apply_option_images(q, source_options, overwrite, stats, updates)
+
+            if updates:
+                stats["total_questions_updated"] += 1
+                stats["exams_affected"].add(occ.exam_id)
+                stats["detailed_updates"].append({
+                    "examId": occ.exam_id,
+                    "questionId": occ.question_id,
+                    "questionText": q.get("questionText", ""),
+                    "updates": updates,
+                })
+
+    stats["exams_affected"] = sorted(stats["exams_affected"], key=lambda e: (exam_number(e) or 0, e))
+    stats["detailed_updates"].sort(key=lambda u: (exam_number(u["examId"]) or 0, u["questionId"] or 0))
+    return stats
+
+
+def load_state(config: dict) -> dict:
+    """Previous run's state, or an empty one if missing or made with other options."""
+    empty = {"version": STATE_VERSION, "config": config, "exams": {}, "sources": {}}
+    if not os.path.exists(STATE_FILE):
+        return empty
+    with open(STATE_FILE, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("version") != STATE_VERSION or state.get("config") != config:
+        return empty
+    return state
+
+
+def save_state(state: dict) -> None:
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp_path = STATE_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, STATE_FILE)
+
+
+def index_incrementally(data: List[dict], cached_exams: Dict[str, dict]) -> Tuple[QuestionIndex, Dict[str, dict], Set[str]]:
+    """
+    Build the question index, reusing cached normalized texts of unchanged exams.
+
+    Returns (index, per-exam state, affected texts), where affected texts are those
+    of every question in an added, edited or removed exam, before and after the change.
+    """
+    entries: Dict[str, List[Occurrence]] = {}
+    exams_state: Dict[str, dict] = {}
+    affected: Set[str] = set()
+    for exam_pos, exam in enumerate(data):
+        exam_id = exam.get("examId", "")
+        questions = exam.get("questions", [])
+        digest = exam_hash(exam)
+        cached = cached_exams.get(exam_id)
+        if cached and cached["hash"] == digest:
+            norms = cached["norms"]
+        else:
+            norms = [normalize(q.get("questionText")) for q in questions]
+            affected.update(norms)
+            if cached:
+                affected.update(cached["norms"])
+        exams_state[exam_id] = {"hash": digest, "norms": norms}
+        for question_pos, (q, norm) in enumerate(zip(questions, norms)):
+            if norm:
+                entries.setdefault(norm, []).append(Occurrence(exam_id, q.get("id"), exam_pos, question_pos))
+    for exam_id in set(cached_exams) - set(exams_state):
+        affected.update(cached_exams[exam_id]["norms"])
+    affected.discard("")
+    return QuestionIndex(entries), exams_state, affected
+
+
+def file_exists_for_image_url(image_url: str) -> bool:
+    return image_exists(image_url)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Propagate images between repeated questions.")
+    parser.add_argument("--sources", required=True, help='source exams, e.g. "1-8" or "others"')
+    parser.add_argument("--targets", required=True, help='target exams, e.g. "9-15", "all" or "others"')
+    parser.add_argument("--policy", choices=POLICIES, default="fill-missing")
+    parser.add_argument("--require-files", action="store_true",
+                        help="ignore source main images whose file does not exist")
+    parser.add_argument("--require-main-image", action="store_true",
+                        help="only use source questions that have a main image")
+    parser.add_argument("--fuzzy", type=float, metavar="THRESHOLD",
+                        help="also match near-duplicate texts with at least this shingle similarity")
+    parser.add_argument("--full", action="store_true", help="ignore the incremental state and reprocess everything")
+    parser.add_argument("--report", default=OUTPUT_REPORT, help="where to write the JSON report")
+    args = parser.parse_args()
+
+    if not Path(EXAMS_FILE).exists():
+        print(f"❌ Bulunamadı: {EXAMS_FILE}")
+        return 1
+
+    store = ExamStore(EXAMS_FILE)
+    data = store.data
+    exam_ids = [e.get("examId", "") for e in data]
+    try:
+        source_ids, target_ids = resolve_selectors(args.sources, args.targets, exam_ids)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    config = {
+        "sources": sorted(source_ids),
+        "targets": sorted(target_ids),
+        "policy": args.policy,
+        "requireFiles": args.require_files,
+        "requireMainImage": args.require_main_image,
+    }
+    if args.require_files:
+        # Cached sources depend on which image files exist, not only on exams.json
+        config["imageManifest"] = shared_manifest().key()
+    incremental = not args.full and not args.fuzzy
+    state = load_state(config) if incremental else {"exams": {}, "sources": {}}
+    if incremental:
+        index, exams_state, affected = index_incrementally(data, state["exams"])
+        cached_sources = {norm: (url, opts) for norm, (url, opts) in state["sources"].items()}
+    else:
+        index = load_index(data, file_hash(EXAMS_FILE))
+        exams_state, affected, cached_sources = {}, set(index.entries), {}
+
+    fresh = index.image_sources(
+        data,
+        include=exam_selector(source_ids),
+        file_exists=file_exists_for_image_url if args.require_files else None,
+        require_main_image=args.require_main_image,
+        norms=affected,
+    )
+    sources = {norm: src for norm, src in cached_sources.items() if norm not in affected and norm in index}
+    sources.update(fresh)
+    print(f"🔍 {len(source_ids)} kaynak denemede {len(sources)} görselli soru bulundu")
+    if args.fuzzy:
+        fuzzy = fuzzy_image_sources(index, sources, args.fuzzy)
+        print(f"🔍 Yakın-kopya eşleşmesiyle {len(fuzzy)} soru metni daha eklendi")
+        sources.update(fuzzy)
+
+    target_questions = sum(len(e.get("questions", [])) for e in data if e.get("examId") in target_ids)
+    revisited = sum(
+        1 for norm in affected
+        for occ in index.occurrences(norm) if occ.exam_id in target_ids
+    )
+    skipped = target_questions - revisited
+    if incremental and skipped:
+        print(f"⚡ Önbellek sayesinde {skipped} / {target_questions} hedef soru atlandı")
+
+    stats = propagate(
+        data, index, {n: sources[n] for n in affected if n in sources}, target_ids,
+        overwrite=args.policy == "overwrite",
+    )
+    stats["questions_skipped_by_cache"] = skipped
+
+    if stats["total_questions_updated"] > 0:
+        stats["blast_radius"] = report_blast_radius(store)
+    if args.policy == "report-only":
+        print("ℹ️ report-only: exams.json değiştirilmedi")
+    elif stats["total_questions_updated"] > 0:
+        store.save("propagate_images")
+        print("✅ exams.json güncellendi")
+    else:
+        print("ℹ️ Güncelleme gerekmedi")
+
+    if incremental and args.policy != "report-only":
+        # Hash the exams as written so the next run sees them as unchanged
+        for exam in data:
+            if exam.get("examId") in stats["exams_affected"]:
+                exams_state[exam["examId"]]["hash"] = exam_hash(exam)
+        state.update(exams=exams_state, sources={n: list(src) for n, src in sources.items()})
+        save_state(state)
+
+    order = lambda e: (exam_number(e) or 0, e)
+    report = {
+        "policy": args.policy,
+        "sources": sorted(source_ids, key=order),
+        "targets": sorted(target_ids, key=order),
+        "source_questions": len(sources),
+        "propagation_stats": stats,
+    }
+    Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print("\n📊 Özet:")
+    print(f"  - Güncellenen sorular: {stats['total_questions_updated']}")
+    print(f"  - Eklenen / değiştirilen ana görseller: {stats['main_images_added']} / {stats['main_images_replaced']}")
+    print(f"  - Eklenen / değiştirilen seçenek görselleri: {stats['option_images_added']} / {stats['option_images_replaced']}")
+    print(f"  - Etkilenen denemeler: {', '.join(stats['exams_affected']) if stats['exams_affected'] else 'yok'}")
+    print(f"  - Önbellek sayesinde atlanan hedef sorular: {skipped}")
+    print(f"📄 Rapor: {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
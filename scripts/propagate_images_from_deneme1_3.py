@@ -1,44 +1,20 @@
 #!/usr/bin/env python3
-import json
 import os
 import sys
 from typing import Dict, List, Tuple
 
+from exam_store import ExamStore
+from image_manifest import image_exists
+from image_refs import report_blast_radius
+from question_index import CACHE_FILE, file_hash, load_index, normalize
+
 
 PROJECT_DIR = "/Users/ummugulsun/Ehliyet Rehberim/ehliyet_rehberim"
 EXAMS_JSON = os.path.join(PROJECT_DIR, "assets/data/exams.json")
 
 
-def normalize(text: str) -> str:
-    if text is None:
-        return ""
-    s = text.lower().strip()
-    # collapse whitespace
-    while "  " in s:
-        s = s.replace("  ", " ")
-    # remove quotes similar to Dart validate_exams.dart
-    s = s.replace('"', '').replace("'", "")
-    return s
-
-
-def load_exams() -> List[dict]:
-    with open(EXAMS_JSON, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def save_exams(data: List[dict]) -> None:
-    tmp_path = EXAMS_JSON + ".tmp"
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    os.replace(tmp_path, EXAMS_JSON)
-
-
 def file_exists_for_image_url(image_url: str) -> bool:
-    if not image_url:
-        return False
-    # imageUrl stored like assets/images/xyz.png relative to project dir
-    abs_path = os.path.join(PROJECT_DIR, image_url)
-    return os.path.exists(abs_path)
+    return image_exists(image_url, PROJECT_DIR)
 
 
 def collect_source_images(data: List[dict], source_exam_ids: Tuple[str, ...]) -> Dict[str, str]:
@@ -58,14 +34,12 @@ def collect_source_images(data: List[dict], source_exam_ids: Tuple[str, ...]) ->
         except ValueError:
             return 500
 
-    for exam in data:
-        exam_id = exam.get("examId", "")
-        if exam_id not in source_exam_ids:
-            continue
-        for q in exam.get("questions", []):
-            text = q.get("questionText", "")
-            norm = normalize(text)
-            image_url = q.get("imageUrl")
+    index = load_index(data, file_hash(EXAMS_JSON), os.path.join(PROJECT_DIR, CACHE_FILE))
+    for norm, occs in index.entries.items():
+        for occ in occs:
+            if occ.exam_id not in source_exam_ids:
+                continue
+            image_url = index.question(data, occ).get("imageUrl")
             if not image_url:
                 continue
             if not file_exists_for_image_url(image_url):
@@ -100,7 +74,8 @@ def propagate_images(data: List[dict], norm_to_image: Dict[str, str], target_exa
 
 
 def main() -> int:
-    data = load_exams()
+    store = ExamStore(EXAMS_JSON)
+    data = store.data
 
     # sources: deneme 1-3; targets: all others except 1-3
     source_ids = ("deneme_sinavi_1", "deneme_sinavi_2", "deneme_sinavi_3")
@@ -112,7 +87,8 @@ def main() -> int:
 
     updated = propagate_images(data, source_map, target_ids)
     if updated:
-        save_exams(data)
+        report_blast_radius(store, PROJECT_DIR)
+        store.save("propagate_images_from_deneme1_3")
 
     print(f"Propagate complete. Mapped images: {len(source_map)}. Questions updated: {updated}.")
     if updated:
@@ -10,48 +10,19 @@ import sys
 from typing import Dict, List, Tuple, Set
 from collections import defaultdict
 
+from exam_store import ExamStore
+from image_manifest import image_exists
+from image_refs import report_blast_radius
+from question_index import CACHE_FILE, file_hash, load_index, normalize
+
 
 PROJECT_DIR = "/Users/ummugulsun/Ehliyet Rehberim/ehliyet_rehberim"
 EXAMS_JSON = os.path.join(PROJECT_DIR, "assets/data/exams.json")
 OUTPUT_REPORT = os.path.join(PROJECT_DIR, "analysis/propagation_report_7_10.json")
 
 
-def normalize(text: str) -> str:
-    if text is None:
-        return ""
-    s = text.lower().strip()
-    while "  " in s:
-        s = s.replace("  ", " ")
-    for char in '.,;:!?"\'':
-        s = s.replace(char, "")
-    return s
-
-
-def load_exams() -> List[dict]:
-    with open(EXAMS_JSON, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def save_exams(data: List[dict]) -> None:
-    tmp_path = EXAMS_JSON + ".tmp"
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    os.replace(tmp_path, EXAMS_JSON)
-
-
-def extract_option_images(options: dict) -> Dict[str, str]:
-    option_images: Dict[str, str] = {}
-    for key, value in options.items():
-        if isinstance(value, dict) and "imageUrl" in value and value["imageUrl"]:
-            option_images[key] = value["imageUrl"]
-    return option_images
-
-
 def file_exists_for_image_url(image_url: str) -> bool:
-    if not image_url:
-        return False
-    abs_path = os.path.join(PROJECT_DIR, image_url)
-    return os.path.exists(abs_path)
+    return image_exists(image_url, PROJECT_DIR)
 
 
 def build_source_image_map(data: List[dict], exclude_exam_ids: Set[str]) -> Dict[str, Tuple[str, Dict[str, str]]]:
@@ -59,28 +30,12 @@ def build_source_image_map(data: List[dict], exclude_exam_ids: Set[str]) -> Dict
     Map normalized question text -> (imageUrl, option_images) from ALL exams except excluded ones.
     Prefer entries that provide more total images (main + options).
     """
-    norm_to_images: Dict[str, Tuple[str, Dict[str, str]]] = {}
-    for exam in data:
-        exam_id = exam.get("examId", "")
-        if exam_id in exclude_exam_ids:
-            continue
-        for q in exam.get("questions", []):
-            text = q.get("questionText", "")
-            norm = normalize(text)
-            image_url = q.get("imageUrl") if file_exists_for_image_url(q.get("imageUrl")) else None
-            option_images = extract_option_images(q.get("options", {}))
-            if not image_url and not option_images:
-                continue
-            existing = norm_to_images.get(norm)
-            if existing:
-                existing_url, existing_opts = existing
-                new_count = (1 if image_url else 0) + len(option_images)
-                existing_count = (1 if existing_url else 0) + len(existing_opts)
-                if new_count > existing_count:
-                    norm_to_images[norm] = (image_url, option_images)
-            else:
-                norm_to_images[norm] = (image_url, option_images)
-    return norm_to_images
+    index = load_index(data, file_hash(EXAMS_JSON), os.path.join(PROJECT_DIR, CACHE_FILE))
+    return index.image_sources(
+        data,
+        include=lambda exam_id: exam_id not in exclude_exam_ids,
+        file_exists=file_exists_for_image_url,
+    )
 
 
 def propagate_to_targets(
@@ -151,7 +106,8 @@ def propagate_to_targets(
 
 def main() -> int:
     print("🚀 Propagation to Deneme 7-10 started...")
-    data = load_exams()
+    store = ExamStore(EXAMS_JSON)
+    data = store.data
 
     target_exam_ids: Set[str] = {"deneme_sinavi_7", "deneme_sinavi_8", "deneme_sinavi_9", "deneme_sinavi_10"}
     exclude_sources = set(target_exam_ids)  # do not source from the targets themselves
@@ -162,7 +118,8 @@ def main() -> int:
     stats = propagate_to_targets(data, source_map, target_exam_ids)
 
     if stats["total_questions_updated"] > 0:
-        save_exams(data)
+        stats["blast_radius"] = report_blast_radius(store, PROJECT_DIR)
+        store.save("propagate_images_to_7_10")
         print("✅ exams.json updated for Deneme 7-10")
     else:
         print("ℹ️ No updates were necessary for Deneme 7-10")
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Per-question feature index: visual-cue hits, category keyword hits, main image
+and option image counts for every question of exams.json.
+
+Tools that look for visual questions without an image used to rescan every
+question text with their own keyword list on every run. Here the visual cues and
+the category keyword lists go into one KeywordMatcher (categorize_questions.py),
+so a single regex pass over a question's text yields all of its keyword hits.
+The result is saved to assets/data/.index/question_features.json, next to the
+data it describes (not bundled with the app; pubspec lists data files one by one).
+
+Updates are incremental: an exam whose content hash is unchanged keeps its
+records, and within a changed exam only question texts that were never matched
+before go through the matcher; image features are re-read, which costs nothing.
+Queries such as "visual questions without an image" are then lookups.
+
+Usage:
+    python3 scripts/question_features.py              # build or update the index
+    python3 scripts/question_features.py --missing    # visual questions without an image
+    python3 scripts/question_features.py --benchmark  # rescans vs. index lookups
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from categorize_questions import CATEGORY_KEYWORDS, KeywordMatcher, question_text, text_hash
+from question_index import EXAMS_FILE, exam_hash, extract_option_images, file_hash, has_image
+
+FEATURES_FILE = "assets/data/.index/question_features.json"
+
+# Phrases that mean the question refers to a figure, sign or dashboard symbol
+VISUAL_KEYWORDS = [
+    "şekil", "sekil", "şekle göre", "şekildeki", "resim", "görsel", "levha",
+    "işaret", "isaret", "gösterge", "gosterge", "ikaz ışığı", "ikaz isiği", "ikaz isigi",
+    "yatay işaretleme", "yatay isaretleme", "taşıt yolu üzerine çizilen",
+    "tasit yolu uzerine cizilen", "dönel kavşak", "donel kavsak",
+    "polisin verdiği işaret", "polis işareti", "trafik polisi işareti",
+]
+VISUAL = "visual"
+
+MATCHER = KeywordMatcher({VISUAL: VISUAL_KEYWORDS, **CATEGORY_KEYWORDS})
+# Longest keyword matched at a position -> visual cues that start there (it and its prefixes)
+_VISUAL_CUES = {k: [p for p in VISUAL_KEYWORDS if k.startswith(p)] for k in MATCHER.keywords}
+
+# Records are only valid for the keyword lists they were matched with
+FEATURES_VERSION = hashlib.sha256(
+    json.dumps([VISUAL_KEYWORDS, CATEGORY_KEYWORDS], ensure_ascii=False).encode("utf-8")
+).hexdigest()[:16]
+
+
+def text_features(q_text: str, o_text: str) -> dict:
+    """
+    Keyword hits of one question in a single matcher pass.
+
+    Category hits count over the question and option text together, exactly like
+    categorize_questions.category_scores; visual cues are split into the ones in
+    the question text and the number found in the options.
+    """
+    visual: List[str] = []
+    option_visual = 0
+    categories: Dict[str, int] = {}
+    boundary = len(q_text)
+    for pos, keyword in MATCHER.matches((q_text + " " + o_text).lower()):
+        for group in MATCHER.groups(keyword):
+            if group != VISUAL:
+                categories[group] = categories.get(group, 0) + 1
+        cues = _VISUAL_CUES[keyword]
+        if pos < boundary:
+            visual.extend(c for c in cues if c not in visual)
+        else:
+            option_visual += len(cues)
+    return {"visual": visual, "optionVisual": option_visual, "categories": categories}
+
+
+def question_features(q: dict, cached_text: Optional[Dict[str, dict]] = None) -> dict:
+    q_text, o_text = question_text(q)
+    digest = text_hash(q_text, o_text)
+    matched = (cached_text or {}).get(digest)
+    if matched is None:
+        matched = text_features(q_text, o_text)
+    options = q.get("options") if isinstance(q.get("options"), dict) else {}
+    return {
+        "id": q.get("id"),
+        "textHash": digest,
+        **matched,
+        "hasImage": has_image(q.get("imageUrl")),
+        "optionImages": len(extract_option_images(options)),
+    }
+
+
+def indicates_visual(record: dict) -> bool:
+    return bool(record["visual"] or record["optionVisual"])
+
+
+class FeatureIndex:
+    """Feature records per exam, in exams.json order; records follow question order."""
+
+    def __init__(self, exams: List[dict], source_hash: str = ""):
+        self.exams = exams
+        self.source_hash = source_hash
+        self._by_id = {e["examId"]: e for e in exams}
+
+    @classmethod
+    def build(
+        cls, data: List[dict], previous: Optional["FeatureIndex"] = None, source_hash: str = ""
+    ) -> Tuple["FeatureIndex", dict]:
+        """Index for `data`, reusing what `previous` already knows; returns (index, stats)."""
+        stats = {"exams": len(data), "examsReused": 0, "questions": 0, "textsMatched": 0}
+        old_exams: Dict[str, dict] = {}
+        cached_text: Dict[str, dict] = {}
+        if previous is not None:
+            old_exams = {e["examId"]: e for e in previous.exams}
+            cached_text = {
+                r["textHash"]: {k: r[k] for k in ("visual", "optionVisual", "categories")}
+                for e in previous.exams for r in e["questions"]
+            }
+        exams = []
+        for exam in data:
+            exam_id = exam.get("examId", "")
+            digest = exam_hash(exam)
+            questions = exam.get("questions", [])
+            stats["questions"] += len(questions)
+            old = old_exams.get(exam_id)
+            if old is not None and old["hash"] == digest:
+                exams.append(old)
+                stats["examsReused"] += 1
+                continue
+            records = []
+            for q in questions:
+                record = question_features(q, cached_text)
+                if record["textHash"] not in cached_text:
+                    cached_text[record["textHash"]] = {k: record[k] for k in ("visual", "optionVisual", "categories")}
+                    stats["textsMatched"] += 1
+                records.append(record)
+            exams.append({"examId": exam_id, "hash": digest, "questions": records})
+        return cls(exams, source_hash), stats
+
+    def exam(self, exam_id: str) -> List[dict]:
+        entry = self._by_id.get(exam_id)
+        return entry["questions"] if entry else []
+
+    def query(self, predicate: Callable[[dict], bool]) -> Iterator[Tuple[int, int, str, dict]]:
+        """(exam position, question position, examId, record) for every matching question."""
+        for exam_pos, entry in enumerate(self.exams):
+            for question_pos, record in enumerate(entry["questions"]):
+                if predicate(record):
+                    yield exam_pos, question_pos, entry["examId"], record
+
+    def missing_images(self, options_count: bool = False) -> Iterator[Tuple[int, int, str, dict]]:
+        """Visual questions without a main image; cues in the options count only with `options_count`."""
+        if options_count:
+            return self.query(lambda r: indicates_visual(r) and not r["hasImage"])
+        return self.query(lambda r: bool(r["visual"]) and not r["hasImage"])
+
+    # Persistence -------------------------------------------------------------
+
+    def save(self, path: str = FEATURES_FILE) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": FEATURES_VERSION, "sourceHash": self.source_hash, "exams": self.exams},
+                      f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = FEATURES_FILE) -> Optional["FeatureIndex"]:
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != FEATURES_VERSION:
+            return None
+        return cls(payload["exams"], payload.get("sourceHash", ""))
+
+
+def load_features(
+    data: List[dict], path: Optional[str] = FEATURES_FILE, source_hash: str = ""
+) -> Tuple[FeatureIndex, dict]:
+    """
+    Index for `data`: the saved one, updated for whatever changed and saved again if it did.
+
+    Pass the file hash of exams.json as `source_hash` when `data` is exactly what
+    was read from it; a saved index for the same hash is then used without
+    hashing each exam.
+    """
+    previous = FeatureIndex.load(path) if path else None
+    if previous is not None and source_hash and previous.source_hash == source_hash:
+        count = sum(len(e["questions"]) for e in previous.exams)
+        return previous, {"exams": len(previous.exams), "examsReused": len(previous.exams),
+                          "questions": count, "textsMatched": 0}
+    index, stats = FeatureIndex.build(data, previous, source_hash)
+    if path and (previous is None or stats["examsReused"] != stats["exams"] or index.source_hash != previous.source_hash):
+        index.save(path)
+    return index, stats
+
+
+# Benchmark -----------------------------------------------------------------
+
+def _rescan_missing(data: List[dict]) -> List[Tuple[str, int]]:
+    # What analyze_remaining_missing did: one substring test per keyword per question
+    found = []
+    for exam in data:
+        for q in exam.get("questions", []):
+            text = q.get("questionText", "").lower()
+            if any(keyword in text for keyword in VISUAL_KEYWORDS) and not has_image(q.get("imageUrl")):
+                found.append((exam.get("examId", ""), q.get("id")))
+    return found
+
+
+def run_benchmark(data: List[dict], repeat: int = 20) -> None:
+    import tempfile
+
+    def timed(fn) -> float:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - start) / repeat * 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "features.json")
+        source_hash = file_hash(EXAMS_FILE)
+        FeatureIndex.build(data, source_hash=source_hash)[0].save(path)
+        edited = json.loads(json.dumps(data))
+        edited[-1]["questions"][0]["questionText"] += " şekildeki"
+
+        results = [
+            ("yeniden tarama (eski)", timed(lambda: _rescan_missing(data))),
+            ("tam dizin kurulumu", timed(lambda: FeatureIndex.build(data))),
+            ("yükle, dosya özeti aynı", timed(lambda: load_features(data, path, source_hash))),
+            ("yükle + güncelle, değişiklik yok", timed(lambda: load_features(data, path))),
+            ("güncelle, 1 soru değişti", timed(lambda: FeatureIndex.build(edited, FeatureIndex.load(path)))),
+        ]
+        index = FeatureIndex.load(path)
+        results.append(("sorgu (hazır dizin)", timed(lambda: list(index.missing_images()))))
+
+        same = sorted(_rescan_missing(data)) == sorted((e, r["id"]) for _, _, e, r in index.missing_images())
+        print(f"⏱️  {sum(len(e.get('questions', [])) for e in data)} soru, {repeat} tekrar ortalaması")
+        for label, ms in results:
+            print(f"  - {label:<34} {ms:8.2f} ms")
+        print(f"  - Sonuçlar aynı: {same}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build or query the per-question feature index.")
+    parser.add_argument("--missing", action="store_true", help="list visual questions without an image")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if not os.path.exists(EXAMS_FILE):
+        print(f"❌ Bulunamadı: {EXAMS_FILE}")
+        return 1
+    with open(EXAMS_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if args.benchmark:
+        run_benchmark(data)
+        return 0
+
+    start = time.perf_counter()
+    index, stats = load_features(data, source_hash=file_hash(EXAMS_FILE))
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"✅ {stats['questions']} soru, {stats['exams']} deneme ({elapsed:.0f} ms): "
+          f"{stats['examsReused']} deneme değişmemiş, {stats['textsMatched']} metin eşleştirildi")
+    print(f"📄 Dizin: {FEATURES_FILE}")
+    if args.missing:
+        missing = list(index.missing_images())
+        print(f"\n📌 Görseli eksik görsel sorular: {len(missing)}")
+        for exam_pos, question_pos, exam_id, record in missing:
+            q = data[exam_pos]["questions"][question_pos]
+            print(f"  - {exam_id} #{record['id']} [{', '.join(record['visual'])}]: {q.get('questionText', '')[:80]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
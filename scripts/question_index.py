@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Shared question matching for the exams.json tooling.
+
+Every propagation, analysis and canonicalization script matches repeated questions by
+normalized question text. This module owns that normalization and a prebuilt index
+from normalized text to every occurrence across all exams, so scripts no longer
+carry their own copies.
+
+Usage:
+    python3 scripts/question_index.py              # build (or reuse) the cached index
+    python3 scripts/question_index.py --benchmark  # normalize throughput vs. the old copies
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import string
+import sys
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+EXAMS_FILE = "assets/data/exams.json"
+CACHE_FILE = ".cache/question_index.json"
+
+# Bump when normalize() changes so persisted indexes are rebuilt.
+NORMALIZER_VERSION = 1
+
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+# ASCII punctuation except "_", which \w keeps
+_ASCII_PUNCTUATION = string.punctuation.replace("_", "").encode("ascii")
+
+
+def normalize(text: Optional[str]) -> str:
+    """Normalize question text for comparison.
+
+    Lowercases, drops punctuation and collapses whitespace; equivalent to
+    `re.sub(r"\s+", " ", re.sub(r"[^\w\s]", "", text.lower())).strip()`.
+    ASCII punctuation is deleted with one bytes.translate pass over the UTF-8
+    text; only texts that still hold something other than letters, digits and
+    single spaces (Unicode punctuation, "_", tabs) go through the regex.
+    """
+    if not text:
+        return ""
+    s = text.lower().encode("utf-8", "surrogatepass").translate(None, _ASCII_PUNCTUATION)
+    s = s.decode("utf-8", "surrogatepass")
+    if s.replace(" ", "").isalnum():
+        if "  " in s or s[:1] == " " or s[-1:] == " ":
+            return " ".join(s.split())
+        return s
+    return " ".join(_PUNCTUATION.sub("", s).split())
+
+
+_TURKISH_CAPITALS = str.maketrans({"İ": "i", "I": "ı"})
+_SEARCH_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu", "̇")
+
+
+def turkish_lower(text: str) -> str:
+    """Lowercase with Turkish rules: İ -> i and I -> ı, where str.lower() gives i̇ and i."""
+    return text.translate(_TURKISH_CAPITALS).lower()
+
+
+def search_fold(text: Optional[str]) -> str:
+    """Turkish lowercase with the accents dropped, so "KAVŞAĞA" and "kavsaga" compare equal."""
+    if not text:
+        return ""
+    return turkish_lower(text).translate(_SEARCH_FOLD)
+
+
+def extract_option_images(options: Optional[dict]) -> Dict[str, str]:
+    """imageUrl of every option that has one."""
+    option_images: Dict[str, str] = {}
+    for key, value in (options or {}).items():
+        if isinstance(value, dict) and value.get("imageUrl"):
+            option_images[key] = value["imageUrl"]
+    return option_images
+
+
+def has_image(url: Optional[str]) -> bool:
+    return bool(url) and url != "null"
+
+
+class Occurrence(NamedTuple):
+    exam_id: str
+    question_id: int
+    exam_pos: int
+    question_pos: int
+
+
+ImageSource = Tuple[Optional[str], Dict[str, str]]
+
+
+class QuestionIndex:
+    """Normalized question text -> every occurrence of that question across all exams."""
+
+    def __init__(self, entries: Dict[str, List[Occurrence]], source_hash: str = ""):
+        self.entries = entries
+        self.source_hash = source_hash
+
+    @classmethod
+    def build(cls, data: List[dict], source_hash: str = "") -> "QuestionIndex":
+        entries: Dict[str, List[Occurrence]] = {}
+        for exam_pos, exam in enumerate(data):
+            exam_id = exam.get("examId", "")
+            for question_pos, q in enumerate(exam.get("questions", [])):
+                norm = normalize(q.get("questionText"))
+                if not norm:
+                    continue
+                occ = Occurrence(exam_id, q.get("id"), exam_pos, question_pos)
+                entries.setdefault(norm, []).append(occ)
+        return cls(entries, source_hash)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, norm: str) -> bool:
+        return norm in self.entries
+
+    def occurrences(self, norm: str) -> List[Occurrence]:
+        return self.entries.get(norm, [])
+
+    def repeated(self) -> Iterator[Tuple[str, List[Occurrence]]]:
+        """Questions that occur more than once."""
+        for norm, occs in self.entries.items():
+            if len(occs) > 1:
+                yield norm, occs
+
+    @staticmethod
+    def question(data: List[dict], occ: Occurrence) -> dict:
+        return data[occ.exam_pos]["questions"][occ.question_pos]
+
+    def image_sources(
+        self,
+        data: List[dict],
+        include: Optional[Callable[[str], bool]] = None,
+        file_exists: Optional[Callable[[str], bool]] = None,
+        require_main_image: bool = False,
+        norms: Optional[Iterable[str]] = None,
+    ) -> Dict[str, ImageSource]:
+        """
+        Map normalized text -> (imageUrl, option_images) from exams accepted by `include`.
+
+        When a question has several imaged occurrences, the one with the most images
+        (main + options) wins; ties keep the first in file order. `file_exists` drops
+        main images whose file is missing, `require_main_image` skips occurrences
+        that only carry option images. `norms` limits the map to those texts.
+        """
+        sources: Dict[str, ImageSource] = {}
+        keys = self.entries if norms is None else [n for n in norms if n in self.entries]
+        for norm in keys:
+            occs = self.entries[norm]
+            best: Optional[ImageSource] = None
+            best_count = 0
+            for occ in occs:
+                if include is not None and not include(occ.exam_id):
+                    continue
+                q = self.question(data, occ)
+                image_url = q.get("imageUrl") if has_image(q.get("imageUrl")) else None
+                if image_url and file_exists is not None and not file_exists(image_url):
+                    image_url = None
+                if require_main_image and not image_url:
+                    continue
+                option_images = extract_option_images(q.get("options"))
+                count = (1 if image_url else 0) + len(option_images)
+                if count > best_count:
+                    best, best_count = (image_url, option_images), count
+            if best is not None:
+                sources[norm] = best
+        return sources
+
+    # Persistence -------------------------------------------------------------
+
+    def save(self, path: str = CACHE_FILE) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        payload = {
+            "normalizerVersion": NORMALIZER_VERSION,
+            "sourceHash": self.source_hash,
+            "entries": {norm: [list(o) for o in occs] for norm, occs in self.entries.items()},
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = CACHE_FILE) -> Optional["QuestionIndex"]:
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("normalizerVersion") != NORMALIZER_VERSION:
+            return None
+        entries = {
+            norm: [Occurrence(*o) for o in occs] for norm, occs in payload["entries"].items()
+        }
+        return cls(entries, payload.get("sourceHash", ""))
+
+
+def file_hash(path: str = EXAMS_FILE) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def exam_hash(exam: dict) -> str:
+    """sha256 of one exam's canonical JSON, so key order and formatting do not matter."""
+    payload = json.dumps(exam, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_exams(path: str = EXAMS_FILE) -> Tuple[List[dict], str]:
+    """Parse exams.json and return (data, sha256 of the raw file)."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    return json.loads(raw), hashlib.sha256(raw).hexdigest()
+
+
+def load_index(
+    data: List[dict], source_hash: str, cache_path: Optional[str] = CACHE_FILE
+) -> QuestionIndex:
+    """Reuse the persisted index if it was built from the same exams.json, else rebuild it."""
+    if cache_path:
+        cached = QuestionIndex.load(cache_path)
+        if cached is not None and cached.source_hash == source_hash:
+            return cached
+    index = QuestionIndex.build(data, source_hash)
+    if cache_path:
+        index.save(cache_path)
+    return index
+
+
+def exam_selector(exam_ids) -> Callable[[str], bool]:
+    ids: Set[str] = set(exam_ids)
+    return lambda exam_id: exam_id in ids
+
+
+# Benchmark -----------------------------------------------------------------
+
+def _legacy_normalize_loop(text: str) -> str:
+    # advanced_image_propagator.py / propagate_images_to_7_10.py
+    if text is None:
+        return ""
+    s = text.lower().strip()
+    while "  " in s:
+        s = s.replace("  ", " ")
+    for char in '.,;:!?"\'':
+        s = s.replace(char, "")
+    return s
+
+
+def _legacy_normalize_regex(text: str) -> str:
+    # propagate_from_first_8.py / canonicalize_images_11_15.py
+    text = text.lower()
+    text = re.sub(r'[^\w\s]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def _legacy_normalize_quotes(text: str) -> str:
+    # propagate_images_from_deneme1_3.py (mirrors tool/validate_exams.dart)
+    if text is None:
+        return ""
+    s = text.lower().strip()
+    while "  " in s:
+        s = s.replace("  ", " ")
+    return s.replace('"', '').replace("'", "")
+
+
+def run_benchmark(data: List[dict], repeat: int = 20) -> None:
+    texts = [q.get("questionText", "") for exam in data for q in exam.get("questions", [])]
+    print(f"⏱️  {len(texts)} soru metni x {repeat} tekrar")
+
+    candidates = [
+        ("normalize (translate)", normalize),
+        ("regex + split/join", lambda t: " ".join(_PUNCTUATION.sub("", t.lower()).split())),
+        ("legacy loop/replace", _legacy_normalize_loop),
+        ("legacy re.sub", _legacy_normalize_regex),
+        ("legacy quotes-only", _legacy_normalize_quotes),
+    ]
+    mismatches = sum(1 for t in texts if normalize(t) != _legacy_normalize_regex(t))
+    for name, fn in candidates:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for t in texts:
+                fn(t)
+        elapsed = time.perf_counter() - start
+        rate = len(texts) * repeat / elapsed
+        print(f"  - {name:<24} {elapsed * 1000:8.1f} ms  {rate:>12,.0f} metin/sn")
+    print(f"  - re.sub sürümünden farklı sonuç: {mismatches}")
+
+    start = time.perf_counter()
+    QuestionIndex.build(data)
+    print(f"  - İndeks oluşturma: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+def main() -> int:
+    if not os.path.exists(EXAMS_FILE):
+        print(f"❌ Bulunamadı: {EXAMS_FILE}")
+        return 1
+    data, source_hash = load_exams()
+    if "--benchmark" in sys.argv:
+        run_benchmark(data)
+        return 0
+
+    cache_path = None if "--no-cache" in sys.argv else CACHE_FILE
+    start = time.perf_counter()
+    index = load_index(data, source_hash, cache_path)
+    elapsed = (time.perf_counter() - start) * 1000
+    repeated = sum(1 for _ in index.repeated())
+    print(f"✅ {len(index)} farklı soru metni, {repeated} tanesi birden fazla denemede ({elapsed:.1f} ms)")
+    if cache_path:
+        print(f"📄 İndeks: {cache_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Turkish-aware inverted index with BM25 ranking over the question bank.
+
+Finding questions by topic used to mean substring scans over `text.lower()`, which
+is wrong for Turkish ("İ".lower() is "i" plus a combining dot, "I".lower() is "i"
+instead of "ı"). This indexes questionText, the option texts and explanation of
+every distinct question after question_index.search_fold and a light suffix
+stripper, and ranks matches with BM25 (question text counts double). A question
+repeated across exams is one document listing all of its occurrences.
+
+The index is a small binary file in assets/data/.index/ that is rebuilt whenever
+exams.json changes. Little-endian layout:
+
+    header      magic, version, typecode of doc ids, section sizes, sha256 of exams.json
+    docs        compact JSON: [[questionText, [[examId, id], ...]], ...]
+    lengths     uint32 weighted token count per document
+    terms       newline-separated stemmed terms, sorted
+    offsets     uint32 start of each term's postings, plus the end
+    doc ids     uint16 (uint32 past 65535 documents) document of each posting
+    tfs         uint8 weighted term frequency of each posting, capped at 255
+
+Usage:
+    python3 scripts/search_index.py dönel kavşak     # top matches
+    python3 scripts/search_index.py --build           # rebuild the index
+    python3 scripts/search_index.py --benchmark       # build and query time, 1x and synthetic 10x corpus
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from question_index import EXAMS_FILE, search_fold
+
+INDEX_FILE = "assets/data/.index/search_index.bin"
+
+MAGIC = b"TRSRCH\x00\x01"
+# Bump when tokenize() or the layout changes so persisted indexes are rebuilt.
+VERSION = 2
+
+_HEADER = struct.Struct("<8sIc7I32s")
+
+FIELD_WEIGHTS = (("questionText", 2), ("options", 1), ("explanation", 1))
+K1 = 1.2
+B = 0.75
+
+MIN_STEM = 3
+# Folded (search_fold) inflectional suffixes, longest first; stripped repeatedly
+SUFFIXES = tuple(sorted((
+    "ler", "lar", "leri", "lari",
+    "de", "da", "te", "ta", "nde", "nda",
+    "den", "dan", "ten", "tan", "nden", "ndan",
+    "e", "a", "ye", "ya", "ne", "na",
+    "i", "u", "yi", "yu", "ni", "nu", "si", "su",
+    "in", "un", "nin", "nun",
+    "le", "la", "yle", "yla",
+    "ki", "dir", "dur", "tir", "tur",
+), key=len, reverse=True))
+# Final consonant softening undone on stripped stems: kavşağa -> kavsag -> kavsak
+_HARDEN = {"g": "k", "b": "p"}
+# Folded roots whose last letters look like a suffix; a word is never cut shorter than the
+# protected root it starts with, so yaya/yayalar stay apart from yay/yaylar and kanun from kan
+PROTECTED_STEMS = frozenset((
+    "yaya", "kanun", "basin", "hasta", "yara", "kara", "soru", "sorun", "doku", "hava",
+))
+
+_WORD = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=None)
+def stem(word: str) -> str:
+    """Strip inflectional suffixes from a folded word, keeping at least MIN_STEM letters."""
+    floor = max([MIN_STEM] + [len(root) for root in PROTECTED_STEMS if word.startswith(root)])
+    stripped = False
+    changed = True
+    while changed:
+        changed = False
+        for suffix in SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= floor:
+                word, stripped, changed = word[:-len(suffix)], True, True
+                break
+    if stripped and word[-1] in _HARDEN:
+        word = word[:-1] + _HARDEN[word[-1]]
+    return word
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [stem(word) for word in _WORD.findall(search_fold(text))]
+
+
+def _option_texts(options: Any) -> List[str]:
+    texts = []
+    for value in (options or {}).values() if isinstance(options, dict) else []:
+        if isinstance(value, dict):
+            value = value.get("text")
+        # Image options keep the path in the text; it is not searchable content
+        if isinstance(value, str) and not value.startswith(("assets/", "http")):
+            texts.append(value)
+    return texts
+
+
+def documents(exams: List[dict]) -> List[Tuple[str, List[str], str, List[List[Any]]]]:
+    """(questionText, option texts, explanation, occurrences) per distinct question."""
+    docs: Dict[tuple, Tuple[str, List[str], str, List[List[Any]]]] = {}
+    for exam in exams:
+        for q in exam.get("questions", []):
+            text = q.get("questionText") if isinstance(q.get("questionText"), str) else ""
+            explanation = q.get("explanation") if isinstance(q.get("explanation"), str) else ""
+            options = _option_texts(q.get("options"))
+            key = (text, tuple(options), explanation)
+            doc = docs.get(key)
+            if doc is None:
+                doc = docs[key] = (text, options, explanation, [])
+            doc[3].append([exam.get("examId"), q.get("id")])
+    return list(docs.values())
+
+
+class SearchIndex:
+    def __init__(self, docs: Optional[List[list]], lengths: array, terms: List[str], offsets: array,
+                 doc_ids: array, tfs: array, source_hash: str = "", docs_raw: bytes = b""):
+        self._docs = docs
+        self._docs_raw = docs_raw
+        self.lengths = lengths
+        self.terms = terms
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.source_hash = source_hash
+        self.term_ids = {term: i for i, term in enumerate(terms)}
+        self._norms: Optional[List[float]] = None
+
+    @property
+    def docs(self) -> List[list]:
+        """[questionText, occurrences] per document; decoded on first use, search does not need it."""
+        if self._docs is None:
+            self._docs = json.loads(self._docs_raw)
+        return self._docs
+
+    def _length_norms(self) -> List[float]:
+        if self._norms is None:
+            avg = sum(self.lengths) / len(self.lengths) if self.lengths else 1.0
+            self._norms = [K1 * (1 - B + B * length / avg) for length in self.lengths]
+        return self._norms
+
+    @classmethod
+    def build(cls, exams: List[dict], source_hash: str = "") -> "SearchIndex":
+        postings: Dict[str, Dict[int, int]] = {}
+        docs, lengths = [], array("I")
+        for doc_id, (text, options, explanation, occurrences) in enumerate(documents(exams)):
+            docs.append([text, occurrences])
+            length = 0
+            for field, weight in zip((text, " ".join(options), explanation), (w for _, w in FIELD_WEIGHTS)):
+                tokens = tokenize(field)
+                length += weight * len(tokens)
+                for term in tokens:
+                    counts = postings.setdefault(term, {})
+                    counts[doc_id] = counts.get(doc_id, 0) + weight
+            lengths.append(length)
+
+        terms = sorted(postings)
+        offsets = array("I", [0])
+        doc_ids = array("H" if len(docs) <= 0xFFFF else "I")
+        tfs = array("B")
+        for term in terms:
+            for doc_id, tf in sorted(postings[term].items()):
+                doc_ids.append(doc_id)
+                tfs.append(min(tf, 255))
+            offsets.append(len(doc_ids))
+        return cls(docs, lengths, terms, offsets, doc_ids, tfs, source_hash)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[float, int]]:
+        """(BM25 score, document) of the best matches for any query term, best first."""
+        n = len(self.lengths)
+        norms = self._length_norms()
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            i = self.term_ids.get(term)
+            if i is None:
+                continue
+            start, end = self.offsets[i], self.offsets[i + 1]
+            df = end - start
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for doc, tf in zip(self.doc_ids[start:end], self.tfs[start:end]):
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (K1 + 1) / (tf + norms[doc])
+        return [(score, doc) for doc, score in heapq.nlargest(limit, scores.items(), key=lambda item: item[1])]
+
+    # Serialization -------------------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        sections = [
+            json.dumps(self.docs, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+            _le(self.lengths), "\n".join(self.terms).encode("utf-8"),
+            _le(self.offsets), _le(self.doc_ids), self.tfs.tobytes(),
+        ]
+        header = _HEADER.pack(MAGIC, VERSION, self.doc_ids.typecode.encode("ascii"),
+                              len(self.terms), *(len(s) for s in sections),
+                              bytes.fromhex(self.source_hash) if self.source_hash else b"\x00" * 32)
+        return header + b"".join(sections)
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "SearchIndex":
+        (magic, version, typecode, n_terms, *sizes, digest) = _HEADER.unpack_from(payload, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Geçersiz arama dizini")
+        pos = _HEADER.size
+        sections = []
+        for size in sizes:
+            sections.append(payload[pos:pos + size])
+            pos += size
+        docs_raw, lengths_raw, terms_raw, offsets_raw, ids_raw, tfs_raw = sections
+        terms = terms_raw.decode("utf-8").split("\n") if n_terms else []
+        return cls(None, _from_le("I", lengths_raw), terms, _from_le("I", offsets_raw),
+                   _from_le(typecode.decode("ascii"), ids_raw), _from_le("B", tfs_raw),
+                   digest.hex() if any(digest) else "", docs_raw)
+
+    def save(self, path: str = INDEX_FILE) -> int:
+        payload = self.to_bytes()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return len(payload)
+
+    @classmethod
+    def load(cls, path: str = INDEX_FILE) -> "SearchIndex":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def _le(values: array) -> bytes:
+    if sys.byteorder == "big" and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(typecode: str, raw: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(raw)
+    if sys.byteorder == "big" and values.itemsize > 1:
+        values.byteswap()
+    return values
+
+
+def load_index(path: str = INDEX_FILE, exams_file: str = EXAMS_FILE) -> Tuple[SearchIndex, bool]:
+    """(index, rebuilt): the saved index while it matches exams.json, otherwise a fresh build."""
+    with open(exams_file, "rb") as f:
+        raw = f.read()
+    source_hash = hashlib.sha256(raw).hexdigest()
+    if os.path.exists(path):
+        try:
+            index = SearchIndex.load(path)
+            if index.source_hash == source_hash:
+                return index, False
+        except (ValueError, struct.error):
+            pass
+    index = SearchIndex.build(json.loads(raw), source_hash)
+    index.save(path)
+    return index, True
+
+
+# Benchmark -------------------------------------------------------------------
+
+def synthetic_corpus(exams: List[dict], factor: int = 10, seed: int = 7) -> List[dict]:
+    """The real exams plus factor - 1 copies with each text's words shuffled, so no copy dedupes."""
+    import random
+
+    rng = random.Random(seed)
+
+    def shuffle(text: Any) -> Any:
+        if not isinstance(text, str):
+            return text
+        words = text.split()
+        rng.shuffle(words)
+        return " ".join(words)
+
+    corpus = list(exams)
+    for copy in range(1, factor):
+        for exam in exams:
+            corpus.append({
+                "examId": f"{exam.get('examId')}_x{copy}",
+                "questions": [
+                    {**q, "questionText": shuffle(q.get("questionText")), "explanation": shuffle(q.get("explanation")),
+                     "options": {k: shuffle(v) for k, v in q.get("options", {}).items()}
+                     if isinstance(q.get("options"), dict) else q.get("options")}
+                    for q in exam.get("questions", [])
+                ],
+            })
+    return corpus
+
+
+def check_stems() -> bool:
+    """Words that must keep different stems, and inflections that must share one."""
+    apart = (("yaya", "yay"), ("yayalar", "yaylar"), ("kanunu", "kan"), ("kanununa", "kan"), ("basın", "baş"),
+             ("hasta", "has"), ("sorun", "soru"))
+    together = (("yol", "yola", "yolu"), ("hız", "hızı"), ("kavşak", "kavşağa"), ("kanun", "kanunu", "kanununa"),
+                ("yaya", "yayalar", "yayaya"), ("basın", "basına"))
+    failures = [f"{a} / {b} aynı köke indi: {stem(search_fold(a))}"
+                for a, b in apart if stem(search_fold(a)) == stem(search_fold(b))]
+    failures += [f"{' / '.join(words)} ayrı köklere indi: {' / '.join(stem(search_fold(w)) for w in words)}"
+                 for words in together if len({stem(search_fold(w)) for w in words}) > 1]
+    print(f"🔤 kök kontrolü: {len(apart)} ayrı çift, {len(together)} ortak grup, {len(failures)} hata")
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    return not failures
+
+
+def run_benchmark(exams: List[dict], repeat: int = 20) -> bool:
+    ok = check_stems()
+    queries = ("dönel kavşak", "turnike", "İLK YARDIM", "hız sınırı", "kavşağa yaklaşırken", "ŞERİT IŞIKLI")
+
+    def timed(fn, n: int = repeat) -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        return (time.perf_counter() - start) / n * 1000
+
+    def scan(docs, query: str) -> int:
+        # The substring approach it replaces, with str.lower()
+        words = query.lower().split()
+        return sum(all(w in " ".join((t, " ".join(o), e)).lower() for w in words) for t, o, e, _ in docs)
+
+    print(f"⏱️  {repeat} tekrar ortalaması")
+    for factor in (1, 10):
+        corpus = exams if factor == 1 else synthetic_corpus(exams, factor)
+        stem.cache_clear()
+        build_ms = timed(lambda: SearchIndex.build(corpus), 3)
+        index = SearchIndex.build(corpus)
+        payload = index.to_bytes()
+        docs = documents(corpus)
+        print(f"📚 {factor}x: {sum(len(e['questions']) for e in corpus)} soru, {len(index.lengths)} belge, "
+              f"{len(index.terms)} terim, {len(index.doc_ids)} kayıt, dosya {len(payload) / 1024:.0f} KB")
+        print(f"  - dizin kurulumu           {build_ms:9.2f} ms")
+        print(f"  - dosyadan yükleme         {timed(lambda: SearchIndex.from_bytes(payload)):9.2f} ms")
+        print(f"  - yükleme + ilk sorgu      {timed(lambda: SearchIndex.from_bytes(payload).search(queries[0])):9.2f} ms")
+        for query in queries:
+            hits = len(index.search(query, limit=len(index.lengths)))
+            print(f"  - '{query}'{'':<{22 - len(query)}} BM25 {timed(lambda: index.search(query)):7.3f} ms "
+                  f"({hits} belge) / alt dize taraması {timed(lambda: scan(docs, query), 3):8.2f} ms "
+                  f"({scan(docs, query)} belge)")
+    return ok
+
+
+def _format(index: SearchIndex, score: float, doc: int) -> str:
+    text, occurrences = index.docs[doc]
+    where = ", ".join(f"{exam_id} #{qid}" for exam_id, qid in occurrences[:3])
+    if len(occurrences) > 3:
+        where += f" (+{len(occurrences) - 3})"
+    text = " ".join(text.split())
+    return f"  {score:6.2f}  {where}: {text[:90]}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Search questions, options and explanations with BM25.")
+    parser.add_argument("query", nargs="*", help="search text")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--build", action="store_true", help="rebuild the index even if it is current")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if not os.path.exists(EXAMS_FILE):
+        print(f"❌ Bulunamadı: {EXAMS_FILE}")
+        return 1
+    if args.benchmark:
+        with open(EXAMS_FILE, "r", encoding="utf-8") as f:
+            return 0 if run_benchmark(json.load(f)) else 1
+
+    start = time.perf_counter()
+    if args.build:
+        with open(EXAMS_FILE, "rb") as f:
+            raw = f.read()
+        index, rebuilt = SearchIndex.build(json.loads(raw), hashlib.sha256(raw).hexdigest()), True
+        index.save()
+    else:
+        index, rebuilt = load_index()
+    elapsed = (time.perf_counter() - start) * 1000
+    if rebuilt or not args.query:
+        print(f"✅ {len(index.lengths)} belge, {len(index.terms)} terim "
+              f"({'kuruldu' if rebuilt else 'yüklendi'}, {elapsed:.0f} ms)")
+        print(f"📄 Dizin: {INDEX_FILE}")
+    if not args.query:
+        return 0
+
+    results = index.search(" ".join(args.query), args.limit)
+    if not results:
+        print("ℹ️  Sonuç yok")
+    for score, doc in results:
+        print(_format(index, score, doc))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,11 +1,10 @@
 #!/usr/bin/env python3
-import json
-import sys
+from exam_store import ExamStore, SetImage
 
 def update_deneme2_images():
     # JSON dosyasını yükle
-    with open('assets/data/exams.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    store = ExamStore('assets/data/exams.json')
+    data = store.data
     
     # Deneme 2'yi bul
     deneme2_index = None
@@ -39,18 +38,15 @@ def update_deneme2_images():
     
     # Soruları güncelle
     questions = data[deneme2_index]['questions']
-    updated_count = 0
-    
-    for question in questions:
-        question_id = question.get('id')
-        if question_id in updates:
-            question['imageUrl'] = updates[question_id]
-            updated_count += 1
-            print(f"Soru {question_id} güncellendi: {updates[question_id]}")
+    present = {question.get('id') for question in questions}
+    mutations = [SetImage('deneme_sinavi_2', qid, url) for qid, url in updates.items() if qid in present]
+    updated_count = len(mutations)
+    store.apply(mutations)
+    for m in mutations:
+        print(f"Soru {m.question_id} güncellendi: {m.url}")
     
     # JSON dosyasını kaydet
-    with open('assets/data/exams.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    store.save('update_images_deneme2')
     
     print(f"\nToplam {updated_count} soru güncellendi.")
     return updated_count
@@ -1,11 +1,10 @@
 #!/usr/bin/env python3
-import json
-import sys
+from exam_store import ExamStore, SetImage
 
 def update_deneme3_images():
     # JSON dosyasını yükle
-    with open('assets/data/exams.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    store = ExamStore('assets/data/exams.json')
+    data = store.data
     
     # Deneme 3'ü bul
     deneme3_index = None
@@ -43,18 +42,15 @@ def update_deneme3_images():
     
     # Soruları güncelle
     questions = data[deneme3_index]['questions']
-    updated_count = 0
-    
-    for question in questions:
-        question_id = question.get('id')
-        if question_id in updates:
-            question['imageUrl'] = updates[question_id]
-            updated_count += 1
-            print(f"Deneme 3 - Soru {question_id} güncellendi: {updates[question_id]}")
+    present = {question.get('id') for question in questions}
+    mutations = [SetImage('deneme_sinavi_3', qid, url) for qid, url in updates.items() if qid in present]
+    updated_count = len(mutations)
+    store.apply(mutations)
+    for m in mutations:
+        print(f"Deneme 3 - Soru {m.question_id} güncellendi: {m.url}")
     
     # JSON dosyasını kaydet
-    with open('assets/data/exams.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    store.save('update_images_deneme3')
     
     print(f"\nDeneme 3'te toplam {updated_count} soru güncellendi.")
     print(f"Kalan {18-updated_count} görsel için devam edilecek...")
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Validates exams.json; the Python port of tool/validate_exams.dart.
+
+Per-exam checks run on a process pool for large inputs and their results are
+cached in .cache/validate_exams.json by exam content hash, so an exam that did
+not change is not checked again. The dangling-image check also depends on the
+files under assets/images, so its cached result is additionally keyed by the
+image manifest (see image_manifest.py).
+
+Checks:
+- correctAnswerKey exists in options
+- visual-cue questions (şekil, levha, gösterge, ...; question_features.VISUAL_KEYWORDS) without an image, with a hint
+- imageUrl / option imageUrl pointing to a local file that does not exist
+- schema shape of exams and questions
+- duplicate questions (same normalized text) with inconsistent answers or explanations
+
+Outputs, in the format the Dart tool wrote:
+- analysis/exams_report.json (plus danglingImagePaths and schemaErrors)
+- analysis/missing_images.csv
+
+The findings that are new or resolved since the previous run are printed, not
+written to the report, so a committed report does not depend on local run state.
+
+Usage:
+    python3 scripts/validate_exams.py [--workers N] [--no-cache]
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from image_manifest import ImageManifest, load_manifest
+from categorize_questions import question_text
+from question_features import indicates_visual, text_features
+from question_index import EXAMS_FILE, exam_hash, has_image, normalize
+
+REPORT_JSON = "analysis/exams_report.json"
+MISSING_CSV = "analysis/missing_images.csv"
+CACHE_FILE = ".cache/validate_exams.json"
+
+# Bump when a check changes so cached results are recomputed
+CHECKS_VERSION = 2
+
+# Exams checked in-process below this count; pool start-up would dominate
+PARALLEL_THRESHOLD = 64
+
+CATEGORIES = {
+    "Trafik ve Çevre Bilgisi",
+    "Trafik İşaretleri",
+    "İlk Yardım",
+    "Motor ve Araç Tekniği",
+    "Trafik Adabı",
+}
+
+# (keywords, hint) in the order the Dart tool tests them
+IMAGE_HINTS = [
+    (("gösterge", "gosterge", "ikaz"), "Araç gösterge paneli simgesi/ikaz ışığı görseli"),
+    (("levha", "işaret", "isaret"), "İlgili trafik işaret/levha görseli"),
+    (("yatay işaret", "yatay isaret", "taşıt yolu üzerine çizilen", "tasit yolu uzerine cizilen"),
+     "Yol üzeri yatay işaretleme (ör. yaya geçidi, taralı alan) görseli"),
+    (("dönel kavşak", "donel kavsak"), "Dönel kavşak şeması/görseli"),
+    (("polis", "trafik polisi"), "Trafik polisinin kol/beden işareti görseli"),
+    (("şekil", "sekil", "resim", "görsel"), "Soruda atıf yapılan şekil/resim görseli"),
+]
+DEFAULT_HINT = "İlgili görsel (işaret/şekil)"
+
+
+def option_text(value: Any) -> str:
+    if isinstance(value, dict):
+        return str(value.get("text") or "")
+    return "" if value is None else str(value)
+
+
+def suggest_image_hint(text: str) -> str:
+    t = text.lower()
+    for keywords, hint in IMAGE_HINTS:
+        if any(k in t for k in keywords):
+            return hint
+    return DEFAULT_HINT
+
+
+# Per-exam checks -------------------------------------------------------------
+
+def check_correct_key(exam_id: str, questions: List[dict]) -> List[dict]:
+    findings = []
+    for q in questions:
+        options = q.get("options") if isinstance(q.get("options"), dict) else {}
+        key = str(q.get("correctAnswerKey") or "")
+        if key not in options:
+            findings.append({
+                "examId": exam_id,
+                "id": q.get("id"),
+                "questionText": q.get("questionText") or "",
+                "category": q.get("category") or "",
+                "correctAnswerKey": key,
+                "availableOptionKeys": list(options),
+            })
+    return findings
+
+
+def check_missing_images(exam_id: str, questions: List[dict]) -> List[dict]:
+    findings = []
+    for q in questions:
+        text = q.get("questionText") or ""
+        if indicates_visual(text_features(*question_text(q))) and not has_image(q.get("imageUrl")):
+            findings.append({
+                "examId": exam_id,
+                "id": q.get("id"),
+                "questionText": text,
+                "category": q.get("category") or "",
+                "imageUrl": q.get("imageUrl"),
+                "suggestedImageHint": suggest_image_hint(text),
+            })
+    return findings
+
+
+def check_dangling_images(exam_id: str, questions: List[dict], manifest: ImageManifest) -> List[dict]:
+    findings = []
+
+    def dangling(url: Any) -> bool:
+        # Remote media (e.g. embedded videos) is not an asset and is not checked
+        if not isinstance(url, str) or url.startswith(("http://", "https://")):
+            return False
+        return has_image(url) and not manifest.exists(url)
+
+    for q in questions:
+        if dangling(q.get("imageUrl")):
+            findings.append({"examId": exam_id, "id": q.get("id"), "option": None, "imageUrl": q["imageUrl"]})
+        options = q.get("options") if isinstance(q.get("options"), dict) else {}
+        for key, value in options.items():
+            if isinstance(value, dict) and dangling(value.get("imageUrl")):
+                findings.append({"examId": exam_id, "id": q.get("id"), "option": key, "imageUrl": value["imageUrl"]})
+    return findings
+
+
+def check_schema(exam: dict) -> List[dict]:
+    exam_id = exam.get("examId")
+    errors: List[dict] = []
+
+    def error(message: str, question_id: Any = None) -> None:
+        errors.append({"examId": exam_id, "id": question_id, "error": message})
+
+    if not isinstance(exam_id, str) or not exam_id:
+        error("examId eksik veya metin değil")
+    if not isinstance(exam.get("examName"), str):
+        error("examName eksik veya metin değil")
+    questions = exam.get("questions")
+    if not isinstance(questions, list):
+        error("questions bir liste değil")
+        return errors
+
+    seen_ids: Set[Any] = set()
+    for q in questions:
+        if not isinstance(q, dict):
+            error("soru bir nesne değil")
+            continue
+        qid = q.get("id")
+        if not isinstance(qid, int) or isinstance(qid, bool):
+            error("id tam sayı değil", qid)
+        elif qid in seen_ids:
+            error("aynı denemede tekrarlanan id", qid)
+        seen_ids.add(qid)
+        if not isinstance(q.get("questionText"), str) or not q["questionText"].strip():
+            error("questionText boş", qid)
+        options = q.get("options")
+        if not isinstance(options, dict) or len(options) < 2:
+            error("options en az iki seçenekli bir nesne değil", qid)
+        else:
+            for key, value in options.items():
+                if isinstance(value, dict):
+                    if not isinstance(value.get("text"), str) or not isinstance(value.get("imageUrl"), (str, type(None))):
+                        error(f"{key} seçeneği {{text, imageUrl}} biçiminde değil", qid)
+                elif not isinstance(value, str):
+                    error(f"{key} seçeneği metin değil", qid)
+        if not isinstance(q.get("correctAnswerKey"), str):
+            error("correctAnswerKey metin değil", qid)
+        for field in ("imageUrl", "explanation"):
+            if not isinstance(q.get(field), (str, type(None))):
+                error(f"{field} metin veya null değil", qid)
+        if q.get("category") not in CATEGORIES:
+            error(f"bilinmeyen kategori: {q.get('category')!r}", qid)
+    return errors
+
+
+def duplicate_records(exam_id: str, questions: List[dict]) -> List[dict]:
+    """What the cross-exam duplicate check needs from each question, in the Dart report's instance shape."""
+    records = []
+    for q in questions:
+        options = q.get("options") if isinstance(q.get("options"), dict) else {}
+        key = str(q.get("correctAnswerKey") or "")
+        records.append({
+            "norm": normalize(q.get("questionText") or ""),
+            "examId": exam_id,
+            "id": q.get("id"),
+            "text": q.get("questionText") or "",
+            "imageUrl": q.get("imageUrl"),
+            "options": {k: option_text(v) for k, v in options.items()},
+            "correctAnswerKey": key,
+            "correctAnswerText": option_text(options[key]) if key in options else None,
+            "explanation": str(q.get("explanation") or ""),
+            "category": str(q.get("category") or ""),
+        })
+    return records
+
+
+def check_exam(exam: dict, manifest: ImageManifest) -> Dict[str, List[dict]]:
+    """Every per-exam check."""
+    exam_id = str(exam.get("examId") or "unknown_exam")
+    questions = [q for q in exam.get("questions") or [] if isinstance(q, dict)]
+    results = {
+        "invalidCorrectKey": check_correct_key(exam_id, questions),
+        "missingImage": check_missing_images(exam_id, questions),
+        "schema": check_schema(exam),
+        "duplicates": duplicate_records(exam_id, questions),
+        "danglingImages": check_dangling_images(exam_id, questions, manifest),
+    }
+    return results
+
+
+def _check_task(args: Tuple[dict, ImageManifest, bool]) -> Dict[str, List[dict]]:
+    """Pool entry point; `dangling_only` reruns just the check that depends on the image files."""
+    exam, manifest, dangling_only = args
+    if dangling_only:
+        exam_id = str(exam.get("examId") or "unknown_exam")
+        questions = [q for q in exam.get("questions") or [] if isinstance(q, dict)]
+        return {"danglingImages": check_dangling_images(exam_id, questions, manifest)}
+    return check_exam(exam, manifest)
+
+
+# Cross-exam check ------------------------------------------------------------
+
+def duplicate_conflicts(records: Iterable[dict]) -> List[dict]:
+    groups: Dict[str, List[dict]] = {}
+    for r in records:
+        groups.setdefault(r["norm"], []).append(r)
+    clusters = []
+    for norm, instances in groups.items():
+        if len(instances) <= 1:
+            continue
+        answers: List[str] = []
+        explanations: List[str] = []
+        for r in instances:
+            answer = f"{r['correctAnswerKey']}::{r['correctAnswerText'] or ''}"
+            if answer not in answers:
+                answers.append(answer)
+            exp = r["explanation"].strip()
+            if exp and exp not in explanations:
+                explanations.append(exp)
+        if len(answers) > 1 or len(explanations) > 1:
+            clusters.append({
+                "questionTextNormalized": norm,
+                "instances": [{k: v for k, v in r.items() if k != "norm"} for r in instances],
+                "distinctAnswers": answers,
+                "distinctExplanations": explanations,
+            })
+    return clusters
+
+
+# Engine ----------------------------------------------------------------------
+
+# Report list sections in output order, with the per-exam result they come from
+REPORT_SECTIONS = [
+    ("missingImageQuestions", "missingImage"),
+    ("invalidCorrectKeyQuestions", "invalidCorrectKey"),
+    ("danglingImagePaths", "danglingImages"),
+    ("schemaErrors", "schema"),
+]
+REPORT_KEYS = [
+    "summary", "missingImageQuestions", "invalidCorrectKeyQuestions", "duplicateConflictClusters",
+    "danglingImagePaths", "schemaErrors",
+]
+CSV_HEADER = ["examId", "questionId", "category", "suggestedImageHint", "questionText"]
+
+
+def finding_key(check: str, finding: dict) -> str:
+    return "|".join(str(x) for x in (check, finding.get("examId"), finding.get("id"),
+                                     finding.get("option") or finding.get("error") or ""))
+
+
+def csv_row(finding: dict) -> List[Any]:
+    return [finding["examId"], "" if finding["id"] is None else finding["id"], finding["category"],
+            finding["suggestedImageHint"], finding["questionText"]]
+
+
+class ValidationCache:
+    """Per-exam results keyed by exam hash (and image manifest), plus the finding keys of the last run."""
+
+    def __init__(self, manifest: ImageManifest, path: Optional[str] = CACHE_FILE):
+        self.manifest = manifest
+        self.path = path
+        self.images_key = hashlib.sha256(json.dumps(sorted(manifest.files)).encode("utf-8")).hexdigest()
+        cache: dict = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            if cache.get("version") != CHECKS_VERSION:
+                cache = {}
+        self.cached: Dict[str, dict] = cache.get("exams", {})
+        self.previous_keys: Set[str] = set(cache.get("findingKeys", []))
+        self.entries: Dict[str, dict] = {}
+        self.stats = {"exams": 0, "checked": 0, "danglingOnly": 0, "cached": 0}
+
+    def lookup(self, exam: dict) -> Tuple[str, Optional[Dict[str, List[dict]]], bool]:
+        """(hash, cached results or None, whether only the image-file check must rerun)."""
+        digest = exam_hash(exam)
+        entry = self.cached.get(str(exam.get("examId")))
+        if entry and entry["hash"] == digest:
+            if entry["imagesKey"] == self.images_key:
+                return digest, entry["results"], False
+            return digest, None, True
+        return digest, None, False
+
+    def record(self, exam: dict, digest: str, results: Dict[str, List[dict]], dangling_only: bool = False) -> Dict[str, List[dict]]:
+        exam_id = str(exam.get("examId"))
+        if dangling_only:
+            results = dict(self.cached[exam_id]["results"], **results)
+        self.entries[exam_id] = {"hash": digest, "imagesKey": self.images_key, "results": results}
+        return results
+
+    def results(self, exam: dict) -> Dict[str, List[dict]]:
+        """Cached or freshly computed results for one exam, checked in-process."""
+        digest, cached, dangling_only = self.lookup(exam)
+        self.stats["exams"] += 1
+        if cached is not None:
+            self.stats["cached"] += 1
+            return self.record(exam, digest, cached)
+        self.stats["danglingOnly" if dangling_only else "checked"] += 1
+        return self.record(exam, digest, _check_task((exam, self.manifest, dangling_only)), dangling_only)
+
+    def changes(self, keys: Set[str]) -> dict:
+        previous = self.previous_keys
+        return {
+            "baseline": not previous,
+            "new": sorted(keys - previous) if previous else [],
+            "resolved": sorted(previous - keys),
+        }
+
+    def save(self, keys: Set[str]) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CHECKS_VERSION, "exams": self.entries, "findingKeys": sorted(keys)},
+                      f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+
+def summary(total_exams: int, total_questions: int, counts: Dict[str, int], clusters: int) -> dict:
+    return {
+        "totalExams": total_exams,
+        "totalQuestions": total_questions,
+        "missingImageCount": counts["missingImageQuestions"],
+        "invalidCorrectKeyCount": counts["invalidCorrectKeyQuestions"],
+        "duplicateConflictClusters": clusters,
+        "danglingImagePathCount": counts["danglingImagePaths"],
+        "schemaErrorCount": counts["schemaErrors"],
+    }
+
+
+def validate(data: List[dict], workers: Optional[int] = None, cache_path: Optional[str] = CACHE_FILE) -> Tuple[dict, dict]:
+    """Run every check; returns (report, stats), with the changes since the last run under stats["changes"]."""
+    cache = ValidationCache(load_manifest(), cache_path)
+    results: List[Optional[Dict[str, List[dict]]]] = [None] * len(data)
+    tasks: List[Tuple[int, str, bool]] = []
+    for pos, exam in enumerate(data):
+        digest, cached, dangling_only = cache.lookup(exam)
+        if cached is not None:
+            results[pos] = cache.record(exam, digest, cached)
+            cache.stats["cached"] += 1
+        else:
+            tasks.append((pos, digest, dangling_only))
+            cache.stats["danglingOnly" if dangling_only else "checked"] += 1
+    cache.stats["exams"] = len(data)
+
+    args = [(data[pos], cache.manifest, dangling_only) for pos, _, dangling_only in tasks]
+    if len(tasks) >= PARALLEL_THRESHOLD and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            computed = list(pool.map(_check_task, args))
+    else:
+        computed = [_check_task(a) for a in args]
+    for (pos, digest, dangling_only), result in zip(tasks, computed):
+        results[pos] = cache.record(data[pos], digest, result, dangling_only)
+
+    report: dict = {key: None for key in REPORT_KEYS}
+    keys: Set[str] = set()
+    for key, check in REPORT_SECTIONS:
+        report[key] = [f for r in results for f in r[check]]
+        keys |= {finding_key(check, f) for f in report[key]}
+    clusters = duplicate_conflicts(rec for r in results for rec in r["duplicates"])
+    keys |= {f"duplicates|{c['questionTextNormalized']}" for c in clusters}
+
+    counts = {key: len(report[key]) for key, _ in REPORT_SECTIONS}
+    report["summary"] = summary(len(data), sum(len(r["duplicates"]) for r in results), counts, len(clusters))
+    report["duplicateConflictClusters"] = clusters
+    cache.stats["changes"] = cache.changes(keys)
+    cache.save(keys)
+    return report, cache.stats
+
+
+def write_outputs(report: dict, report_path: str = REPORT_JSON, csv_path: str = MISSING_CSV) -> None:
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        # The Dart tool quoted every value but not the header
+        csv.writer(f, lineterminator="\n").writerow(CSV_HEADER)
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator="\n")
+        for m in report["missingImageQuestions"]:
+            writer.writerow(csv_row(m))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Validate exams.json and write the analysis reports.")
+    parser.add_argument("--workers", type=int, help="process pool size when many exams need checking")
+    parser.add_argument("--no-cache", action="store_true", help="recheck every exam")
+    parser.add_argument("--report", default=REPORT_JSON)
+    parser.add_argument("--csv", default=MISSING_CSV)
+    args = parser.parse_args()
+
+    if not os.path.exists(EXAMS_FILE):
+        print(f"❌ Bulunamadı: {EXAMS_FILE}")
+        return 1
+    with open(EXAMS_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    start = time.perf_counter()
+    report, stats = validate(data, args.workers, None if args.no_cache else CACHE_FILE)
+    elapsed = (time.perf_counter() - start) * 1000
+    write_outputs(report, args.report, args.csv)
+
+    s = report["summary"]
+    changes = stats["changes"]
+    print(f"🔍 {stats['exams']} deneme: {stats['checked']} kontrol edildi, {stats['danglingOnly']} yalnızca dosya "
+          f"kontrolü, {stats['cached']} önbellekten ({elapsed:.0f} ms)")
+    print(f"  - Görseli eksik olabilecek sorular: {s['missingImageCount']}")
+    print(f"  - Geçersiz doğru cevap anahtarı: {s['invalidCorrectKeyCount']}")
+    print(f"  - Tutarsız tekrar kümeleri: {s['duplicateConflictClusters']}")
+    print(f"  - Olmayan dosyaya işaret eden görseller: {s['danglingImagePathCount']}")
+    print(f"  - Şema hataları: {s['schemaErrorCount']}")
+    if not changes["baseline"]:
+        print(f"  - Son çalıştırmadan beri: {len(changes['new'])} yeni, {len(changes['resolved'])} çözülen bulgu")
+    print(f"📄 Rapor: {args.report}")
+    print(f"📄 CSV: {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())